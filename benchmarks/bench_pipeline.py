@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""Load benchmark for the story pipeline with latency-injecting mock agents.
+
+Drives POST /api/story through the real FastAPI app over the httpx ASGI
+transport at several concurrency levels. Agent calls reuse the
+deterministic mocks from src/echoes/tests/conftest.py, delayed
+by a per-agent log-normal latency; TTS goes to a fake speech client whose
+latency grows with the text length. Caches are disabled so every request
+runs the full pipeline.
+
+Measured per concurrency level: end-to-end latency per story, per-stage
+latency, throughput, and event-loop lag (how late a 5 ms ticker wakes up,
+i.e. time the loop spent blocked). Results are written as JSON; pass
+--baseline with an earlier results file to compare.
+
+Usage:
+    python benchmarks/bench_pipeline.py [--levels 1 10 100] [--scale 0.05]
+        [--latency storyteller=8.0 ...] [--output bench_pipeline.json]
+        [--baseline previous.json]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# Add src to path for imports; the app needs some API key to load settings
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+os.environ.setdefault("OPENAI_API_KEY", "bench")
+
+import httpx
+
+from echoes.app.main import app
+from echoes.services import storage, tts_service
+from echoes.services.llm_scheduler import LLMScheduler
+from echoes.services.percentiles import summarize
+from echoes.services.storage import LocalStorageBackend
+from echoes.tests.conftest import mock_runner_run
+from echoes.workflows import story_pipeline
+
+# Median latency in seconds of each agent at --scale 1 (roughly gpt-4o)
+DEFAULT_LATENCY = {
+    "researcher": 4.0,
+    "narrative_styler": 3.0,
+    "storyteller": 8.0,
+    "story_analyzer": 4.0,
+    "qa": 3.0,
+}
+
+# Agent names (see echoes/agents) to the roles above
+AGENT_ROLES = {
+    "Researcher": "researcher",
+    "Narrative Style Guide Agent": "narrative_styler",
+    "Storyteller": "storyteller",
+    "Story Analyzer Agent": "story_analyzer",
+    "QA": "qa",
+}
+
+# Seconds of TTS latency per input character at --scale 1
+TTS_SECONDS_PER_CHAR = 0.0015
+
+class LatencyModel:
+    """Log-normal latency per agent role, scaled by a common factor."""
+
+    def __init__(self, medians, sigma, scale, seed):
+        self.medians = medians
+        self.sigma = sigma
+        self.scale = scale
+        self.rng = random.Random(seed)
+
+    def sample(self, role):
+        return self.medians[role] * self.scale * self.rng.lognormvariate(0, self.sigma)
+
+class FakeSpeechClient:
+    """Stand-in for AsyncOpenAI whose speech endpoint sleeps like the real one."""
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.audio = SimpleNamespace(speech=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, voice, input):
+        await asyncio.sleep(len(input) * TTS_SECONDS_PER_CHAR * self.scale)
+        return SimpleNamespace(content=b"ID3" + b"\0" * 1024)
+
+class LoopLagMonitor:
+    """Measures how late a periodic ticker wakes up on the event loop."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.lags = []
+        self._task = None
+
+    async def _tick(self):
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.lags.append(max(0.0, time.perf_counter() - start - self.interval))
+
+    def start(self):
+        self._task = asyncio.ensure_future(self._tick())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+    def summary(self):
+        stats = summarize(self.lags) or {}
+        stats["blocked_seconds"] = sum(self.lags)
+        return stats
+
+async def run_level(concurrency, latency, stage_times):
+    """Send `concurrency` simultaneous story requests and measure them."""
+    async def delayed_runner_run(agent, prompt):
+        await asyncio.sleep(latency.sample(AGENT_ROLES.get(agent.name, "qa")))
+        return await mock_runner_run(agent, prompt)
+
+    stage_times.clear()
+    monitor = LoopLagMonitor()
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench",
+                                 timeout=None) as http:
+        async def one(i):
+            start = time.perf_counter()
+            response = await http.post("/api/story", json={"topic": f"Benchmark topic {i}"})
+            return response.status_code, time.perf_counter() - start
+
+        with patch("agents.Runner.run", side_effect=delayed_runner_run):
+            monitor.start()
+            start = time.perf_counter()
+            outcomes = await asyncio.gather(*(one(i) for i in range(concurrency)))
+            wall = time.perf_counter() - start
+            await monitor.stop()
+
+    ok = [elapsed for status, elapsed in outcomes if status == 200]
+    return {
+        "concurrency": concurrency,
+        "requests": concurrency,
+        "errors": concurrency - len(ok),
+        "wall_seconds": wall,
+        "stories_per_second": len(ok) / wall if wall else 0.0,
+        "story_seconds": summarize(ok),
+        "stage_seconds": {name: summarize(values) for name, values in sorted(stage_times.items())},
+        "event_loop_lag_seconds": monitor.summary(),
+    }
+
+def print_level(result):
+    story = result["story_seconds"] or {}
+    lag = result["event_loop_lag_seconds"]
+    print(f"\n▶ concurrency {result['concurrency']}: {result['stories_per_second']:.2f} stories/s, "
+          f"{result['errors']} errors, wall {result['wall_seconds']:.2f}s")
+    print(f"  story      p50 {story.get('p50', 0):.3f}s  p95 {story.get('p95', 0):.3f}s  "
+          f"p99 {story.get('p99', 0):.3f}s")
+    for name, stats in result["stage_seconds"].items():
+        print(f"  {name:<14} p50 {stats['p50']:.3f}s  p95 {stats['p95']:.3f}s")
+    print(f"  loop lag   max {lag.get('max', 0) * 1000:.1f}ms  p99 {lag.get('p99', 0) * 1000:.1f}ms  "
+          f"blocked {lag['blocked_seconds']:.3f}s")
+
+def compare(results, baseline_path):
+    """Print throughput and p95 latency relative to an earlier results file."""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {level["concurrency"]: level for level in json.load(f)["levels"]}
+    print(f"\n📊 Compared with {baseline_path}")
+    print(f"{'concurrency':>12}{'throughput':>14}{'story p95':>14}{'loop lag max':>14}")
+    for level in results["levels"]:
+        before = baseline.get(level["concurrency"])
+        if before is None or not level["story_seconds"] or not before["story_seconds"]:
+            continue
+        throughput = level["stories_per_second"] / before["stories_per_second"]
+        p95 = level["story_seconds"]["p95"] / before["story_seconds"]["p95"]
+        lag_before = before["event_loop_lag_seconds"].get("max") or 1e-9
+        lag = (level["event_loop_lag_seconds"].get("max") or 0) / lag_before
+        print(f"{level['concurrency']:>12}{throughput:>13.2f}x{p95:>13.2f}x{lag:>13.2f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--levels", type=int, nargs="+", default=[1, 10, 100],
+                        help="Concurrent requests per level")
+    parser.add_argument("--scale", type=float, default=0.05,
+                        help="Multiplier on all injected latencies (1 = realistic)")
+    parser.add_argument("--sigma", type=float, default=0.3,
+                        help="Log-normal spread of agent latencies")
+    parser.add_argument("--latency", nargs="*", default=[], metavar="ROLE=SECONDS",
+                        help="Override median agent latency, e.g. storyteller=10")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="bench_pipeline.json", help="Results file")
+    parser.add_argument("--baseline", help="Earlier results file to compare against")
+    args = parser.parse_args()
+
+    medians = dict(DEFAULT_LATENCY)
+    for override in args.latency:
+        role, _, seconds = override.partition("=")
+        if role not in medians:
+            parser.error(f"Unknown agent role '{role}' (choose from {', '.join(medians)})")
+        medians[role] = float(seconds)
+    latency = LatencyModel(medians, args.sigma, args.scale, args.seed)
+
+    stage_times = defaultdict(list)
+    real_run_stages = story_pipeline.run_stages
+
+    async def timed_run_stages(stages, seed=None, on_stage_complete=None):
+        def record(name, value, elapsed):
+            stage_times[name].append(elapsed)
+            if on_stage_complete is not None:
+                on_stage_complete(name, value, elapsed)
+        return await real_run_stages(stages, seed, record)
+
+    results = {
+        "config": {
+            "scale": args.scale,
+            "sigma": args.sigma,
+            "median_latency_seconds": medians,
+            "tts_seconds_per_char": TTS_SECONDS_PER_CHAR,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "levels": [],
+    }
+
+    with tempfile.TemporaryDirectory() as media_dir, \
+         patch.object(story_pipeline, "story_cache", None), \
+         patch.object(story_pipeline, "run_stages", timed_run_stages), \
+         patch.object(story_pipeline, "llm_scheduler", LLMScheduler(requests_per_minute=0)), \
+         patch.object(storage, "storage_backend", LocalStorageBackend(Path(media_dir))), \
+         patch.object(tts_service, "audio_cache", None), \
+         patch.object(tts_service, "OPENAI_API_KEY", "bench"), \
+         patch.object(tts_service, "get_async_openai_client",
+                      return_value=FakeSpeechClient(args.scale)):
+        for level in args.levels:
+            result = asyncio.run(run_level(level, latency, stage_times))
+            results["levels"].append(result)
+            print_level(result)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+    if args.baseline:
+        compare(results, args.baseline)
+
+if __name__ == "__main__":
+    main()
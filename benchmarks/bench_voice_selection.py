@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+"""Micro-benchmark and equivalence check for the TTS voice-selection heuristics.
+
+Compares the current classifiers in echoes.services.tts_service against the
+previous multi-pass implementations (kept below as legacy_* functions):
+first checks that both pick exactly the same voices and produce the same
+styled text, then times them on a long script.
+
+Usage:
+    python benchmarks/bench_voice_selection.py [--repeat N] [--copies N]
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import random
+import re
+import sys
+import time
+
+# Add src to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from echoes.services.tts_service import (
+    VOICE_MAP,
+    _add_menacing_styling,
+    _analyze_context_for_voice,
+    _apply_menacing_styling_if_needed,
+    _clean_script,
+    _determine_story_gender,
+)
+
+# Same cases as test_voices.py
+VOICE_CASES = [
+    ("Cleopatra", "I am Cleopatra, the last pharaoh of Egypt..."),
+    ("Hannibal", "I am Hannibal, the Carthaginian general..."),
+    ("Alexander the Great", "I am Alexander, the Macedonian conqueror..."),
+    ("Paris", "I am 80 years old and have lived in Paris all my life..."),
+    ("Medieval Knight", "I am a knight in shining armor from the Middle Ages..."),
+    ("Modern Scientist", "I am Albert Einstein, the physicist..."),
+]
+
+# ---------------------------------------------------------------------------
+# Previous implementations, kept verbatim for comparison
+# ---------------------------------------------------------------------------
+
+def legacy_determine_story_gender(script: str, topic: str) -> str:
+    """
+    Analyze the story content and topic to determine if it's primarily about a male or female figure.
+
+    Returns:
+        "male", "female", or "neutral"
+    """
+    script_lower = script.lower()
+    topic_lower = topic.lower()
+    combined_text = f"{script_lower} {topic_lower}"
+
+    # Count gender-specific pronouns and references
+    male_indicators = [
+        " he ", " him ", " his ", " himself ", " man ", " men ", " male ", " boy ", " boys ",
+        " king ", " lord ", " emperor ", " duke ", " prince ", " sir ", " mr ", " father ",
+        " brother ", " son ", " uncle ", " grandfather ", " husband "
+    ]
+
+    female_indicators = [
+        " she ", " her ", " hers ", " herself ", " woman ", " women ", " female ", " girl ", " girls ",
+        " queen ", " lady ", " empress ", " duchess ", " princess ", " madam ", " mrs ", " ms ",
+        " mother ", " sister ", " daughter ", " aunt ", " grandmother ", " wife "
+    ]
+
+    # Count occurrences
+    male_count = sum(combined_text.count(indicator) for indicator in male_indicators)
+    female_count = sum(combined_text.count(indicator) for indicator in female_indicators)
+
+    # Check for specific female historical figures
+    female_figures = [
+        "cleopatra", "queen", "empress", "princess", "lady", "madam", "mrs", "ms",
+        "elizabeth", "victoria", "catherine", "mary", "anne", "isabella", "joan",
+        "marie", "theresa", "eleanor", "margaret", "pharaoh", "cleopatra"
+    ]
+
+    # Check for specific male historical figures
+    male_figures = [
+        "king", "emperor", "prince", "lord", "sir", "mr", "father", "brother", "son",
+        "caesar", "alexander", "hannibal", "napoleon", "churchill", "lincoln",
+        "washington", "gandhi", "mandela", "mlk", "martin luther king"
+    ]
+
+    # Check topic for gender-specific names
+    female_figure_count = sum(1 for figure in female_figures if figure in topic_lower)
+    male_figure_count = sum(1 for figure in male_figures if figure in topic_lower)
+
+    # Add weight for named figures in topic
+    male_count += male_figure_count * 3  # Weight named figures more heavily
+    female_count += female_figure_count * 3
+
+    # Determine gender based on counts
+    if female_count > male_count and female_count > 2:
+        return "female"
+    elif male_count > female_count and male_count > 2:
+        return "male"
+    elif female_count == male_count and female_count > 0:
+        # If equal, check for stronger female indicators
+        if any(figure in topic_lower for figure in ["cleopatra", "queen", "empress", "pharaoh"]):
+            return "female"
+        elif any(figure in topic_lower for figure in ["king", "emperor", "caesar", "hannibal"]):
+            return "male"
+        else:
+            return "neutral"
+    else:
+        return "neutral"
+
+def legacy_analyze_context_for_voice(script: str, topic: str) -> str:
+    """
+    Analyze the script content and topic to intelligently select the best voice.
+    Considers historical era, character types, cultural context, and gender.
+    """
+    script_lower = script.lower()
+    topic_lower = topic.lower()
+
+    # First, determine the primary gender of the story
+    story_gender = legacy_determine_story_gender(script, topic)
+
+    # Ancient historical figures
+    if any(name in topic_lower for name in ["cleopatra", "hannibal", "caesar", "alexander", "pharaoh"]):
+        if "cleopatra" in topic_lower or "queen" in script_lower or "pharaoh" in script_lower:
+            return "fable"  # Elegant, authoritative for ancient rulers
+        elif "hannibal" in topic_lower or "warrior" in script_lower or "general" in script_lower:
+            return "echo"   # Strong, commanding for ancient warriors
+        else:
+            return "onyx"   # Deep, wise for other ancient figures
+
+    # Time period detection
+    if any(word in script_lower for word in ["ancient", "bce", "egypt", "rome", "greece", "pharaoh"]):
+        if "warrior" in script_lower or "soldier" in script_lower or "battle" in script_lower:
+            return "echo"   # Ancient warrior
+        elif "queen" in script_lower or "ruler" in script_lower or "pharaoh" in script_lower:
+            return "fable"  # Ancient ruler
+        else:
+            return "alloy"  # Ancient narrator
+
+    # Medieval period
+    if any(word in script_lower for word in ["medieval", "knight", "castle", "king", "queen", "middle ages"]):
+        if "knight" in script_lower or "warrior" in script_lower:
+            return "onyx"   # Medieval knight
+        else:
+            return "fable"  # Medieval ruler
+
+    # Elderly resident narratives (80-year-old perspective)
+    if "80 years old" in script_lower or "elderly" in script_lower or "lived in" in script_lower:
+        return "shimmer"  # Mature, experienced voice
+
+    # Modern/contemporary
+    if any(word in script_lower for word in ["modern", "contemporary", "20th century", "21st century"]):
+        return "alloy"  # Contemporary voice
+
+    # Character-based detection
+    primary_character = legacy_detect_primary_character(script)
+    char_lower = primary_character.lower()
+
+    # Direct character mappings
+    if char_lower in VOICE_MAP:
+        return VOICE_MAP[char_lower]
+
+    # Gender-based voice selection based on story analysis
+    if story_gender == "female":
+        return "nova"   # Female voice for female-centric stories
+    elif story_gender == "male":
+        return "onyx"   # Male voice for male-centric stories
+
+    # Legacy gender detection as fallback
+    if any(word in char_lower for word in ["queen", "woman", "female", "lady", "empress"]):
+        return "nova"   # Female voice
+    elif any(word in char_lower for word in ["king", "man", "male", "lord", "emperor"]):
+        return "onyx"   # Male voice
+
+    # Default fallback
+    return "alloy"
+
+def legacy_detect_primary_character(script: str) -> str:
+    """Detect the primary character from voice markers and context."""
+    # First, check for explicit voice markers like [CLEOPATRA:FABLE]
+    voice_marker_pattern = r'\[([A-Z_]+):([A-Z]+)\]'
+    voice_matches = re.findall(voice_marker_pattern, script)
+    if voice_matches:
+        # Return the first character type found
+        return voice_matches[0][0]
+
+    # Then check for character name markers like [CLEOPATRA]
+    marker_pattern = r'\[([A-Z][A-Z\s]+)\]:'
+    markers = re.findall(marker_pattern, script)
+
+    if not markers:
+        return "narrator"
+
+    # Count frequency and return most common (excluding generic markers)
+    from collections import Counter
+    marker_counts = Counter(markers)
+
+    # Remove generic markers
+    for generic in ["NARRATOR", "SCENE", "VISUAL", "DESCRIPTION"]:
+        marker_counts.pop(generic, None)
+
+    if marker_counts:
+        return marker_counts.most_common(1)[0][0]
+
+    return "narrator"
+
+def legacy_add_menacing_styling(script: str) -> str:
+    """
+    Add subtle text modifications to encourage deeper, more menacing voice delivery.
+    Simplified to avoid API failures while maintaining voice character.
+    """
+    # Simple emphasis markers for key words (TTS engines may interpret *word* as emphasis)
+    menacing_words = [
+        "warrior", "battle", "conquer", "defeat", "power", "strength", "command",
+        "rule", "dominate", "crush", "destroy", "victory", "glory", "honor"
+    ]
+
+    styled_script = script
+
+    # Add emphasis to menacing words (avoid over-processing)
+    for word in menacing_words:
+        # Only emphasize if the word appears as a standalone word
+        styled_script = re.sub(rf'\b({word})\b', r'*\1*', styled_script, flags=re.IGNORECASE)
+
+    return styled_script
+
+def legacy_apply_menacing_styling_if_needed(script: str, topic: str) -> str:
+    """
+    Apply menacing styling to single-voice scripts if the content suggests it.
+    Used for topics that should have deep, menacing delivery.
+    """
+    script_lower = script.lower()
+    topic_lower = topic.lower()
+
+    # Check if this content should have menacing styling
+    menacing_indicators = [
+        "warrior", "battle", "conquer", "hannibal", "caesar", "alexander",
+        "deadly", "menacing", "intense", "commanding", "ruler", "general"
+    ]
+
+    should_style = any(indicator in script_lower or indicator in topic_lower
+                      for indicator in menacing_indicators)
+
+    if should_style:
+        return legacy_add_menacing_styling(script)
+    else:
+        return script
+
+def legacy_clean_script(script: str) -> str:
+    """Remove voice markers from script for TTS."""
+    # Remove markers like [CLEOPATRA]: or [NARRATOR]:
+    cleaned = re.sub(r'\[([A-Z][A-Z\s]+)\]:\s*', '', script)
+    return cleaned.strip()
+
+# ---------------------------------------------------------------------------
+# Benchmark driver
+# ---------------------------------------------------------------------------
+
+VOCABULARY = (
+    "he him his she her hers queen king lady lord man woman mother father son "
+    "the a of and in to was were battle warrior power glory honor rule ruler "
+    "ancient egypt rome medieval knight castle modern elderly general soldier "
+    "cleopatra caesar hannibal Power Victory. crowd wall city night river"
+).split()
+
+TOPICS = ["Cleopatra", "Hannibal", "Fall of the Berlin Wall", "Queen Victoria",
+          "King Arthur", "Paris", "Moon Landing", "Medieval Knight"]
+
+def random_script(rng: random.Random, words: int) -> str:
+    """Build a noisy script with repeated words, newlines and character markers."""
+    parts = []
+    for _ in range(words):
+        roll = rng.random()
+        if roll < 0.02:
+            parts.append(rng.choice(["[NARRATOR]:", "[CLEOPATRA]:", "[CAESAR]:", "[HANNIBAL:ONYX]"]))
+        elif roll < 0.05:
+            parts.append("\n")
+        else:
+            word = rng.choice(VOCABULARY)
+            parts.append(word)
+            if rng.random() < 0.05:
+                parts.append(word)  # adjacent repeats exercise str.count overlap rules
+    return " ".join(parts)
+
+def check_equivalence(cases: int = 2000) -> None:
+    """Assert the current and legacy heuristics agree on fixed and random inputs."""
+    rng = random.Random(1234)
+    inputs = list(VOICE_CASES)
+    inputs += [(rng.choice(TOPICS), random_script(rng, rng.randint(0, 300))) for _ in range(cases)]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        for topic, script in inputs:
+            assert _determine_story_gender(script, topic) == legacy_determine_story_gender(script, topic), (topic, script)
+            assert _analyze_context_for_voice(script, topic) == legacy_analyze_context_for_voice(script, topic), (topic, script)
+            assert _add_menacing_styling(script) == legacy_add_menacing_styling(script)
+            assert _apply_menacing_styling_if_needed(script, topic) == legacy_apply_menacing_styling_if_needed(script, topic)
+            assert _clean_script(script) == legacy_clean_script(script)
+
+    print(f"✅ Identical results on {len(inputs)} inputs ({len(VOICE_CASES)} from test_voices.py)")
+
+def time_call(func, args, repeat: int) -> float:
+    """Return the mean wall-clock time of func(*args) in microseconds."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            func(*args)
+        return (time.perf_counter() - start) / repeat * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200, help="Timed iterations per function")
+    parser.add_argument("--copies", type=int, default=40, help="Copies of the sample story in the long script")
+    args = parser.parse_args()
+
+    check_equivalence()
+
+    sample = random_script(random.Random(42), 250)
+    script = "\n\n".join([sample] * args.copies)
+    topic = "Hannibal crossing the Alps"
+    print(f"\n⏱️  Script length: {len(script):,} characters, {args.repeat} iterations\n")
+
+    rows = [
+        ("_determine_story_gender", _determine_story_gender, legacy_determine_story_gender, (script, topic)),
+        ("_analyze_context_for_voice", _analyze_context_for_voice, legacy_analyze_context_for_voice, (script, topic)),
+        ("_add_menacing_styling", _add_menacing_styling, legacy_add_menacing_styling, (script,)),
+        ("_clean_script", _clean_script, legacy_clean_script, (script,)),
+    ]
+    print(f"{'function':<30}{'legacy µs':>12}{'current µs':>12}{'speedup':>10}")
+    for name, current, legacy, call_args in rows:
+        legacy_us = time_call(legacy, call_args, args.repeat)
+        current_us = time_call(current, call_args, args.repeat)
+        print(f"{name:<30}{legacy_us:>12.1f}{current_us:>12.1f}{legacy_us / current_us:>9.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Load driver for a running Echoes server.
+
+Sends a mix of story and chat requests to the HTTP API at a fixed
+concurrency. Meant to be run against a server whose OpenAI calls go to the
+local fake API, so load can be applied without cost:
+
+    python -m echoes.app.fake_openai --port 8100 --latency 0.8 --rpm 300
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn echoes.app.main:app --port 8000
+    python benchmarks/load_driver.py --url http://127.0.0.1:8000 --requests 200 --concurrency 20
+
+Stories are requested for a pool of --topics distinct topics, so repeats
+exercise the story cache and request coalescing; chat questions go to
+story_ids returned by earlier stories. Reports status codes, latency
+percentiles and throughput per request kind, and writes them as JSON.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter, defaultdict
+
+# Allow running from the repository root without installing the package
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import httpx
+
+from echoes.services.percentiles import summarize
+
+QUESTIONS = [
+    "Who were the key people involved?",
+    "Why did this happen when it did?",
+    "What happened in the days that followed?",
+    "How did ordinary people experience it?",
+    "What is the lasting significance of these events?",
+]
+
+async def run_load(url, requests, concurrency, chat_ratio, topics, seed, timeout):
+    """Send `requests` requests with at most `concurrency` in flight."""
+    rng = random.Random(seed)
+    story_ids = []
+    statuses = defaultdict(Counter)
+    latencies = defaultdict(list)
+    remaining = iter(range(requests))
+
+    async def story(http):
+        topic = f"Load test topic {rng.randrange(topics)}"
+        response = await http.post("/api/story", json={"topic": topic})
+        if response.status_code == 200 and response.json().get("story_id"):
+            story_ids.append(response.json()["story_id"])
+        return response
+
+    async def chat(http):
+        payload = {"story_id": rng.choice(story_ids), "question": rng.choice(QUESTIONS)}
+        return await http.post("/api/chat", json=payload)
+
+    async def worker(http):
+        for _ in remaining:
+            kind = "chat" if story_ids and rng.random() < chat_ratio else "story"
+            start = time.perf_counter()
+            try:
+                response = await (chat(http) if kind == "chat" else story(http))
+                status = str(response.status_code)
+            except httpx.HTTPError as e:
+                status = type(e).__name__
+            latencies[kind].append(time.perf_counter() - start)
+            statuses[kind][status] += 1
+
+    async with httpx.AsyncClient(base_url=url, timeout=timeout) as http:
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(http) for _ in range(concurrency)))
+        wall = time.perf_counter() - start
+
+    return {
+        "config": {
+            "url": url,
+            "requests": requests,
+            "concurrency": concurrency,
+            "chat_ratio": chat_ratio,
+            "topics": topics,
+            "seed": seed,
+        },
+        "wall_seconds": wall,
+        "requests_per_second": requests / wall if wall else 0.0,
+        "kinds": {
+            kind: {
+                "requests": sum(statuses[kind].values()),
+                "statuses": dict(statuses[kind]),
+                "ok_per_second": statuses[kind]["200"] / wall if wall else 0.0,
+                "latency_seconds": summarize(latencies[kind]),
+            }
+            for kind in sorted(statuses)
+        },
+    }
+
+def print_results(results):
+    print(f"\n▶ {results['config']['requests']} requests at concurrency "
+          f"{results['config']['concurrency']}: {results['requests_per_second']:.2f} req/s, "
+          f"wall {results['wall_seconds']:.2f}s")
+    for kind, stats in results["kinds"].items():
+        latency = stats["latency_seconds"] or {}
+        codes = ", ".join(f"{code}: {n}" for code, n in sorted(stats["statuses"].items()))
+        print(f"  {kind:<6} {stats['requests']:>5} requests ({codes})  "
+              f"{stats['ok_per_second']:.2f} ok/s")
+        print(f"         p50 {latency.get('p50', 0):.3f}s  p95 {latency.get('p95', 0):.3f}s  "
+              f"p99 {latency.get('p99', 0):.3f}s  max {latency.get('max', 0):.3f}s")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="Echoes server base URL")
+    parser.add_argument("--requests", type=int, default=100, help="Total requests to send")
+    parser.add_argument("--concurrency", type=int, default=10, help="Requests in flight")
+    parser.add_argument("--chat-ratio", type=float, default=0.5,
+                        help="Fraction of requests that are chat questions once a story exists")
+    parser.add_argument("--topics", type=int, default=20,
+                        help="Distinct story topics to draw from")
+    parser.add_argument("--timeout", type=float, default=600.0, help="Per-request timeout")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", default="load_driver.json", help="Results file")
+    args = parser.parse_args()
+
+    results = asyncio.run(run_load(args.url, args.requests, args.concurrency, args.chat_ratio,
+                                   args.topics, args.seed, args.timeout))
+    print_results(results)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✅ Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,14 +1,23 @@
 #!/usr/bin/env python3
-"""Simple CLI to generate historical stories with AI."""
+"""Simple CLI to generate historical stories with AI.
+
+Run without arguments for interactive mode, or pass --batch to generate
+many topics:
+
+    python main.py --batch topics.txt --output stories.jsonl --concurrency 8
+"""
 
 import sys
 import os
+import argparse
 import asyncio
+from pathlib import Path
 
 # Add src to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from echoes.workflows.story_pipeline import generate_story_experience
+from echoes.workflows.batch import read_topics, run_batch
 from echoes.app.settings import MODEL
 import json
 
@@ -22,8 +31,58 @@ def print_section(title):
     print(f"  {title}")
     print('='*80)
 
-def main():
+def parse_args(argv=None):
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description="Generate historical stories with AI.")
+    parser.add_argument("--batch", metavar="FILE",
+                        help="Generate every topic in FILE (one per line, '-' for stdin)")
+    parser.add_argument("--output", metavar="JSONL", default="stories.jsonl",
+                        help="Batch results file; reruns skip topics already in it "
+                             "(default: stories.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=4,
+                        help="Topics generated at once in batch mode (default: 4)")
+    args = parser.parse_args(argv)
+    if args.concurrency < 1:
+        parser.error("--concurrency must be at least 1")
+    return args
+
+def run_batch_mode(args):
+    """Generate all topics from a file or stdin and print a summary."""
+    if args.batch == "-":
+        topics = read_topics(sys.stdin)
+    else:
+        with open(args.batch, "r", encoding="utf-8") as f:
+            topics = read_topics(f)
+    
+    if not topics:
+        print("❌ Error: No topics found!")
+        return 1
+    
+    print_separator()
+    print(f"🎭 ECHOES - Batch generation of {len(topics)} topics using {MODEL}")
+    print(f"   Output: {args.output} | Concurrency: {args.concurrency}")
+    print_separator()
+    
+    def progress(record):
+        mark = "✅" if record["status"] == "ok" else "❌"
+        detail = f"{record['elapsed_seconds']:.1f}s" if record["status"] == "ok" else record["error"]
+        print(f"{mark} {record['topic']} ({detail})")
+    
+    summary = asyncio.run(run_batch(
+        topics, MODEL, Path(args.output), concurrency=args.concurrency, on_topic_done=progress
+    ))
+    
+    print_section("📊 BATCH SUMMARY")
+    print(summary.format())
+    print_separator()
+    return 1 if summary.failed else 0
+
+def main(argv=None):
     """Main function to run the story generator."""
+    args = parse_args(argv)
+    if args.batch:
+        return run_batch_mode(args)
+    
     print_separator()
     print("🎭 ECHOES - AI Historical Story Generator")
     print_separator()
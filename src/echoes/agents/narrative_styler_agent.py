@@ -1,12 +1,7 @@
 """Narrative Style Guide Agent builder."""
 
-from pathlib import Path
 from agents import Agent
-
-def _load_prompt(filename: str) -> str:
-    """Load prompt from markdown file."""
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    return (prompts_dir / filename).read_text(encoding="utf-8")
+from .prompts import load_prompt
 
 def build_narrative_styler_agent(model: str) -> Agent:
     """
@@ -21,5 +16,5 @@ def build_narrative_styler_agent(model: str) -> Agent:
     return Agent(
         name="Narrative Style Guide Agent",
         model=model,
-        instructions=_load_prompt("narrative_styler.md"),
+        instructions=load_prompt("narrative_styler.md"),
     )
\ No newline at end of file
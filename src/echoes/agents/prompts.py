@@ -0,0 +1,99 @@
+"""Registry of agent prompt templates."""
+
+import hashlib
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from ..app.settings import settings
+
+PROMPTS_DIR = Path(__file__).parent.parent / "prompts"
+
+class PromptRegistry:
+    """
+    Loads every markdown prompt once and serves it from memory.
+
+    Each prompt is hashed when loaded, and ``version`` combines all of the
+    hashes so callers (e.g. the story cache) can tell when prompts change.
+    With ``watch=True`` file modification times are re-checked at most
+    every ``check_interval`` seconds and changed prompts are reloaded.
+    """
+
+    def __init__(self, directory: Path = PROMPTS_DIR, watch: bool = False,
+                 check_interval: float = 1.0):
+        self.directory = Path(directory)
+        self.watch = watch
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._texts: Dict[str, str] = {}
+        self._hashes: Dict[str, str] = {}
+        self._mtimes: Dict[str, float] = {}
+        self._version = ""
+        self._last_check = 0.0
+        self.reload()
+
+    def reload(self) -> None:
+        """Read (or re-read) every prompt file from disk."""
+        texts, hashes, mtimes = {}, {}, {}
+        for path in sorted(self.directory.glob("*.md")):
+            data = path.read_bytes()
+            texts[path.name] = data.decode("utf-8")
+            hashes[path.name] = hashlib.sha256(data).hexdigest()
+            mtimes[path.name] = path.stat().st_mtime
+
+        combined = hashlib.sha256()
+        for name, digest in hashes.items():
+            combined.update(f"{name}:{digest}\n".encode())
+
+        with self._lock:
+            self._texts, self._hashes, self._mtimes = texts, hashes, mtimes
+            self._version = combined.hexdigest()
+            self._last_check = time.monotonic()
+
+    def _maybe_reload(self) -> None:
+        if not self.watch or time.monotonic() - self._last_check < self.check_interval:
+            return
+        self._last_check = time.monotonic()
+        current = {path.name: path.stat().st_mtime for path in self.directory.glob("*.md")}
+        if current != self._mtimes:
+            self.reload()
+
+    def get(self, filename: str) -> str:
+        """
+        Return the text of a prompt.
+
+        Args:
+            filename: Prompt file name (e.g., "qa.md")
+
+        Returns:
+            Prompt text
+        """
+        self._maybe_reload()
+        try:
+            return self._texts[filename]
+        except KeyError:
+            raise FileNotFoundError(f"Prompt not found: {self.directory / filename}") from None
+
+    def hash(self, filename: str) -> Optional[str]:
+        """Return the SHA-256 of a prompt file, or None if it is unknown."""
+        self._maybe_reload()
+        return self._hashes.get(filename)
+
+    @property
+    def version(self) -> str:
+        """Combined hash of all prompt files."""
+        self._maybe_reload()
+        return self._version
+
+    def versions(self) -> Dict[str, str]:
+        """Return the hash of every loaded prompt, keyed by file name."""
+        self._maybe_reload()
+        return dict(self._hashes)
+
+# Shared registry, loaded once at import
+prompt_registry = PromptRegistry(watch=settings.prompt_hot_reload)
+
+def load_prompt(filename: str) -> str:
+    """Load a prompt template from the shared registry."""
+    return prompt_registry.get(filename)
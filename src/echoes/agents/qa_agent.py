@@ -1,14 +1,7 @@
 """QA agent for questions and answers."""
 
-from pathlib import Path
 from agents import Agent
-
-def _load_prompt(filename: str) -> str:
-    """Load prompt template from prompts directory."""
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    prompt_path = prompts_dir / filename
-    with open(prompt_path, "r", encoding="utf-8") as f:
-        return f.read()
+from .prompts import load_prompt
 
 def build_qa_agent(model: str) -> Agent:
     """
@@ -20,7 +13,7 @@ def build_qa_agent(model: str) -> Agent:
     Returns:
         Agent configured for Q&A generation
     """
-    system_prompt = _load_prompt("qa.md")
+    system_prompt = load_prompt("qa.md")
     
     agent = Agent(
         name="QA",
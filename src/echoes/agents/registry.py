@@ -0,0 +1,70 @@
+"""Registry of shared, reusable agent instances."""
+
+import threading
+from typing import Callable, Dict, Tuple
+
+from agents import Agent
+from .prompts import PromptRegistry, prompt_registry
+from .researcher_agent import build_researcher_agent
+from .storyteller_agent import build_storyteller_agent
+from .qa_agent import build_qa_agent
+from .narrative_styler_agent import build_narrative_styler_agent
+from .story_analyzer_agent import build_story_analyzer_agent
+
+# Agent role -> (builder, prompt file it depends on)
+AGENT_BUILDERS: Dict[str, Tuple[Callable[[str], Agent], str]] = {
+    "researcher": (build_researcher_agent, "researcher.md"),
+    "storyteller": (build_storyteller_agent, "storyteller.md"),
+    "qa": (build_qa_agent, "qa.md"),
+    "narrative_styler": (build_narrative_styler_agent, "narrative_styler.md"),
+    "story_analyzer": (build_story_analyzer_agent, "story_analyzer.md"),
+}
+
+class AgentRegistry:
+    """
+    Builds each agent once per model and reuses it across requests.
+
+    Agents are constructed lazily on first use. Entries are keyed by the
+    hash of the agent's prompt, so a hot-reloaded prompt produces a fresh
+    agent on the next lookup.
+    """
+
+    def __init__(self, prompts: PromptRegistry = prompt_registry,
+                 builders: Dict[str, Tuple[Callable[[str], Agent], str]] = AGENT_BUILDERS):
+        self.prompts = prompts
+        self.builders = builders
+        self._agents: Dict[Tuple[str, str], Tuple[str, Agent]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, role: str, model: str) -> Agent:
+        """
+        Return the shared agent for a role and model.
+
+        Args:
+            role: Agent role (a key of AGENT_BUILDERS, e.g. "qa")
+            model: OpenAI model name (e.g., "gpt-4o")
+
+        Returns:
+            Configured Agent instance
+        """
+        builder, prompt_file = self.builders[role]
+        prompt_hash = self.prompts.hash(prompt_file)
+
+        entry = self._agents.get((role, model))
+        if entry is not None and entry[0] == prompt_hash:
+            return entry[1]
+
+        with self._lock:
+            entry = self._agents.get((role, model))
+            if entry is None or entry[0] != prompt_hash:
+                entry = (prompt_hash, builder(model))
+                self._agents[(role, model)] = entry
+            return entry[1]
+
+    def clear(self) -> None:
+        """Forget all constructed agents."""
+        with self._lock:
+            self._agents.clear()
+
+# Shared registry used by the workflows and routers
+agent_registry = AgentRegistry()
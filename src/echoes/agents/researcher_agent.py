@@ -1,15 +1,8 @@
 """Researcher agent for gathering historical facts."""
 
 import os
-from pathlib import Path
 from agents import Agent
-
-def _load_prompt(filename: str) -> str:
-    """Load prompt template from prompts directory."""
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    prompt_path = prompts_dir / filename
-    with open(prompt_path, "r", encoding="utf-8") as f:
-        return f.read()
+from .prompts import load_prompt
 
 def build_researcher_agent(model: str) -> Agent:
     """
@@ -21,7 +14,7 @@ def build_researcher_agent(model: str) -> Agent:
     Returns:
         Agent configured for historical research
     """
-    system_prompt = _load_prompt("researcher.md")
+    system_prompt = load_prompt("researcher.md")
     
     # Try to enable web_search tool if available
     tools = []  # No tools for now
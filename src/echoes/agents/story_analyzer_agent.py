@@ -1,12 +1,7 @@
 """Story Analyzer Agent builder."""
 
-from pathlib import Path
 from agents import Agent
-
-def _load_prompt(filename: str) -> str:
-    """Load prompt from markdown file."""
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    return (prompts_dir / filename).read_text(encoding="utf-8")
+from .prompts import load_prompt
 
 def build_story_analyzer_agent(model: str) -> Agent:
     """
@@ -21,5 +16,5 @@ def build_story_analyzer_agent(model: str) -> Agent:
     return Agent(
         name="Story Analyzer Agent",
         model=model,
-        instructions=_load_prompt("story_analyzer.md"),
+        instructions=load_prompt("story_analyzer.md"),
     )
\ No newline at end of file
@@ -1,14 +1,7 @@
 """Storyteller agent for creating narratives."""
 
-from pathlib import Path
 from agents import Agent
-
-def _load_prompt(filename: str) -> str:
-    """Load prompt template from prompts directory."""
-    prompts_dir = Path(__file__).parent.parent / "prompts"
-    prompt_path = prompts_dir / filename
-    with open(prompt_path, "r", encoding="utf-8") as f:
-        return f.read()
+from .prompts import load_prompt
 
 def build_storyteller_agent(model: str) -> Agent:
     """
@@ -20,7 +13,7 @@ def build_storyteller_agent(model: str) -> Agent:
     Returns:
         Agent configured for storytelling
     """
-    system_prompt = _load_prompt("storyteller.md")
+    system_prompt = load_prompt("storyteller.md")
     
     agent = Agent(
         name="Storyteller",
@@ -0,0 +1,342 @@
+"""Local stand-in for the OpenAI API, for offline load testing.
+
+Implements the endpoints Echoes uses (Responses API and Chat Completions
+for the Agents SDK, audio speech for TTS) with canned output and
+configurable latency, token throughput, error rate and rate limits.
+Point the app at it with OPENAI_BASE_URL:
+
+    python -m echoes.app.fake_openai --port 8100 --latency 0.8 --rpm 500
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 uvicorn echoes.app.main:app
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+import uuid
+import zlib
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import AsyncIterator, Optional, Tuple
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from ..services.text import estimate_tokens
+
+_WORDS = """
+the city held its breath as crowds gathered at the border while guards
+waited for orders and families on both sides remembered years of
+division until a hurried announcement changed everything that night
+""".split()
+
+@dataclass
+class FakeOpenAIConfig:
+    """
+    Behaviour of the fake server.
+
+    Attributes:
+        latency: Median seconds before the first output token
+        latency_sigma: Log-normal spread of that latency
+        tokens_per_second: Output token rate after the first token
+        output_tokens: Tokens generated per text response
+        error_rate: Fraction of requests failing with a 500
+        requests_per_minute: Request rate limit, answered with 429 (0 = none)
+        tokens_per_minute: Token rate limit, answered with 429 (0 = none)
+        tts_seconds_per_char: Speech synthesis time per input character
+        audio_bytes_per_char: Size of the returned audio per input character
+        seed: Random seed for reproducible latencies and failures
+    """
+    latency: float = 0.5
+    latency_sigma: float = 0.3
+    tokens_per_second: float = 60.0
+    output_tokens: int = 400
+    error_rate: float = 0.0
+    requests_per_minute: int = 0
+    tokens_per_minute: int = 0
+    tts_seconds_per_char: float = 0.001
+    audio_bytes_per_char: int = 1000
+    seed: Optional[int] = None
+
+class _Limiter:
+    """Per-minute request and token windows, like the real API's limits."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._window_start = time.monotonic()
+        self.requests = 0
+        self.tokens = 0
+
+    def check(self, tokens: int) -> Optional[Tuple[str, float]]:
+        """Count a request; return (limit type, retry-after seconds) if over a limit."""
+        now = time.monotonic()
+        if now - self._window_start >= 60:
+            self._window_start, self.requests, self.tokens = now, 0, 0
+        retry_after = 60 - (now - self._window_start)
+        if self.requests_per_minute and self.requests >= self.requests_per_minute:
+            return "requests", retry_after
+        if self.tokens_per_minute and self.tokens + tokens > self.tokens_per_minute:
+            return "tokens", retry_after
+        self.requests += 1
+        self.tokens += tokens
+        return None
+
+def _count_tokens(value) -> int:
+    # Same rough estimate the app uses for budgeting
+    return estimate_tokens(value if isinstance(value, str) else json.dumps(value))
+
+def _fake_text(prompt: str, tokens: int) -> str:
+    """Deterministic filler text for a prompt, with FAQ-style Q/A lines first."""
+    rng = random.Random(zlib.crc32(prompt.encode("utf-8")))
+    n_words = max(1, int(tokens * 0.75))
+    words = [rng.choice(_WORDS) for _ in range(n_words)]
+    lines = []
+    for i in range(min(5, n_words // 20)):
+        chunk = words[i * 10:(i + 1) * 10]
+        lines.append(f"Q: {' '.join(chunk[:5]).capitalize()}?")
+        lines.append(f"A: {' '.join(chunk[5:]).capitalize()}.")
+    lines.append(" ".join(words[len(lines) * 5:]).capitalize() + ".")
+    return "\n".join(lines)
+
+def _split_deltas(text: str, tokens: int):
+    """Split text into roughly one chunk per token."""
+    size = max(1, len(text) // max(1, tokens))
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+def _error(status: int, message: str, error_type: str, code: Optional[str] = None,
+           headers: Optional[dict] = None) -> JSONResponse:
+    body = {"error": {"message": message, "type": error_type, "param": None, "code": code}}
+    return JSONResponse(body, status_code=status, headers=headers)
+
+def _sse(event: Optional[str], data) -> str:
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n" if event else f"data: {payload}\n\n"
+
+def create_app(config: Optional[FakeOpenAIConfig] = None) -> FastAPI:
+    """
+    Build the fake API server.
+
+    Args:
+        config: Server behaviour (defaults to FakeOpenAIConfig())
+
+    Returns:
+        FastAPI application serving /v1/... endpoints
+    """
+    config = config or FakeOpenAIConfig()
+    rng = random.Random(config.seed)
+    limiter = _Limiter(config.requests_per_minute, config.tokens_per_minute)
+    counters: Counter = Counter()
+    fake = FastAPI(title="Fake OpenAI API")
+
+    def admit(tokens: int) -> Optional[JSONResponse]:
+        """Apply rate limits and random failures; return an error response or None."""
+        limited = limiter.check(tokens)
+        if limited is not None:
+            kind, retry_after = limited
+            counters["429"] += 1
+            return _error(
+                429, f"Rate limit reached for {kind} per min.", kind, "rate_limit_exceeded",
+                headers={
+                    "retry-after": f"{retry_after:.0f}",
+                    "x-ratelimit-remaining-requests": str(max(0, config.requests_per_minute - limiter.requests)),
+                    "x-ratelimit-remaining-tokens": str(max(0, config.tokens_per_minute - limiter.tokens)),
+                },
+            )
+        if rng.random() < config.error_rate:
+            counters["500"] += 1
+            return _error(500, "The server had an error while processing your request.",
+                          "server_error")
+        counters["200"] += 1
+        return None
+
+    def first_token_delay() -> float:
+        return config.latency * rng.lognormvariate(0, config.latency_sigma)
+
+    async def paced(deltas) -> AsyncIterator[str]:
+        """Yield deltas at the configured token rate after the first-token delay."""
+        await asyncio.sleep(first_token_delay())
+        interval = 1 / config.tokens_per_second if config.tokens_per_second > 0 else 0
+        for delta in deltas:
+            yield delta
+            if interval:
+                await asyncio.sleep(interval)
+
+    async def generation_time(tokens: int) -> None:
+        rate = config.tokens_per_second
+        await asyncio.sleep(first_token_delay() + (tokens / rate if rate > 0 else 0))
+
+    @fake.post("/v1/responses")
+    async def responses(request: Request):
+        body = await request.json()
+        prompt = json.dumps([body.get("instructions"), body.get("input")])
+        input_tokens = _count_tokens(prompt)
+        failure = admit(input_tokens + config.output_tokens)
+        if failure is not None:
+            return failure
+
+        text = _fake_text(prompt, config.output_tokens)
+        response_id = f"resp_{uuid.uuid4().hex}"
+        message_id = f"msg_{uuid.uuid4().hex}"
+        usage = {
+            "input_tokens": input_tokens,
+            "input_tokens_details": {"cached_tokens": 0},
+            "output_tokens": config.output_tokens,
+            "output_tokens_details": {"reasoning_tokens": 0},
+            "total_tokens": input_tokens + config.output_tokens,
+        }
+
+        def response_object(status: str, output: list, with_usage: bool) -> dict:
+            return {
+                "id": response_id,
+                "object": "response",
+                "created_at": int(time.time()),
+                "model": body.get("model", "gpt-4o"),
+                "status": status,
+                "output": output,
+                "parallel_tool_calls": True,
+                "tool_choice": "auto",
+                "tools": [],
+                "usage": usage if with_usage else None,
+            }
+
+        def message(status: str, content_text: Optional[str]) -> dict:
+            content = [] if content_text is None else [
+                {"type": "output_text", "text": content_text, "annotations": []}
+            ]
+            return {"type": "message", "id": message_id, "status": status,
+                    "role": "assistant", "content": content}
+
+        if not body.get("stream"):
+            await generation_time(config.output_tokens)
+            return response_object("completed", [message("completed", text)], True)
+
+        async def events():
+            seq = 0
+
+            def event(event_type: str, **fields) -> str:
+                nonlocal seq
+                seq += 1
+                return _sse(event_type, dict(type=event_type, sequence_number=seq, **fields))
+
+            yield event("response.created", response=response_object("in_progress", [], False))
+            yield event("response.output_item.added", output_index=0,
+                        item=message("in_progress", None))
+            part = {"type": "output_text", "text": "", "annotations": []}
+            yield event("response.content_part.added", item_id=message_id, output_index=0,
+                        content_index=0, part=part)
+            async for delta in paced(_split_deltas(text, config.output_tokens)):
+                yield event("response.output_text.delta", item_id=message_id, output_index=0,
+                            content_index=0, delta=delta, logprobs=[])
+            yield event("response.output_text.done", item_id=message_id, output_index=0,
+                        content_index=0, text=text, logprobs=[])
+            yield event("response.content_part.done", item_id=message_id, output_index=0,
+                        content_index=0, part=dict(part, text=text))
+            yield event("response.output_item.done", output_index=0,
+                        item=message("completed", text))
+            yield event("response.completed",
+                        response=response_object("completed", [message("completed", text)], True))
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @fake.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        prompt = json.dumps(body.get("messages"))
+        input_tokens = _count_tokens(prompt)
+        failure = admit(input_tokens + config.output_tokens)
+        if failure is not None:
+            return failure
+
+        text = _fake_text(prompt, config.output_tokens)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex}"
+        created = int(time.time())
+        model = body.get("model", "gpt-4o")
+        usage = {"prompt_tokens": input_tokens, "completion_tokens": config.output_tokens,
+                 "total_tokens": input_tokens + config.output_tokens}
+
+        if not body.get("stream"):
+            await generation_time(config.output_tokens)
+            return {
+                "id": completion_id, "object": "chat.completion", "created": created, "model": model,
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": text}}],
+                "usage": usage,
+            }
+
+        def chunk(delta: dict, finish_reason: Optional[str] = None, with_usage: bool = False) -> str:
+            return _sse(None, {
+                "id": completion_id, "object": "chat.completion.chunk", "created": created,
+                "model": model,
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+                "usage": usage if with_usage else None,
+            })
+
+        async def events():
+            yield chunk({"role": "assistant", "content": ""})
+            async for delta in paced(_split_deltas(text, config.output_tokens)):
+                yield chunk({"content": delta})
+            yield chunk({}, finish_reason="stop", with_usage=True)
+            yield _sse(None, "[DONE]")
+
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    @fake.post("/v1/audio/speech")
+    async def audio_speech(request: Request):
+        body = await request.json()
+        text = body.get("input", "")
+        failure = admit(0)
+        if failure is not None:
+            return failure
+        await asyncio.sleep(len(text) * config.tts_seconds_per_char)
+        size = len(text) * config.audio_bytes_per_char
+        # ID3 header followed by filler; enough for clients that sniff the format
+        audio = b"ID3\x04\x00\x00\x00\x00\x00\x00" + bytes(size)
+        return Response(audio, media_type="audio/mpeg")
+
+    @fake.get("/stats")
+    async def stats():
+        return {"config": asdict(config), "responses": dict(counters)}
+
+    return fake
+
+def main() -> None:
+    defaults = FakeOpenAIConfig()
+    parser = argparse.ArgumentParser(description="Fake OpenAI-compatible API server for load testing")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--latency", type=float, default=defaults.latency,
+                        help="Median seconds to first token")
+    parser.add_argument("--latency-sigma", type=float, default=defaults.latency_sigma)
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--output-tokens", type=int, default=defaults.output_tokens)
+    parser.add_argument("--error-rate", type=float, default=defaults.error_rate,
+                        help="Fraction of requests answered with a 500")
+    parser.add_argument("--rpm", type=int, default=defaults.requests_per_minute,
+                        help="Requests per minute before 429s (0 = unlimited)")
+    parser.add_argument("--tpm", type=int, default=defaults.tokens_per_minute,
+                        help="Tokens per minute before 429s (0 = unlimited)")
+    parser.add_argument("--tts-seconds-per-char", type=float, default=defaults.tts_seconds_per_char)
+    parser.add_argument("--audio-bytes-per-char", type=int, default=defaults.audio_bytes_per_char)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    import uvicorn
+
+    config = FakeOpenAIConfig(
+        latency=args.latency,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        output_tokens=args.output_tokens,
+        error_rate=args.error_rate,
+        requests_per_minute=args.rpm,
+        tokens_per_minute=args.tpm,
+        tts_seconds_per_char=args.tts_seconds_per_char,
+        audio_bytes_per_char=args.audio_bytes_per_char,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
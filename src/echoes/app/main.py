@@ -1,35 +1,58 @@
 """Main FastAPI application for Echoes."""
 
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
 from fastapi import FastAPI, Request
-from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from .routers.story import router as story_router
 from .routers.chat import router as chat_router
-from .settings import PROJECT_NAME
+from .routers.stats import router as stats_router
+from .routers.media import router as media_router
+from .routers.metrics import router as metrics_router
+from .settings import PROJECT_NAME, settings
+from ..services.openai_client import close_async_openai_client
+from ..services.retention import media_retention
+from ..workflows.jobs import story_jobs
 from .. import __version__
 
 # Get the project root directory
 PROJECT_ROOT = Path(__file__).parent.parent.parent.parent
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start and stop shared resources with the application."""
+    sweeper = None
+    if settings.media_sweep_interval_seconds > 0:
+        sweeper = asyncio.create_task(media_retention.run_periodically(
+            settings.media_sweep_interval_seconds, dry_run=settings.media_sweep_dry_run))
+    story_jobs.start()
+    yield
+    await story_jobs.stop()
+    if sweeper is not None:
+        sweeper.cancel()
+        await asyncio.gather(sweeper, return_exceptions=True)
+    await close_async_openai_client()
+
 app = FastAPI(
     title=PROJECT_NAME,
     description="AI-powered historical interactive learning platform",
-    version=__version__
+    version=__version__,
+    lifespan=lifespan
 )
 
-# Mount static files
-static_dir = PROJECT_ROOT / "static"
-if static_dir.exists():
-    app.mount("/static", StaticFiles(directory=str(static_dir)), name="static")
-
 # Templates
 templates_dir = PROJECT_ROOT / "templates"
 templates = Jinja2Templates(directory=str(templates_dir))
 
 app.include_router(story_router, prefix="/api", tags=["Story Generation"])
 app.include_router(chat_router, prefix="/api", tags=["Interactive Chat"])
+app.include_router(stats_router, prefix="/api", tags=["Health"])
+# Generated media (audio/video) under /static, with Range and caching support
+app.include_router(media_router, tags=["Media"])
+# Prometheus scrape endpoint
+app.include_router(metrics_router, tags=["Health"])
 
 @app.get("/", tags=["Web Interface"])
 def homepage(request: Request):
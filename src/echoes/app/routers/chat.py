@@ -1,41 +1,147 @@
 """Router for chat interactions."""
 
+import time
+from typing import Optional
 from fastapi import APIRouter, HTTPException
-from agents import Runner
+from fastapi.responses import StreamingResponse
 from ...schemas.chat import ChatRequest, ChatResponse
-from ...agents.qa_agent import build_qa_agent
-from ...app.settings import MODEL
+from ...agents.registry import agent_registry
+from ...services.llm_scheduler import PRIORITY_INTERACTIVE, llm_scheduler
+from ...services.faq_index import faq_fast_path
+from ...services.metrics import metrics
+from ...services.retrieval import StoryRetriever
+from ...services.text import estimate_tokens
+from ...services.story_sessions import StorySession, story_sessions
+from ...app.settings import MODEL, settings
+from ..sse import SSE_HEADERS, format_sse
 
 router = APIRouter()
 
+def _story_session(request: ChatRequest) -> Optional[StorySession]:
+    """Return the server-side session a chat turn refers to, if any."""
+    if not request.story_id:
+        return None
+    session = story_sessions.get(request.story_id)
+    if session is None and not request.story_context:
+        raise HTTPException(status_code=404, detail="Unknown or expired story_id")
+    return session
+
+def _chat_context(request: ChatRequest, session: Optional[StorySession]) -> str:
+    """Return the story context for a question, narrowed to the token budget."""
+    budget = settings.chat_context_token_budget
+    if session is not None:
+        retriever = session.retriever
+    elif budget <= 0 or estimate_tokens(request.story_context) <= budget:
+        return request.story_context
+    else:
+        # Raw context with no session to hold an index; build a one-off
+        retriever = StoryRetriever([(None, request.story_context)])
+    return retriever.context_for(request.question, budget, top_k=settings.chat_retrieval_top_k)
+
+def _chat_prompt(context: str, question: str) -> str:
+    # Context first and question last, so turns about the same story
+    # share a prompt prefix
+    return f"""Context:
+{context}
+
+Q: {question}
+A:"""
+
 @router.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
     """
     Interactive chat about a historical story.
     
-    Takes a story context and a user question, then uses the QA agent
-    to provide an informed answer based on the context.
+    Takes a story (by ``story_id`` from /api/story, or as raw
+    ``story_context``) and a user question, then uses the QA agent to
+    provide an informed answer based on the story. Questions that closely
+    match one of the story's FAQ entries are answered from the FAQ
+    without calling the model (``source`` is then ``"faq"``).
     
     Args:
-        request: ChatRequest with story_context and question fields
+        request: ChatRequest with question and story_id or story_context
     
     Returns:
         ChatResponse with the answer
     """
+    start = time.perf_counter()
+    session = _story_session(request)
+    if session is not None:
+        faq_answer = faq_fast_path.answer(session.faq_index, request.question)
+        if faq_answer is not None:
+            metrics.chat_seconds.observe(time.perf_counter() - start, endpoint="chat", source="faq")
+            return ChatResponse(answer=faq_answer, source="faq")
+    context = _chat_context(request, session)
     try:
-        # Instantiate QA agent
-        qa = build_qa_agent(MODEL)
+        # Shared QA agent (built once per model)
+        qa = agent_registry.get("qa", MODEL)
         
-        # Build prompt with context and question
-        prompt = f"""Context:
-{request.story_context}
-
-Q: {request.question}
-A:"""
+        prompt = _chat_prompt(context, request.question)
         
-        # Get answer from agent
-        answer = str((await Runner.run(qa, prompt)).final_output)
+        # Get answer from agent, ahead of queued story generation
+        result = await llm_scheduler.run(qa, prompt, priority=PRIORITY_INTERACTIVE)
+        answer = str(result.final_output)
         
+        metrics.chat_seconds.observe(time.perf_counter() - start, endpoint="chat", source="llm")
         return ChatResponse(answer=answer)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to process chat: {str(e)}")
\ No newline at end of file
+        metrics.chat_errors.inc(endpoint="chat")
+        raise HTTPException(status_code=500, detail=f"Failed to process chat: {str(e)}")
+
+@router.post("/chat/stream")
+async def chat_stream(request: ChatRequest):
+    """
+    Interactive chat about a historical story, streamed as Server-Sent Events.
+
+    Emits a ``delta`` event (``{"text": ...}``) for each chunk of the answer
+    as the model produces it, then a ``complete`` event with the full
+    ``answer`` and token ``usage``, or an ``error`` event on failure.
+    FAQ matches (see /api/chat) arrive as a single delta with no usage.
+
+    Args:
+        request: ChatRequest with question and story_id or story_context
+
+    Returns:
+        text/event-stream response
+    """
+    start = time.perf_counter()
+    session = _story_session(request)
+    faq_answer = (faq_fast_path.answer(session.faq_index, request.question)
+                  if session is not None else None)
+    if faq_answer is not None:
+        async def faq_events():
+            yield format_sse("delta", {"text": faq_answer})
+            yield format_sse("complete", {"answer": faq_answer, "source": "faq", "usage": None})
+            metrics.chat_seconds.observe(time.perf_counter() - start,
+                                         endpoint="chat_stream", source="faq")
+
+        return StreamingResponse(faq_events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+    context = _chat_context(request, session)
+    qa = agent_registry.get("qa", MODEL)
+    prompt = _chat_prompt(context, request.question)
+
+    async def events():
+        try:
+            async for event, data in llm_scheduler.stream(qa, prompt, priority=PRIORITY_INTERACTIVE):
+                if event == "delta":
+                    yield format_sse("delta", {"text": data})
+                else:
+                    usage = data.context_wrapper.usage
+                    yield format_sse("complete", {
+                        "answer": str(data.final_output),
+                        "source": "llm",
+                        "usage": {
+                            "requests": usage.requests,
+                            "input_tokens": usage.input_tokens,
+                            "output_tokens": usage.output_tokens,
+                            "total_tokens": usage.total_tokens,
+                        },
+                    })
+                    metrics.chat_seconds.observe(time.perf_counter() - start,
+                                                 endpoint="chat_stream", source="llm")
+        except Exception as e:
+            metrics.chat_errors.inc(endpoint="chat_stream")
+            yield format_sse("error", {"detail": f"Failed to process chat: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
@@ -0,0 +1,82 @@
+"""Router for serving generated media files."""
+
+import asyncio
+import os
+import re
+import stat
+from pathlib import Path
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import FileResponse, Response
+from ...services import storage
+from ...services.retention import media_retention
+from ...services.storage import STAGING_SUFFIX
+
+router = APIRouter()
+
+# Content-addressed objects are named by their SHA-256 (see StorageBackend)
+_CONTENT_HASH = re.compile(r"^[0-9a-f]{64}$")
+
+# Content-addressed files never change, so clients may cache them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+def _resolve(object_path: str) -> Path:
+    """Map a URL path to a file under the storage backend's root, or raise 404."""
+    # Only local backends have a root; staging files are still being written
+    root = getattr(storage.storage_backend, "root", None)
+    if root is None or object_path.endswith(STAGING_SUFFIX):
+        raise HTTPException(status_code=404, detail="Not found")
+    root = Path(root).resolve()
+    path = (root / object_path).resolve()
+    if root not in path.parents:
+        raise HTTPException(status_code=404, detail="Not found")
+    return path
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+@router.api_route("/static/{object_path:path}", methods=["GET", "HEAD"])
+async def serve_media(object_path: str, request: Request):
+    """
+    Serve a generated media file.
+
+    Supports HTTP Range requests (for seeking), conditional requests via
+    If-None-Match, and zero-copy transfer on servers that implement the
+    ASGI pathsend extension. Content-addressed files get a strong ETag
+    equal to their content hash and an immutable Cache-Control header.
+
+    Args:
+        object_path: Path relative to the media directory
+
+    Returns:
+        File contents, a 206 partial response, or 304 Not Modified
+    """
+    path = _resolve(object_path)
+    try:
+        stat_result = await asyncio.to_thread(os.stat, path)
+    except (FileNotFoundError, NotADirectoryError):
+        raise HTTPException(status_code=404, detail="Not found")
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise HTTPException(status_code=404, detail="Not found")
+    media_retention.record_access(object_path)
+
+    headers = {}
+    if _CONTENT_HASH.match(path.stem):
+        headers["ETag"] = f'"{path.stem}"'
+        headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        # Legacy, non-addressed files: let clients revalidate
+        headers["Cache-Control"] = "no-cache"
+
+    response = FileResponse(path, headers=headers, stat_result=stat_result)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and _etag_matches(if_none_match, response.headers["etag"]):
+        not_modified = {
+            "ETag": response.headers["etag"],
+            "Cache-Control": response.headers["cache-control"],
+        }
+        return Response(status_code=304, headers=not_modified)
+
+    return response
@@ -0,0 +1,21 @@
+"""Router for Prometheus metrics."""
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from ...services.metrics import metrics
+
+router = APIRouter()
+
+# Content type of the Prometheus text exposition format
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """
+    Export per-stage and chat latency histograms, token usage and cost,
+    TTS volume, cache lookups and error counters for Prometheus.
+
+    Returns:
+        Metrics in the Prometheus text exposition format
+    """
+    return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,54 @@
+"""Router for runtime statistics."""
+
+import asyncio
+
+from fastapi import APIRouter
+from ...agents.prompts import prompt_registry
+from ...services.audio_cache import audio_cache
+from ...services.cassette import cassette
+from ...services.faq_index import faq_fast_path
+from ...services.llm_scheduler import llm_scheduler
+from ...services.metrics import metrics
+from ...services.retention import media_retention
+from ...services.storage import storage_backend
+from ...services.story_cache import story_cache
+from ...services.story_sessions import story_sessions
+from ...workflows.jobs import story_jobs
+from ...workflows.story_pipeline import story_flights
+
+router = APIRouter()
+
+@router.get("/stats")
+def stats():
+    """
+    Report runtime counters used to size caches and pools.
+
+    Returns:
+        Dictionary of per-component statistics
+    """
+    return {
+        "prompts": {"version": prompt_registry.version, "files": prompt_registry.versions()},
+        "story_cache": story_cache.stats() if story_cache is not None else None,
+        "audio_cache": audio_cache.stats() if audio_cache is not None else None,
+        "storage": storage_backend.stats(),
+        "media_retention": media_retention.stats(),
+        "story_jobs": story_jobs.stats(),
+        "story_coalescing": story_flights.stats(),
+        "llm_scheduler": llm_scheduler.stats(),
+        "story_sessions": story_sessions.stats(),
+        "faq_fast_path": faq_fast_path.stats(),
+        "cassette": cassette.stats(),
+        "latency": metrics.stats(),
+    }
+
+@router.get("/stats/retention")
+async def retention_report():
+    """
+    Report what a media retention sweep would delete right now.
+
+    This is a dry run; nothing is removed.
+
+    Returns:
+        Sweep report with directory totals, budget and files to evict
+    """
+    return await asyncio.to_thread(media_retention.sweep, True)
@@ -1,9 +1,12 @@
 """Router for story generation."""
 
 from fastapi import APIRouter, HTTPException
-from ...schemas.story import StoryRequest, StoryResponse
-from ...workflows.story_pipeline import generate_story_experience
+from fastapi.responses import StreamingResponse
+from ...schemas.story import StoryJobResponse, StoryRequest, StoryResponse
+from ...workflows.jobs import JobQueueFull, StoryJob, story_jobs
+from ...workflows.story_pipeline import get_story_experience, stream_story_experience
 from ...app.settings import MODEL
+from ..sse import SSE_HEADERS, format_sse
 
 router = APIRouter()
 
@@ -18,6 +21,8 @@ async def generate_story(request: StoryRequest):
     - Related FAQ questions and answers
     - Audio narration URL (mocked)
     - Video animation URL (mocked)
+
+    Repeat topics are served from the story cache.
     
     Args:
         request: StoryRequest with topic field
@@ -26,7 +31,95 @@ async def generate_story(request: StoryRequest):
         StoryResponse with all generated content and media URLs
     """
     try:
-        result = await generate_story_experience(request.topic, MODEL)
+        result = await get_story_experience(request.topic, MODEL)
         return StoryResponse(**result)
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Failed to generate story: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Failed to generate story: {str(e)}")
+
+@router.post("/story/stream")
+async def stream_story(request: StoryRequest):
+    """
+    Generate a story experience, streaming artifacts as Server-Sent Events.
+
+    Emits one event per artifact as soon as its pipeline stage finishes:
+    ``brief``, ``story``, ``system_prompt``, ``faq``, ``audio_url`` and
+    ``video_url`` (stages that run concurrently may arrive in any order).
+    A final ``complete`` event carries the full StoryResponse, or an
+    ``error`` event carries the failure detail.
+
+    Args:
+        request: StoryRequest with topic field
+
+    Returns:
+        text/event-stream response
+    """
+    async def events():
+        try:
+            async for event, data in stream_story_experience(request.topic, MODEL):
+                if event == "complete":
+                    data = StoryResponse(**data).model_dump()
+                yield format_sse(event, data)
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Failed to generate story: {str(e)}"})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers=SSE_HEADERS)
+
+
+def _job_response(job: StoryJob) -> StoryJobResponse:
+    # Stories served from the cache finish without running any stage, so
+    # nothing is pending once a job is done
+    pending = [] if job.done else [name for name in job.stage_names
+                                   if name not in job.stage_seconds]
+    return StoryJobResponse(
+        job_id=job.id,
+        status=job.status,
+        topic=job.topic,
+        queue_position=story_jobs.position(job),
+        completed_stages=dict(job.stage_seconds),
+        pending_stages=pending,
+        result=StoryResponse(**job.result) if job.result is not None else None,
+        error=f"Failed to generate story: {job.error}" if job.error is not None else None,
+    )
+
+@router.post("/story/jobs", response_model=StoryJobResponse, status_code=202)
+async def submit_story_job(request: StoryRequest):
+    """
+    Queue a story generation and return immediately.
+
+    A bounded pool of background workers runs the pipeline; poll
+    ``GET /api/story/jobs/{job_id}`` for stage progress and the result.
+
+    Args:
+        request: StoryRequest with topic field
+
+    Returns:
+        StoryJobResponse for the queued job (202 Accepted)
+
+    Raises:
+        HTTPException: 429 with Retry-After when the job queue is full
+    """
+    try:
+        job = story_jobs.submit(request.topic, MODEL)
+    except JobQueueFull as e:
+        raise HTTPException(
+            status_code=429,
+            detail="Story job queue is full",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+    return _job_response(job)
+
+@router.get("/story/jobs/{job_id}", response_model=StoryJobResponse)
+async def get_story_job(job_id: str):
+    """
+    Report the progress of a story job.
+
+    Args:
+        job_id: Identifier returned by POST /api/story/jobs
+
+    Returns:
+        StoryJobResponse with completed stages and, once done, the result
+    """
+    job = story_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job id")
+    return _job_response(job)
@@ -1,6 +1,7 @@
 """Application settings."""
 
 import os
+from typing import Dict
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from dotenv import load_dotenv
 
@@ -21,6 +22,69 @@ class Settings(BaseSettings):
     azure_openai_endpoint: str = ""
     azure_openai_api_key: str = ""
 
+    # Re-read prompt files when they change on disk (development convenience)
+    prompt_hot_reload: bool = False
+
+    # Shared OpenAI HTTP connection pool (TTS and other direct API calls)
+    openai_pool_size: int = 20
+    openai_keepalive_seconds: float = 30.0
+    openai_timeout_seconds: float = 120.0
+    # Alternative API endpoint for agents and TTS, e.g. the local fake server
+    # (python -m echoes.app.fake_openai) at http://127.0.0.1:8100/v1
+    openai_base_url: str = ""
+
+    # TTS chunking: the speech API accepts at most 4096 characters per call
+    tts_chunk_chars: int = 4000
+    tts_max_parallel: int = 4
+    tts_cache_max_bytes: int = 64 * 1024 * 1024  # 0 disables the audio cache
+
+    # Story result cache
+    story_cache_enabled: bool = True
+    story_cache_max_entries: int = 128
+    story_cache_ttl_seconds: int = 7 * 24 * 3600
+    story_cache_dir: str = ""  # Defaults to <project>/.cache/stories
+
+    # Generated media retention (0 disables a limit)
+    media_max_bytes: int = 2 * 1024 * 1024 * 1024
+    media_max_files: int = 10000
+    media_min_age_seconds: float = 600.0
+    media_sweep_interval_seconds: float = 300.0  # 0 disables the background sweeper
+    media_sweep_dry_run: bool = False
+
+    # Background story jobs (POST /api/story/jobs)
+    story_job_workers: int = 4
+    story_job_queue_depth: int = 100
+    story_job_max_finished: int = 1000  # finished jobs kept for polling
+    story_job_retry_after_seconds: int = 30  # until average job time is known
+
+    # LLM call scheduling (0 disables a limit); set these to your account's quota
+    llm_requests_per_minute: int = 500
+    llm_tokens_per_minute: int = 0
+    llm_model_limits: Dict[str, Dict[str, int]] = {}  # e.g. {"gpt-4o": {"rpm": 500, "tpm": 30000}}
+    llm_max_retries: int = 4
+    llm_backoff_base_seconds: float = 1.0
+    llm_backoff_max_seconds: float = 30.0
+    # USD per million tokens, for the cost metric on /metrics; check current pricing
+    llm_token_prices: Dict[str, Dict[str, float]] = {"gpt-4o": {"input": 2.5, "output": 10.0}}
+
+    # Story sessions that /api/chat requests refer to by story_id
+    story_session_max: int = 1024
+    story_session_ttl_seconds: int = 24 * 3600
+
+    # Answer chat questions from the story's FAQ when cosine similarity to
+    # an FAQ question reaches this threshold (above 1 disables the fast path)
+    faq_match_threshold: float = 0.75
+
+    # Chat context larger than this (estimated tokens) is narrowed to a
+    # summary plus the top-k BM25 passages for the question (0 = no limit)
+    chat_context_token_budget: int = 2000
+    chat_retrieval_top_k: int = 4
+
+    # Record agent and TTS calls to disk, or replay them without the API
+    # ("off", "record" or "replay")
+    cassette_mode: str = "off"
+    cassette_dir: str = ""  # Defaults to <project>/.cache/cassettes
+
 # Singleton settings instance
 settings = Settings()
 
@@ -0,0 +1,23 @@
+"""Helpers for Server-Sent Events responses."""
+
+import json
+from typing import Any
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    # Stop reverse proxies (nginx) from buffering the stream
+    "X-Accel-Buffering": "no",
+}
+
+def format_sse(event: str, data: Any) -> str:
+    """
+    Encode a single SSE message.
+
+    Args:
+        event: Event type (the client's ``event:`` field)
+        data: JSON-serializable payload
+
+    Returns:
+        The wire-format message, terminated by a blank line
+    """
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -1,12 +1,26 @@
 """Schemas for chat data."""
 
-from pydantic import BaseModel
+from typing import Optional
+from pydantic import BaseModel, model_validator
 
 class ChatRequest(BaseModel):
-    """Request for interactive chat about a story."""
-    story_context: str
+    """
+    Request for interactive chat about a story.
+
+    Refer to a generated story by ``story_id`` (from StoryResponse), or
+    send the full ``story_context`` for stories the server doesn't hold.
+    """
     question: str
+    story_id: Optional[str] = None
+    story_context: Optional[str] = None
+
+    @model_validator(mode="after")
+    def _require_story(self):
+        if not self.story_id and not self.story_context:
+            raise ValueError("Either story_id or story_context is required")
+        return self
 
 class ChatResponse(BaseModel):
     """Response with answer to user's question."""
-    answer: str
\ No newline at end of file
+    answer: str
+    source: str = "llm"  # "faq" when answered from the story's FAQ
\ No newline at end of file
@@ -1,7 +1,7 @@
 """Schemas for story data."""
 
 from pydantic import BaseModel
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 
 class StoryRequest(BaseModel):
     """Request to generate a historical story."""
@@ -15,4 +15,16 @@ class StoryResponse(BaseModel):
     system_prompt: str
     faq: Union[List[str], str]  # Allow list or stringified JSON
     audio_url: str
-    video_url: str
\ No newline at end of file
+    video_url: str
+    story_id: Optional[str] = None  # pass to /api/chat instead of the story text
+
+class StoryJobResponse(BaseModel):
+    """Status of a background story generation job."""
+    job_id: str
+    status: str  # queued, running, completed or failed
+    topic: str
+    queue_position: Optional[int] = None  # jobs ahead of this one while queued
+    completed_stages: Dict[str, float] = {}  # stage name -> elapsed seconds
+    pending_stages: List[str] = []
+    result: Optional[StoryResponse] = None
+    error: Optional[str] = None
@@ -0,0 +1,109 @@
+"""Service for caching synthesized TTS audio segments."""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+from ..app.settings import settings
+
+def audio_cache_key(text: str, voice: str, model: str) -> str:
+    """
+    Build the content-addressed key for a synthesized segment.
+
+    Args:
+        text: Exact text sent to the TTS API (after styling and chunking)
+        voice: OpenAI TTS voice name
+        model: OpenAI TTS model name
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in (model, voice, text):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+class AudioCache:
+    """
+    In-memory LRU of MP3 bytes, bounded by total size.
+
+    Tracks hit rate and the number of audio bytes served from cache
+    instead of being synthesized again.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.bytes_saved = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Look up cached audio.
+
+        Args:
+            key: Key from audio_cache_key
+
+        Returns:
+            MP3 bytes, or None on a miss
+        """
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            self.bytes_saved += len(data)
+            return data
+
+    def set(self, key: str, data: bytes) -> None:
+        """
+        Store audio, evicting least recently used entries to stay in budget.
+
+        Args:
+            key: Key from audio_cache_key
+            data: MP3 bytes
+        """
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = data
+            self._size += len(data)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all cached audio (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> dict:
+        """Return hit rate, bytes saved and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "bytes_saved": self.bytes_saved,
+            }
+
+# Shared cache instance (None when disabled)
+audio_cache = AudioCache(settings.tts_cache_max_bytes) if settings.tts_cache_max_bytes > 0 else None
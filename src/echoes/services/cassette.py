@@ -0,0 +1,184 @@
+"""Service for recording and replaying agent and TTS calls."""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+from agents import RunContextWrapper, Usage
+
+from ..app.settings import settings
+from .audio_cache import audio_cache_key
+
+# Default on-disk location, next to the story cache
+DEFAULT_CASSETTE_DIR = Path(__file__).parent.parent.parent.parent / ".cache" / "cassettes"
+
+MODES = ("off", "record", "replay")
+
+_UNSAFE = re.compile(r"[^a-z0-9]+")
+
+class CassetteMiss(LookupError):
+    """Raised in replay mode when a call was never recorded."""
+
+@dataclass
+class ReplayedRun:
+    """
+    Recorded agent run, standing in for a RunResult.
+
+    Only the attributes Echoes reads are provided: ``final_output`` and
+    ``context_wrapper.usage``.
+    """
+    final_output: str
+    context_wrapper: RunContextWrapper
+
+def _slug(value: str) -> str:
+    return _UNSAFE.sub("-", value.lower()).strip("-") or "unnamed"
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    """Write to a temp file and rename so readers never see a partial file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+class Cassette:
+    """
+    Local recordings of LLM and TTS calls, for fast reproducible runs.
+
+    In ``record`` mode every agent run and speech synthesis goes to the API
+    as usual and is also saved to disk. In ``replay`` mode recorded calls
+    are served back instantly without touching the network, and an
+    unrecorded call raises CassetteMiss. ``off`` does neither.
+
+    Agent runs are keyed by agent name, model and a hash of the prompt and
+    the agent's instructions (so editing a prompt file invalidates its
+    recordings); speech by the same key as the audio cache.
+    """
+
+    def __init__(self, directory: Path, mode: str = "off"):
+        if mode not in MODES:
+            raise ValueError(f"Cassette mode must be one of {MODES}, got {mode!r}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self.misses = 0
+
+    @property
+    def recording(self) -> bool:
+        return self.mode == "record"
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def _run_path(self, agent: Any, prompt: str) -> Path:
+        name = getattr(agent, "name", "agent")
+        model = str(getattr(agent, "model", None) or settings.openai_model)
+        instructions = getattr(agent, "instructions", None)
+        digest = hashlib.sha256()
+        for part in (instructions if isinstance(instructions, str) else "", prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return self.directory / "agents" / f"{_slug(name)}--{_slug(model)}--{digest.hexdigest()}.json"
+
+    def _speech_path(self, text: str, voice: str, model: str) -> Path:
+        return self.directory / "tts" / f"{audio_cache_key(text, voice, model)}.mp3"
+
+    def load_run(self, agent: Any, prompt: str) -> ReplayedRun:
+        """
+        Return the recorded run of an agent on a prompt.
+
+        Args:
+            agent: Agent that would have been run
+            prompt: Input that would have been passed to Runner.run
+
+        Returns:
+            ReplayedRun with the recorded output and token usage
+
+        Raises:
+            CassetteMiss: If this call was never recorded
+        """
+        path = self._run_path(agent, prompt)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            self.misses += 1
+            raise CassetteMiss(f"No recording for agent '{getattr(agent, 'name', 'agent')}' "
+                               f"({path.name}); run once with CASSETTE_MODE=record") from None
+        self.replayed += 1
+        usage = Usage(**entry["usage"])
+        return ReplayedRun(final_output=entry["final_output"],
+                           context_wrapper=RunContextWrapper(context=None, usage=usage))
+
+    def save_run(self, agent: Any, prompt: str, result: Any) -> None:
+        """
+        Record an agent run.
+
+        Args:
+            agent: Agent that was run
+            prompt: Input passed to Runner.run
+            result: RunResult (or streamed result) of the run
+        """
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+        entry = {
+            "agent": getattr(agent, "name", "agent"),
+            "model": str(getattr(agent, "model", None) or settings.openai_model),
+            "recorded_at": time.time(),
+            "prompt": prompt,
+            "final_output": str(result.final_output),
+            "usage": {
+                "requests": getattr(usage, "requests", 0),
+                "input_tokens": getattr(usage, "input_tokens", 0),
+                "output_tokens": getattr(usage, "output_tokens", 0),
+                "total_tokens": getattr(usage, "total_tokens", 0),
+            },
+        }
+        data = json.dumps(entry, ensure_ascii=False, indent=2).encode("utf-8")
+        _write_atomic(self._run_path(agent, prompt), data)
+        self.recorded += 1
+
+    def load_speech(self, text: str, voice: str, model: str) -> bytes:
+        """
+        Return recorded MP3 bytes for a speech request.
+
+        Raises:
+            CassetteMiss: If this request was never recorded
+        """
+        path = self._speech_path(text, voice, model)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            self.misses += 1
+            raise CassetteMiss(f"No recording for {voice} speech ({path.name}); "
+                               f"run once with CASSETTE_MODE=record") from None
+        self.replayed += 1
+        return data
+
+    def save_speech(self, text: str, voice: str, model: str, audio: bytes) -> None:
+        """Record the MP3 bytes of a speech request."""
+        _write_atomic(self._speech_path(text, voice, model), audio)
+        self.recorded += 1
+
+    def stats(self) -> dict:
+        """Return the mode and record/replay counters."""
+        return {
+            "mode": self.mode,
+            "directory": str(self.directory),
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "misses": self.misses,
+        }
+
+# Shared cassette for agent and TTS calls
+cassette = Cassette(
+    directory=Path(settings.cassette_dir) if settings.cassette_dir else DEFAULT_CASSETTE_DIR,
+    mode=settings.cassette_mode,
+)
@@ -0,0 +1,167 @@
+"""Service for answering chat questions straight from a story's FAQ."""
+
+import json
+import math
+import re
+import threading
+import zlib
+from typing import Dict, List, Optional, Tuple, Union
+
+from ..app.settings import settings
+from .text import content_words, question_word
+
+# Size of the hashed feature space (collisions are rare for a handful of questions)
+_FEATURE_BUCKETS = 1 << 18
+
+_QUESTION_LINE = re.compile(r"^\W*q(?:uestion)?\s*\d*\s*[:.)]\s*(.*)$", re.IGNORECASE)
+_ANSWER_LINE = re.compile(r"^\W*a(?:nswer)?\s*\d*\s*[:.)]\s*(.*)$", re.IGNORECASE)
+
+def parse_faq(faq: Union[List[str], str]) -> List[Tuple[str, str]]:
+    """
+    Parse pipeline FAQ output into (question, answer) pairs.
+
+    Accepts the list of lines produced by the QA stage, a newline-joined
+    string, or a JSON-encoded list. Lines are expected as ``Q: ...``
+    followed by ``A: ...``; an answer may span several lines.
+
+    Args:
+        faq: FAQ as stored in the story result
+
+    Returns:
+        List of (question, answer) tuples
+    """
+    if isinstance(faq, str):
+        try:
+            decoded = json.loads(faq)
+        except ValueError:
+            decoded = None
+        lines = decoded if isinstance(decoded, list) else faq.splitlines()
+    else:
+        lines = faq
+
+    pairs: List[Tuple[str, str]] = []
+    question: Optional[str] = None
+    answer: List[str] = []
+    for line in (str(line).strip() for line in lines):
+        if not line:
+            continue
+        q_match = _QUESTION_LINE.match(line)
+        if q_match:
+            if question and answer:
+                pairs.append((question, " ".join(answer)))
+            question, answer = q_match.group(1).strip(), []
+            continue
+        a_match = _ANSWER_LINE.match(line)
+        if question is not None:
+            answer.append(a_match.group(1).strip() if a_match else line)
+    if question and answer:
+        pairs.append((question, " ".join(answer)))
+    return pairs
+
+def _features(text: str) -> Dict[int, int]:
+    """Hash unigrams and bigrams of content words into term counts."""
+    words = content_words(text)
+    terms = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    counts: Dict[int, int] = {}
+    for term in terms:
+        bucket = zlib.crc32(term.encode("utf-8")) % _FEATURE_BUCKETS
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+class FAQIndex:
+    """
+    Hashed TF-IDF vectors of FAQ questions, matched by cosine similarity.
+
+    Vectors are sparse dicts, so building and querying an index over a
+    handful of questions takes microseconds with no extra dependencies.
+    """
+
+    def __init__(self, pairs: List[Tuple[str, str]]):
+        self.pairs = pairs
+        counts = [_features(question) for question, _ in pairs]
+        n_docs = len(counts)
+        doc_freq: Dict[int, int] = {}
+        for doc in counts:
+            for bucket in doc:
+                doc_freq[bucket] = doc_freq.get(bucket, 0) + 1
+        # Smoothed IDF, so terms in every question still count a little
+        self._idf = {b: math.log((1 + n_docs) / (1 + df)) + 1 for b, df in doc_freq.items()}
+        self._default_idf = math.log(1 + n_docs) + 1
+        self._vectors = [self._vectorize(doc) for doc in counts]
+
+    def _vectorize(self, counts: Dict[int, int]) -> Dict[int, float]:
+        weights = {b: (1 + math.log(tf)) * self._idf.get(b, self._default_idf)
+                   for b, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        return {b: w / norm for b, w in weights.items()} if norm else {}
+
+    def best_match(self, question: str) -> Optional[Tuple[float, str, str]]:
+        """
+        Find the FAQ entry most similar to a question.
+
+        Args:
+            question: User question
+
+        Returns:
+            (cosine similarity, FAQ question, FAQ answer), or None if the
+            index is empty or nothing overlaps
+        """
+        query = self._vectorize(_features(question))
+        best: Optional[Tuple[float, str, str]] = None
+        for vector, (faq_q, faq_a) in zip(self._vectors, self.pairs):
+            small, large = (query, vector) if len(query) < len(vector) else (vector, query)
+            score = sum(w * large.get(b, 0.0) for b, w in small.items())
+            if score > 0 and (best is None or score > best[0]):
+                best = (score, faq_q, faq_a)
+        return best
+
+class FAQFastPath:
+    """
+    Answers chat questions from the FAQ when they closely match one.
+
+    Questions scoring at least ``threshold`` against an FAQ question, and
+    asking with the same question word, are answered with its stored
+    answer, skipping the LLM entirely.
+    """
+
+    def __init__(self, threshold: float = 0.75):
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.hits = 0
+
+    def answer(self, index: Optional[FAQIndex], question: str) -> Optional[str]:
+        """
+        Return the FAQ answer for a question, or None to fall back to the LLM.
+
+        Args:
+            index: FAQ index of the story being discussed (None if unavailable)
+            question: User question
+
+        Returns:
+            Answer text, or None
+        """
+        if index is None or self.threshold > 1:
+            return None
+        match = index.best_match(question)
+        hit = (match is not None and match[0] >= self.threshold
+               # Question words are not features, so "why" would score
+               # 1.0 against "when"; they have to agree separately
+               and question_word(question) == question_word(match[1]))
+        with self._lock:
+            self.lookups += 1
+            self.hits += hit
+        return match[2] if hit else None
+
+    def stats(self) -> dict:
+        """Return the threshold and hit rate."""
+        with self._lock:
+            return {
+                "threshold": self.threshold,
+                "lookups": self.lookups,
+                "hits": self.hits,
+                "hit_rate": self.hits / self.lookups if self.lookups else 0.0,
+            }
+
+# Shared fast path for /api/chat
+faq_fast_path = FAQFastPath(threshold=settings.faq_match_threshold)
@@ -0,0 +1,337 @@
+"""Shared scheduler for LLM agent calls."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import random
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+import openai
+from agents import Runner
+
+from ..app.settings import settings
+from .cassette import cassette
+from .metrics import metrics
+from .percentiles import summarize
+from .text import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0  # user-facing chat
+PRIORITY_BACKGROUND = 10  # story generation
+
+_PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background"}
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at ``per_minute`` per minute.
+
+    Holds at most one minute's worth of tokens. A rate of 0 means unlimited.
+    """
+
+    def __init__(self, per_minute: int):
+        self.per_minute = per_minute
+        self.capacity = float(per_minute)
+        self.tokens = float(per_minute)
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity,
+                          self.tokens + (now - self._updated) * self.per_minute / 60.0)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """Return seconds until ``amount`` tokens are available (0 if now)."""
+        if self.per_minute <= 0:
+            return 0.0
+        self._refill()
+        # A request larger than the whole bucket waits for a full bucket
+        needed = min(amount, self.capacity) - self.tokens
+        return max(0.0, needed * 60.0 / self.per_minute)
+
+    def take(self, amount: float) -> None:
+        """Consume tokens; the balance may go negative to record overuse."""
+        if self.per_minute > 0:
+            self._refill()
+            self.tokens -= amount
+
+    def give_back(self, amount: float) -> None:
+        """Return tokens that were reserved but not used."""
+        if self.per_minute > 0:
+            self._refill()
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+class _ModelLane:
+    """Rate limits and waiting callers for one model."""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.waiting: List[list] = []  # heap of [priority, sequence]
+        self.changed: Optional[asyncio.Condition] = None
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, (openai.RateLimitError, openai.APIConnectionError)):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+def _retry_after(error: Exception) -> Optional[float]:
+    """Return the server's Retry-After hint in seconds, if any."""
+    response = getattr(error, "response", None)
+    value = response.headers.get("retry-after") if response is not None else None
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+class LLMScheduler:
+    """
+    Admission control for Runner.run calls.
+
+    Every agent call waits for its model's request and token buckets, with
+    higher-priority callers (interactive chat) admitted before lower ones
+    (background story generation). Calls failing with 429, 5xx or
+    connection errors are retried with jittered exponential backoff,
+    honouring Retry-After when the API sends it. Time spent waiting for
+    admission is recorded per priority.
+    """
+
+    def __init__(self, requests_per_minute: int = 500, tokens_per_minute: int = 0,
+                 model_limits: Optional[Dict[str, Dict[str, int]]] = None,
+                 max_retries: int = 4, backoff_base: float = 1.0, backoff_max: float = 30.0,
+                 estimated_output_tokens: int = 1000):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.model_limits = model_limits or {}
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.estimated_output_tokens = estimated_output_tokens
+
+        self._lanes: Dict[str, _ModelLane] = {}
+        self._sequence = itertools.count()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._waits: Dict[str, deque] = {name: deque(maxlen=1000) for name in _PRIORITY_NAMES.values()}
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+
+    def _lane(self, model: str) -> _ModelLane:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            # Conditions and waiters belong to one event loop; bucket levels carry over
+            self._loop = loop
+            for lane in self._lanes.values():
+                lane.waiting = []
+                lane.changed = None
+        lane = self._lanes.get(model)
+        if lane is None:
+            limits = self.model_limits.get(model, {})
+            lane = _ModelLane(limits.get("rpm", self.requests_per_minute),
+                              limits.get("tpm", self.tokens_per_minute))
+            self._lanes[model] = lane
+        if lane.changed is None:
+            lane.changed = asyncio.Condition()
+        return lane
+
+    async def _admit(self, lane: _ModelLane, tokens: int, priority: int) -> None:
+        """Wait until this caller is first in line and both buckets allow it."""
+        entry = [priority, next(self._sequence)]
+        async with lane.changed:
+            heapq.heappush(lane.waiting, entry)
+            lane.changed.notify_all()
+            try:
+                while True:
+                    if lane.waiting[0] is entry:
+                        delay = max(lane.requests.wait_time(1), lane.tokens.wait_time(tokens))
+                        if delay == 0:
+                            lane.requests.take(1)
+                            lane.tokens.take(tokens)
+                            return
+                    else:
+                        delay = None
+                    try:
+                        # Woken early if someone with higher priority arrives
+                        await asyncio.wait_for(lane.changed.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                lane.waiting.remove(entry)
+                heapq.heapify(lane.waiting)
+                lane.changed.notify_all()
+
+    def _record_wait(self, priority: int, seconds: float) -> None:
+        name = _PRIORITY_NAMES.get(priority, "background")
+        with self._lock:
+            self._waits[name].append(seconds)
+
+    def _backoff(self, attempt: int, error: Exception) -> float:
+        hinted = _retry_after(error)
+        if hinted is not None:
+            return min(hinted, self.backoff_max)
+        # Full jitter: spread retries out so callers don't retry in lockstep
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def run(self, agent: Any, prompt: str, priority: int = PRIORITY_BACKGROUND) -> Any:
+        """
+        Run an agent once admitted by the rate limiter, retrying transient errors.
+
+        With the cassette in replay mode the recorded result is returned
+        without calling the API; in record mode each result is saved.
+
+        Args:
+            agent: Agent to run (its ``model`` selects the rate-limit lane)
+            prompt: Input passed to Runner.run
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+
+        Returns:
+            The RunResult from Runner.run
+        """
+        if cassette.replaying:
+            return cassette.load_run(agent, prompt)
+
+        model = str(getattr(agent, "model", None) or settings.openai_model)
+        estimate = estimate_tokens(prompt) + self.estimated_output_tokens
+        attempt = 0
+        while True:
+            lane = self._lane(model)
+            start = time.perf_counter()
+            await self._admit(lane, estimate, priority)
+            self._record_wait(priority, time.perf_counter() - start)
+            self.calls += 1
+            try:
+                result = await Runner.run(agent, prompt)
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    self.failures += 1
+                    metrics.llm_errors.inc(agent=getattr(agent, "name", "agent"), outcome="failed")
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                self.retries += 1
+                metrics.llm_errors.inc(agent=getattr(agent, "name", "agent"), outcome="retried")
+                logger.warning("LLM call to %s failed (%s); retry %d in %.1fs",
+                               model, e, attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+
+            self._settle(lane, estimate, result)
+            metrics.record_llm_usage(agent, result)
+            if cassette.recording:
+                cassette.save_run(agent, prompt, result)
+            return result
+
+    async def stream(self, agent: Any, prompt: str,
+                     priority: int = PRIORITY_BACKGROUND) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Stream an agent's answer once admitted by the rate limiter.
+
+        Yields ``("delta", text)`` for each chunk of output text as the
+        model produces it, then ``("complete", run_result)``. Transient
+        errors are retried like run() as long as no text has been yielded
+        yet; after that they are raised.
+
+        Args:
+            agent: Agent to run (its ``model`` selects the rate-limit lane)
+            prompt: Input passed to Runner.run_streamed
+            priority: PRIORITY_INTERACTIVE or PRIORITY_BACKGROUND
+
+        Yields:
+            Tuples of (event name, payload)
+        """
+        if cassette.replaying:
+            replayed = cassette.load_run(agent, prompt)
+            yield "delta", replayed.final_output
+            yield "complete", replayed
+            return
+
+        model = str(getattr(agent, "model", None) or settings.openai_model)
+        estimate = estimate_tokens(prompt) + self.estimated_output_tokens
+        attempt = 0
+        while True:
+            lane = self._lane(model)
+            start = time.perf_counter()
+            await self._admit(lane, estimate, priority)
+            self._record_wait(priority, time.perf_counter() - start)
+            self.calls += 1
+            streamed = False
+            result = Runner.run_streamed(agent, prompt)
+            try:
+                async for event in result.stream_events():
+                    if (event.type == "raw_response_event"
+                            and getattr(event.data, "type", None) == "response.output_text.delta"):
+                        streamed = True
+                        yield "delta", event.data.delta
+            except Exception as e:
+                if streamed or not _is_retryable(e) or attempt >= self.max_retries:
+                    self.failures += 1
+                    metrics.llm_errors.inc(agent=getattr(agent, "name", "agent"), outcome="failed")
+                    raise
+                delay = self._backoff(attempt, e)
+                attempt += 1
+                self.retries += 1
+                metrics.llm_errors.inc(agent=getattr(agent, "name", "agent"), outcome="retried")
+                logger.warning("LLM stream from %s failed (%s); retry %d in %.1fs",
+                               model, e, attempt, delay)
+                await asyncio.sleep(delay)
+                continue
+            finally:
+                if not result.is_complete:
+                    # Consumer went away mid-stream; stop the run
+                    result.cancel()
+
+            self._settle(lane, estimate, result)
+            metrics.record_llm_usage(agent, result)
+            if cassette.recording:
+                cassette.save_run(agent, prompt, result)
+            yield "complete", result
+            return
+
+    def _settle(self, lane: _ModelLane, estimate: int, result: Any) -> None:
+        """Settle a token reservation against what the call really used."""
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+        used = getattr(usage, "total_tokens", 0)
+        if used:
+            if used > estimate:
+                lane.tokens.take(used - estimate)
+            else:
+                lane.tokens.give_back(estimate - used)
+
+    def stats(self) -> dict:
+        """Return call counters, bucket levels and queue-wait percentiles."""
+        with self._lock:
+            waits = {name: list(values) for name, values in self._waits.items()}
+        no_waits = {"count": 0, "mean": 0.0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "failures": self.failures,
+            "models": {
+                model: {
+                    "waiting": len(lane.waiting),
+                    "requests_available": lane.requests.tokens if lane.requests.per_minute else None,
+                    "tokens_available": lane.tokens.tokens if lane.tokens.per_minute else None,
+                }
+                for model, lane in self._lanes.items()
+            },
+            "queue_wait_seconds": {name: summarize(values) or no_waits
+                                   for name, values in waits.items()},
+        }
+
+# Shared scheduler for every agent call
+llm_scheduler = LLMScheduler(
+    requests_per_minute=settings.llm_requests_per_minute,
+    tokens_per_minute=settings.llm_tokens_per_minute,
+    model_limits=settings.llm_model_limits,
+    max_retries=settings.llm_max_retries,
+    backoff_base=settings.llm_backoff_base_seconds,
+    backoff_max=settings.llm_backoff_max_seconds,
+)
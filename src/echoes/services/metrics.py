@@ -0,0 +1,239 @@
+"""Service for latency, token and cost metrics in Prometheus text format."""
+
+import math
+import threading
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from ..app.settings import settings
+from .percentiles import summarize
+
+# Upper bounds in seconds; LLM stages take from under a second to minutes
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0, 120.0, 300.0)
+
+LabelValues = Tuple[str, ...]
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(names: Iterable[str], values: Iterable[str]) -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(int(value)) if float(value).is_integer() else repr(value)
+
+class _Metric:
+    """Common label handling for counters and histograms."""
+
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = labelnames
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+class Counter(_Metric):
+    """Monotonically increasing total per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        """Add ``amount`` (must not be negative) to the labelled total."""
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        """Return the current total for a label set (0 if never incremented)."""
+        return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self._header() + [
+            f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+            for key, value in values
+        ]
+
+class _Series:
+    """Bucket counts, sum and a window of recent samples for one label set."""
+
+    def __init__(self, n_buckets: int, window: int):
+        self.bucket_counts = [0] * n_buckets
+        self.count = 0
+        self.sum = 0.0
+        self.recent: deque = deque(maxlen=window)
+
+class Histogram(_Metric):
+    """
+    Cumulative-bucket histogram per label set.
+
+    Buckets are rendered for Prometheus, where histogram_quantile() gives
+    percentiles over any time range. A window of the most recent samples
+    is also kept so quantiles() can report exact p50/p95/p99 locally.
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS, window: int = 1000):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self.window = window
+        self._series: Dict[LabelValues, _Series] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        """Record one sample (e.g. a duration in seconds)."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _Series(len(self.buckets), self.window)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series.bucket_counts[i] += 1
+                    break
+            series.count += 1
+            series.sum += value
+            series.recent.append(value)
+
+    def quantiles(self) -> Dict[str, dict]:
+        """
+        Return count and mean/p50/p95/p99/max of recent samples per label set.
+
+        Returns:
+            Mapping of comma-joined label values to summaries
+        """
+        with self._lock:
+            snapshot = {key: (series.count, sorted(series.recent))
+                        for key, series in self._series.items()}
+
+        # count is the all-time total; the percentiles cover the recent window
+        return {
+            ",".join(key): dict(summarize(recent), count=count)
+            for key, (count, recent) in sorted(snapshot.items()) if recent
+        }
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        with self._lock:
+            snapshot = sorted((key, list(s.bucket_counts), s.count, s.sum)
+                              for key, s in self._series.items())
+        for key, bucket_counts, count, total in snapshot:
+            cumulative = 0
+            for bound, n in zip(self.buckets, bucket_counts):
+                cumulative += n
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames + ("le",), key + ("+Inf",))
+            lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{self.name}_count{labels} {count}")
+        return lines
+
+class Metrics:
+    """
+    Every metric Echoes exports, with helpers for the instrumented call sites.
+
+    Token costs use ``llm_token_prices`` (USD per million input/output
+    tokens per model); models without a price get token counts only.
+    """
+
+    def __init__(self, token_prices: Optional[Dict[str, Dict[str, float]]] = None):
+        self.token_prices = token_prices or {}
+        self.stage_seconds = Histogram(
+            "echoes_stage_duration_seconds", "Duration of successful story pipeline stages.",
+            ("stage",))
+        self.stage_errors = Counter(
+            "echoes_stage_errors_total", "Story pipeline stages that raised an error.", ("stage",))
+        self.story_seconds = Histogram(
+            "echoes_story_duration_seconds", "Duration of complete story pipeline runs.")
+        self.chat_seconds = Histogram(
+            "echoes_chat_duration_seconds", "Duration of answered chat requests.",
+            ("endpoint", "source"))
+        self.chat_errors = Counter(
+            "echoes_chat_errors_total", "Chat requests that failed.", ("endpoint",))
+        self.llm_tokens = Counter(
+            "echoes_llm_tokens_total", "Tokens used by agent runs.", ("agent", "model", "type"))
+        self.llm_cost = Counter(
+            "echoes_llm_cost_usd_total", "Estimated cost of agent runs in US dollars.",
+            ("agent", "model"))
+        self.llm_errors = Counter(
+            "echoes_llm_errors_total", "Agent runs that failed, by whether they were retried.",
+            ("agent", "outcome"))
+        self.tts_characters = Counter(
+            "echoes_tts_characters_total", "Characters of text synthesized to speech.",
+            ("voice", "source"))
+        self.tts_bytes = Counter(
+            "echoes_tts_bytes_total", "Bytes of audio returned by speech synthesis.",
+            ("voice", "source"))
+        self.tts_errors = Counter(
+            "echoes_tts_errors_total", "Speech synthesis API calls that failed.")
+        self.cache_lookups = Counter(
+            "echoes_cache_lookups_total", "Story and audio cache lookups.", ("cache", "result"))
+
+    def _all(self) -> List[_Metric]:
+        return [m for m in vars(self).values() if isinstance(m, _Metric)]
+
+    def record_llm_usage(self, agent: Any, result: Any) -> None:
+        """
+        Count the tokens and cost of a finished agent run.
+
+        Args:
+            agent: Agent that was run (its name and model become labels)
+            result: RunResult whose ``context_wrapper.usage`` holds the token counts
+        """
+        usage = getattr(getattr(result, "context_wrapper", None), "usage", None)
+        if usage is None:
+            return
+        name = getattr(agent, "name", "agent")
+        model = str(getattr(agent, "model", None) or settings.openai_model)
+        self.llm_tokens.inc(usage.input_tokens, agent=name, model=model, type="input")
+        self.llm_tokens.inc(usage.output_tokens, agent=name, model=model, type="output")
+        prices = self.token_prices.get(model)
+        if prices:
+            cost = (usage.input_tokens * prices.get("input", 0.0)
+                    + usage.output_tokens * prices.get("output", 0.0)) / 1_000_000
+            self.llm_cost.inc(cost, agent=name, model=model)
+
+    def record_tts(self, text: str, voice: str, audio: bytes, source: str) -> None:
+        """Count the characters and audio bytes of one synthesized segment."""
+        self.tts_characters.inc(len(text), voice=voice, source=source)
+        self.tts_bytes.inc(len(audio), voice=voice, source=source)
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._all():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def stats(self) -> dict:
+        """Return recent p50/p95/p99 latencies for stages, stories and chat."""
+        return {
+            "stage_seconds": self.stage_seconds.quantiles(),
+            "story_seconds": self.story_seconds.quantiles().get(""),
+            "chat_seconds": self.chat_seconds.quantiles(),
+        }
+
+# Shared metrics for the whole process
+metrics = Metrics(token_prices=settings.llm_token_prices)
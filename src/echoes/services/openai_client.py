@@ -0,0 +1,88 @@
+"""Shared OpenAI client for services that call the API directly."""
+
+import asyncio
+import logging
+from typing import Optional, Set
+
+import httpx
+from agents import set_default_openai_client, set_tracing_disabled
+from openai import AsyncOpenAI
+from ..app.settings import OPENAI_API_KEY, settings
+
+logger = logging.getLogger(__name__)
+
+_client: Optional[AsyncOpenAI] = None
+_client_loop: Optional[asyncio.AbstractEventLoop] = None
+# Close tasks for replaced clients, kept referenced until they finish
+_closing: Set[asyncio.Task] = set()
+
+if settings.openai_base_url:
+    # Send agent runs to the same endpoint; traces would go there too, so skip them
+    set_default_openai_client(
+        AsyncOpenAI(api_key=OPENAI_API_KEY, base_url=settings.openai_base_url),
+        use_for_tracing=False,
+    )
+    set_tracing_disabled(True)
+
+def _build_client() -> AsyncOpenAI:
+    limits = httpx.Limits(
+        max_connections=settings.openai_pool_size,
+        max_keepalive_connections=settings.openai_pool_size,
+        keepalive_expiry=settings.openai_keepalive_seconds,
+    )
+    http_client = httpx.AsyncClient(
+        limits=limits,
+        timeout=httpx.Timeout(settings.openai_timeout_seconds, connect=10.0),
+    )
+    return AsyncOpenAI(
+        api_key=OPENAI_API_KEY,
+        base_url=settings.openai_base_url or None,
+        http_client=http_client,
+    )
+
+def get_async_openai_client() -> AsyncOpenAI:
+    """
+    Return the process-wide AsyncOpenAI client.
+
+    The client keeps a pool of up to ``OPENAI_POOL_SIZE`` keep-alive
+    connections, so repeated calls reuse TCP/TLS sessions instead of
+    reconnecting. Connections are bound to an event loop, so a new client
+    is created if the running loop changes (e.g. between CLI runs) and
+    the old one is closed.
+
+    Returns:
+        Shared AsyncOpenAI instance
+    """
+    global _client, _client_loop
+    loop = asyncio.get_running_loop()
+    if _client is None or _client_loop is not loop:
+        if _client is not None:
+            _retire(_client, _client_loop)
+        _client = _build_client()
+        _client_loop = loop
+    return _client
+
+def _retire(client: AsyncOpenAI, loop: asyncio.AbstractEventLoop) -> None:
+    """Close a client replaced because the running event loop changed."""
+    if loop.is_running():
+        # Its loop still serves another thread; close the pool there
+        asyncio.run_coroutine_threadsafe(client.close(), loop)
+        return
+    task = asyncio.get_running_loop().create_task(_close_stale(client))
+    _closing.add(task)
+    task.add_done_callback(_closing.discard)
+
+async def _close_stale(client: AsyncOpenAI) -> None:
+    try:
+        await client.close()
+    except Exception as e:
+        # Connections opened on a loop that has since closed can't be shut
+        # down cleanly, but the pool still drops them and their sockets
+        logger.debug("Closing a stale OpenAI client failed: %s", e)
+
+async def close_async_openai_client() -> None:
+    """Close the shared client and its connection pool (called on shutdown)."""
+    global _client, _client_loop
+    if _client is not None:
+        client, _client, _client_loop = _client, None, None
+        await client.close()
@@ -0,0 +1,38 @@
+"""Shared latency summaries for stats, metrics, batch reports and benchmarks."""
+
+from typing import Iterable, List, Optional
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+
+    Args:
+        ordered: Values sorted ascending (must not be empty)
+        fraction: Percentile as a fraction, e.g. 0.95
+
+    Returns:
+        The value at that rank
+    """
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+def summarize(values: Iterable[float]) -> Optional[dict]:
+    """
+    Return count/mean/p50/p95/p99/max of a set of samples.
+
+    Args:
+        values: Samples, e.g. durations in seconds
+
+    Returns:
+        Summary dict, or None if there are no samples
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    return {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered),
+        "p50": percentile(ordered, 0.50),
+        "p95": percentile(ordered, 0.95),
+        "p99": percentile(ordered, 0.99),
+        "max": ordered[-1],
+    }
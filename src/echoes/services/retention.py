@@ -0,0 +1,219 @@
+"""Service for bounding the size of the generated media directory."""
+
+import asyncio
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from ..app.settings import settings
+from .storage import ECHOES_TEMP_DIR, STAGING_SUFFIX
+from . import story_cache as story_cache_module
+
+logger = logging.getLogger(__name__)
+
+# Story result fields that may hold a media URL
+_MEDIA_FIELDS = ("audio_url", "video_url")
+
+@dataclass
+class _MediaFile:
+    key: str
+    size: int
+    last_access: float
+
+def referenced_media(results: Iterable[dict], url_prefix: str = "/static") -> Set[str]:
+    """
+    Collect the media keys referenced by story results.
+
+    Args:
+        results: Story result dicts (e.g. StoryCache.values())
+        url_prefix: URL prefix under which media is served
+
+    Returns:
+        Set of keys relative to the media directory (e.g. "ab/abcd....mp3")
+    """
+    prefix = url_prefix.rstrip("/") + "/"
+    keys = set()
+    for result in results:
+        for field in _MEDIA_FIELDS:
+            url = result.get(field)
+            if isinstance(url, str) and url.startswith(prefix):
+                keys.add(url[len(prefix):])
+    return keys
+
+def _cached_story_media() -> Set[str]:
+    # Looked up at call time so tests (and a disabled cache) are respected
+    cache = story_cache_module.story_cache
+    return referenced_media(cache.values()) if cache is not None else set()
+
+class MediaRetention:
+    """
+    Keeps the media directory within a byte and file-count budget.
+
+    When over budget, sweep() deletes the least recently accessed files
+    first. Last access is the newest of the file's mtime, its atime and
+    any access recorded through record_access() (the media route calls it
+    on every request). Protected files and files younger than
+    ``min_age_seconds`` (still being assembled into a story) are never
+    deleted. Orphaned staging files are removed once they are that old.
+    """
+
+    def __init__(self, root: Path, max_bytes: int = 0, max_files: int = 0,
+                 min_age_seconds: float = 600,
+                 protected: Optional[Callable[[], Set[str]]] = None):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.min_age_seconds = min_age_seconds
+        self.protected = protected or set
+
+        self._accessed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.sweeps = 0
+        self.files_evicted = 0
+        self.bytes_evicted = 0
+        self.last_report: Optional[dict] = None
+
+    def record_access(self, key: str) -> None:
+        """Note that the file at key (relative to root) was just read."""
+        with self._lock:
+            self._accessed[key] = time.time()
+
+    def _scan(self) -> tuple:
+        """Return (media files, stale staging files) under root."""
+        files: List[_MediaFile] = []
+        staging: List[Path] = []
+        now = time.time()
+        with self._lock:
+            accessed = dict(self._accessed)
+        for path in self.root.rglob("*"):
+            try:
+                st = path.stat()
+            except FileNotFoundError:
+                continue
+            if not path.is_file():
+                continue
+            if path.suffix == STAGING_SUFFIX:
+                if now - st.st_mtime > self.min_age_seconds:
+                    staging.append(path)
+                continue
+            key = path.relative_to(self.root).as_posix()
+            last_access = max(st.st_mtime, st.st_atime, accessed.get(key, 0.0))
+            files.append(_MediaFile(key, st.st_size, last_access))
+        return files, staging
+
+    def sweep(self, dry_run: bool = False) -> dict:
+        """
+        Evict least recently accessed files until the directory is in budget.
+
+        Blocks on file I/O; async callers should run it in a thread.
+
+        Args:
+            dry_run: Only report what would be deleted
+
+        Returns:
+            Report with directory totals, budget and evicted files
+        """
+        files, staging = self._scan()
+        protected = self.protected()
+        total_bytes = sum(f.size for f in files)
+        total_files = len(files)
+
+        def over_budget(n_bytes: int, n_files: int) -> bool:
+            return ((self.max_bytes > 0 and n_bytes > self.max_bytes)
+                    or (self.max_files > 0 and n_files > self.max_files))
+
+        now = time.time()
+        evicted: List[_MediaFile] = []
+        remaining_bytes, remaining_files = total_bytes, total_files
+        if over_budget(total_bytes, total_files):
+            candidates = sorted(
+                (f for f in files
+                 if f.key not in protected and now - f.last_access > self.min_age_seconds),
+                key=lambda f: f.last_access,
+            )
+            for media in candidates:
+                if not over_budget(remaining_bytes, remaining_files):
+                    break
+                evicted.append(media)
+                remaining_bytes -= media.size
+                remaining_files -= 1
+
+        if not dry_run:
+            for media in evicted:
+                path = self.root / media.key
+                path.unlink(missing_ok=True)
+                try:
+                    path.parent.rmdir()  # drop the shard directory once empty
+                except OSError:
+                    pass
+            for path in staging:
+                path.unlink(missing_ok=True)
+
+            live = {f.key for f in files} - {f.key for f in evicted}
+            with self._lock:
+                self._accessed = {k: t for k, t in self._accessed.items() if k in live}
+                self.sweeps += 1
+                self.files_evicted += len(evicted)
+                self.bytes_evicted += sum(f.size for f in evicted)
+
+        report = {
+            "dry_run": dry_run,
+            "files": total_files,
+            "bytes": total_bytes,
+            "max_files": self.max_files,
+            "max_bytes": self.max_bytes,
+            "protected": sum(1 for f in files if f.key in protected),
+            "evicted": [{"key": f.key, "bytes": f.size, "last_access": f.last_access}
+                        for f in evicted],
+            "bytes_freed": sum(f.size for f in evicted),
+            "stale_staging_files": len(staging),
+            "over_budget_after": over_budget(remaining_bytes, remaining_files),
+        }
+        if not dry_run:
+            self.last_report = report
+        return report
+
+    async def run_periodically(self, interval_seconds: float, dry_run: bool = False) -> None:
+        """
+        Sweep every interval_seconds until cancelled.
+
+        Args:
+            interval_seconds: Delay between sweeps
+            dry_run: Only log what would be deleted
+        """
+        while True:
+            try:
+                report = await asyncio.to_thread(self.sweep, dry_run)
+                if report["evicted"]:
+                    logger.info("Media retention %s %d files (%d bytes)",
+                                "would evict" if dry_run else "evicted",
+                                len(report["evicted"]), report["bytes_freed"])
+            except Exception:
+                logger.exception("Media retention sweep failed")
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict:
+        """Return budget, sweep counters and the directory size after the last sweep."""
+        with self._lock:
+            last = self.last_report
+            return {
+                "max_bytes": self.max_bytes,
+                "max_files": self.max_files,
+                "sweeps": self.sweeps,
+                "files_evicted": self.files_evicted,
+                "bytes_evicted": self.bytes_evicted,
+                "files": last["files"] - len(last["evicted"]) if last else None,
+                "bytes": last["bytes"] - last["bytes_freed"] if last else None,
+            }
+
+# Shared retention policy for the default media directory
+media_retention = MediaRetention(
+    ECHOES_TEMP_DIR,
+    max_bytes=settings.media_max_bytes,
+    max_files=settings.media_max_files,
+    min_age_seconds=settings.media_min_age_seconds,
+    protected=_cached_story_media,
+)
@@ -0,0 +1,149 @@
+"""Service for selecting the story passages relevant to a chat question."""
+
+import math
+import re
+from typing import Dict, List, Optional, Tuple
+
+from .text import content_words, estimate_tokens
+
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+def chunk_text(text: str, max_words: int = 120) -> List[str]:
+    """
+    Split text into passages of at most about ``max_words`` words.
+
+    Paragraphs are kept whole where possible; short ones are merged and
+    long ones are split at sentence boundaries.
+
+    Args:
+        text: Brief or story text
+        max_words: Target passage size
+
+    Returns:
+        List of passages in document order
+    """
+    pieces: List[str] = []
+    for paragraph in re.split(r"\n\s*\n", text):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph.split()) <= max_words:
+            pieces.append(paragraph)
+        else:
+            pieces.extend(s for s in _SENTENCE_END.split(paragraph) if s.strip())
+
+    chunks: List[str] = []
+    current: List[str] = []
+    words = 0
+    for piece in pieces:
+        n = len(piece.split())
+        if current and words + n > max_words:
+            chunks.append("\n\n".join(current))
+            current, words = [], 0
+        current.append(piece)
+        words += n
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+class BM25Index:
+    """
+    Okapi BM25 over a fixed list of passages.
+
+    Term statistics are computed once at construction; each query costs
+    one pass over the query terms' postings.
+    """
+
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+        self._postings: Dict[str, List[Tuple[int, int]]] = {}
+        self._lengths: List[int] = []
+        for i, passage in enumerate(passages):
+            counts: Dict[str, int] = {}
+            for term in content_words(passage):
+                counts[term] = counts.get(term, 0) + 1
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                self._postings.setdefault(term, []).append((i, tf))
+        n = len(passages)
+        self._avg_length = sum(self._lengths) / n if n else 0.0
+        self._idf = {term: math.log(1 + (n - len(p) + 0.5) / (len(p) + 0.5))
+                     for term, p in self._postings.items()}
+
+    def search(self, query: str) -> List[Tuple[float, int]]:
+        """
+        Score passages against a query.
+
+        Args:
+            query: Question text
+
+        Returns:
+            (score, passage index) pairs for passages sharing a term with
+            the query, best first
+        """
+        scores: Dict[int, float] = {}
+        for term in set(content_words(query)):
+            idf = self._idf.get(term)
+            if idf is None:
+                continue
+            for i, tf in self._postings[term]:
+                norm = 1 - self.b + self.b * self._lengths[i] / self._avg_length
+                scores[i] = scores.get(i, 0.0) + idf * tf * (self.k1 + 1) / (tf + self.k1 * norm)
+        return sorted(((s, i) for i, s in scores.items()), reverse=True)
+
+class StoryRetriever:
+    """
+    Picks the passages of a story relevant to a question.
+
+    Built once per story. The full text is used as-is while it fits the
+    token budget, since an unchanging context is cheapest to re-send;
+    beyond that only a short summary and the top-scoring passages are.
+    """
+
+    def __init__(self, sections: List[Tuple[Optional[str], str]], summary_words: int = 60):
+        """
+        Args:
+            sections: (label, text) pairs, e.g. [("Research Brief", brief),
+                ("Story", story)]; a None label adds no heading
+            summary_words: Length of the summary taken from the first section
+        """
+        self.full_context = "\n\n".join(
+            f"{label}:\n{text}" if label else text for label, text in sections
+        )
+        # Tag each passage with its section so the model knows its source
+        self.passages = [f"[{label}] {chunk}" if label else chunk
+                         for label, text in sections for chunk in chunk_text(text)]
+        self.index = BM25Index(self.passages)
+        words = " ".join(sections[0][1].split()).split(" ") if sections else []
+        self.summary = " ".join(words[:summary_words]) + (" ..." if len(words) > summary_words else "")
+
+    def context_for(self, question: str, token_budget: int, top_k: int = 4) -> str:
+        """
+        Build the chat context for a question within a token budget.
+
+        Args:
+            question: User question
+            token_budget: Maximum estimated tokens of context (0 = unlimited)
+            top_k: Maximum number of passages to include
+
+        Returns:
+            The full text if it fits, otherwise a short summary plus the
+            best-matching passages in document order
+        """
+        if token_budget <= 0 or estimate_tokens(self.full_context) <= token_budget:
+            return self.full_context
+
+        header = f"Summary:\n{self.summary}\n\nRelevant passages:"
+        used = estimate_tokens(header)
+        chosen: List[int] = []
+        for _, i in self.index.search(question):
+            if len(chosen) == top_k:
+                break
+            cost = estimate_tokens(self.passages[i]) + 1
+            if used + cost > token_budget:
+                continue
+            chosen.append(i)
+            used += cost
+        return "\n\n".join([header] + [self.passages[i] for i in sorted(chosen)])
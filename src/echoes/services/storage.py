@@ -1,75 +1,313 @@
 """Service for data storage."""
 
-import tempfile
+import asyncio
+import hashlib
 import os
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
 from pathlib import Path
-import hashlib
-from datetime import datetime
+from typing import AsyncIterable, Iterable, Union
 
 # Create a temp directory for Echoes storage
 ECHOES_TEMP_DIR = Path(__file__).parent.parent.parent.parent / "static"
 ECHOES_TEMP_DIR.mkdir(exist_ok=True)
 
+# Suffix of partly written files that are renamed into place when complete
+STAGING_SUFFIX = ".tmp"
+
+class StorageBackend(ABC):
+    """
+    Content-addressed object store for generated media.
+
+    Objects are identified by the SHA-256 of their content plus a file
+    extension, so storing identical content twice yields the same key and
+    no second write. Keys are relative paths like ``ab/abcdef....mp3``.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.writes = 0
+        self.dedup_hits = 0
+        self.bytes_written = 0
+        self.bytes_deduplicated = 0
+
+    @staticmethod
+    def object_key(digest: str, extension: str) -> str:
+        """Build the object key for a content hash and extension (e.g. ".mp3")."""
+        return f"{digest[:2]}/{digest}{extension}"
+
+    def put(self, data: bytes, extension: str) -> str:
+        """
+        Store content unless an identical object already exists.
+
+        Args:
+            data: Content to store
+            extension: File extension including the dot (e.g. ".mp3")
+
+        Returns:
+            Object key
+        """
+        key = self.object_key(hashlib.sha256(data).hexdigest(), extension)
+        if self.exists(key):
+            self.touch(key)
+            self._record(dedup=True, size=len(data))
+            return key
+        self._write(key, data)
+        self._record(dedup=False, size=len(data))
+        return key
+
+    def _record(self, dedup: bool, size: int) -> None:
+        with self._lock:
+            if dedup:
+                self.dedup_hits += 1
+                self.bytes_deduplicated += size
+            else:
+                self.writes += 1
+                self.bytes_written += size
+
+    def stats(self) -> dict:
+        """Return write and deduplication counters."""
+        with self._lock:
+            return {
+                "writes": self.writes,
+                "dedup_hits": self.dedup_hits,
+                "bytes_written": self.bytes_written,
+                "bytes_deduplicated": self.bytes_deduplicated,
+            }
+
+    def open_writer(self, extension: str) -> "ObjectWriter":
+        """
+        Start an incremental write of an object whose content isn't known yet.
+
+        Args:
+            extension: File extension including the dot (e.g. ".mp3")
+
+        Returns:
+            ObjectWriter; call write() per chunk, then commit() or abort()
+        """
+        return ObjectWriter(self, extension)
+
+    def touch(self, key: str) -> None:
+        """Mark an existing object as just used (e.g. reused by deduplication)."""
+
+    @abstractmethod
+    def exists(self, key: str) -> bool:
+        """Return True if an object with this key is stored."""
+
+    @abstractmethod
+    def _open_staging(self):
+        """Return a writable binary file for staging streamed content."""
+
+    @abstractmethod
+    def _commit_staging(self, staging, key: str) -> None:
+        """Move a closed staging file into place as key."""
+
+    @abstractmethod
+    def _discard_staging(self, staging) -> None:
+        """Delete a staging file that won't be committed."""
+
+    @abstractmethod
+    def _write(self, key: str, data: bytes) -> None:
+        """Atomically store a new object under key."""
+
+    @abstractmethod
+    def locate(self, key: str) -> str:
+        """Return the location callers receive from save_text/save_binary."""
+
+    @abstractmethod
+    def url(self, location: str) -> str:
+        """Return the public URL for a location returned by locate()."""
+
+class ObjectWriter:
+    """
+    Streams one object into a backend, hashing the content as it is written.
+
+    The object key depends on the content hash, so data is staged first and
+    only moved into place (or dropped, if identical content exists) on
+    commit(). All methods block; async callers should use save_stream.
+    """
+
+    def __init__(self, backend: StorageBackend, extension: str):
+        self.backend = backend
+        self.extension = extension
+        self._hash = hashlib.sha256()
+        self._size = 0
+        self._staging = backend._open_staging()
+
+    def write(self, chunk: bytes) -> None:
+        """Append a chunk to the object."""
+        self._hash.update(chunk)
+        self._staging.write(chunk)
+        self._size += len(chunk)
+
+    def commit(self) -> str:
+        """
+        Finish the object and return its key.
+
+        If an identical object already exists the staged data is discarded.
+        """
+        self._staging.close()
+        key = self.backend.object_key(self._hash.hexdigest(), self.extension)
+        if self.backend.exists(key):
+            self.backend.touch(key)
+            self.backend._discard_staging(self._staging)
+            self.backend._record(dedup=True, size=self._size)
+        else:
+            self.backend._commit_staging(self._staging, key)
+            self.backend._record(dedup=False, size=self._size)
+        return key
+
+    def abort(self) -> None:
+        """Discard everything written so far."""
+        self._staging.close()
+        self.backend._discard_staging(self._staging)
+
+class LocalStorageBackend(StorageBackend):
+    """Stores objects as files under a directory served at ``url_prefix``."""
+
+    def __init__(self, root: Path, url_prefix: str = "/static"):
+        super().__init__()
+        self.root = Path(root)
+        self.url_prefix = url_prefix.rstrip("/")
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def exists(self, key: str) -> bool:
+        return (self.root / key).is_file()
+
+    def touch(self, key: str) -> None:
+        # Bump only the access time: retention evicts by last access, while
+        # the modification time keeps reflecting when the bytes were written.
+        path = self.root / key
+        try:
+            os.utime(path, (time.time(), path.stat().st_mtime))
+        except FileNotFoundError:
+            pass
+
+    def _write(self, key: str, data: bytes) -> None:
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temp file in the same directory, then rename: readers
+        # never see a partial object, and concurrent writers of the same
+        # content simply replace each other with identical bytes.
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix=STAGING_SUFFIX)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def _open_staging(self):
+        # Stage inside root so the final rename stays on one filesystem
+        return tempfile.NamedTemporaryFile(dir=self.root, suffix=STAGING_SUFFIX, delete=False)
+
+    def _commit_staging(self, staging, key: str) -> None:
+        target = self.root / key
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(staging.name, target)
+
+    def _discard_staging(self, staging) -> None:
+        Path(staging.name).unlink(missing_ok=True)
+
+    def locate(self, key: str) -> str:
+        return str(self.root / key)
+
+    def url(self, location: str) -> str:
+        path = Path(location)
+        try:
+            relative = path.resolve().relative_to(self.root.resolve())
+        except ValueError:
+            # Not one of ours; fall back to serving it by name
+            relative = Path(path.name)
+        return f"{self.url_prefix}/{relative.as_posix()}"
+
+# Default backend for generated media
+storage_backend: StorageBackend = LocalStorageBackend(ECHOES_TEMP_DIR)
+
 def save_text(filename: str, content: str) -> str:
     """
     Save text content to a file in the Echoes temp directory.
-    
+
+    Content is stored by hash (see StorageBackend), so saving identical
+    content again returns the existing file without rewriting it.
+
     Args:
-        filename: Name of the file (e.g., "story.txt", "audio.mp3")
+        filename: Name of the file (e.g., "story.txt", "audio.mp3"); only
+            its extension is kept
         content: Text content to save
-    
+
     Returns:
         Full file path where content was saved
     """
-    # Generate unique filename using hash and timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    content_hash = hashlib.md5(content.encode()).hexdigest()[:8]
-    base_name, ext = os.path.splitext(filename)
-    unique_filename = f"{base_name}_{timestamp}_{content_hash}{ext}"
-    
-    file_path = ECHOES_TEMP_DIR / unique_filename
-    
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(content)
-    
-    return str(file_path)
+    return save_binary(filename, content.encode("utf-8"))
 
 def public_url(path: str) -> str:
     """
     Convert a file path to a mock public URL.
-    
+
     In production, this would upload to cloud storage and return a real URL.
     For now, returns a fake /static/... URL.
-    
+
     Args:
         path: File path to convert
-    
+
     Returns:
         Mock public URL string
     """
-    filename = Path(path).name
-    return f"/static/{filename}"
+    return storage_backend.url(path)
 
 def save_binary(filename: str, content: bytes) -> str:
     """
     Save binary content to a file in the Echoes temp directory.
-    
+
+    Content is stored by hash (see StorageBackend), so saving identical
+    content again returns the existing file without rewriting it.
+
     Args:
-        filename: Name of the file (e.g., "video.mp4")
+        filename: Name of the file (e.g., "video.mp4"); only its extension is kept
         content: Binary content to save
-    
+
+    Returns:
+        Full file path where content was saved
+    """
+    _, ext = os.path.splitext(filename)
+    key = storage_backend.put(content, ext.lower())
+    return storage_backend.locate(key)
+
+async def save_stream(filename: str,
+                      chunks: Union[Iterable[bytes], AsyncIterable[bytes]]) -> str:
+    """
+    Save content from a stream of byte chunks without buffering it all.
+
+    Chunks are hashed and written as they arrive, and all file I/O runs in
+    a worker thread so the event loop is never blocked on disk. Storage is
+    content-addressed as with save_binary.
+
+    Args:
+        filename: Name of the file (e.g., "audio.mp3"); only its extension is kept
+        chunks: Iterable or async iterable of bytes (e.g. an HTTP response body)
+
     Returns:
         Full file path where content was saved
     """
-    # Generate unique filename using hash and timestamp
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    content_hash = hashlib.md5(content).hexdigest()[:8]
-    base_name, ext = os.path.splitext(filename)
-    unique_filename = f"{base_name}_{timestamp}_{content_hash}{ext}"
-    
-    file_path = ECHOES_TEMP_DIR / unique_filename
-    
-    with open(file_path, "wb") as f:
-        f.write(content)
-    
-    return str(file_path)
\ No newline at end of file
+    _, ext = os.path.splitext(filename)
+    writer = await asyncio.to_thread(storage_backend.open_writer, ext.lower())
+    try:
+        if hasattr(chunks, "__aiter__"):
+            async for chunk in chunks:
+                await asyncio.to_thread(writer.write, chunk)
+        else:
+            for chunk in chunks:
+                await asyncio.to_thread(writer.write, chunk)
+        key = await asyncio.to_thread(writer.commit)
+    except BaseException:
+        await asyncio.to_thread(writer.abort)
+        raise
+    return storage_backend.locate(key)
+
+async def save_binary_async(filename: str, content: bytes) -> str:
+    """Async version of save_binary; the write runs off the event loop."""
+    return await save_stream(filename, [content])
@@ -0,0 +1,220 @@
+"""Service for caching generated story experiences."""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional
+
+from ..app.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Default on-disk location, next to the static/ media directory
+DEFAULT_CACHE_DIR = Path(__file__).parent.parent.parent.parent / ".cache" / "stories"
+
+def normalize_topic(topic: str) -> str:
+    """Normalize a topic so trivially different spellings share a cache entry."""
+    return " ".join(topic.lower().split())
+
+def story_cache_key(topic: str, model: str, prompts_version: str) -> str:
+    """
+    Build the content-addressed cache key for a story request.
+
+    Args:
+        topic: Historical topic as requested
+        model: OpenAI model name
+        prompts_version: Combined hash of the prompt files (PromptRegistry.version)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    material = "\n".join([normalize_topic(topic), model, prompts_version])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+class StoryCache:
+    """
+    Two-level story cache: a bounded in-memory LRU backed by JSON files on disk.
+
+    Entries expire ``ttl_seconds`` after they were stored. The disk layer
+    lets cached stories survive restarts; entries read from disk are
+    promoted back into memory. The memory layer is locked, since the
+    retention sweeper reads it from a worker thread.
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: float = 7 * 24 * 3600,
+                 directory: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _disk_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _expired(self, created_at: float) -> bool:
+        return time.time() - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, value: dict) -> None:
+        with self._lock:
+            self._memory[key] = (created_at, value)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+                self.evictions += 1
+
+    def _read_disk(self, key: str, prune: bool = True) -> Optional[tuple]:
+        """Read an unexpired disk entry; with ``prune``, delete it if corrupt or expired."""
+        if not self.directory:
+            return None
+        path = self._disk_path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            created_at, result = entry["created_at"], entry["result"]
+            if not isinstance(result, dict):
+                raise ValueError("cached result is not an object")
+            expired = self._expired(created_at)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, KeyError, TypeError):
+            # Corrupt, unreadable or wrongly shaped entry; treat it as a miss and drop it
+            if prune:
+                path.unlink(missing_ok=True)
+            return None
+        if expired:
+            if prune:
+                path.unlink(missing_ok=True)
+            return None
+        return created_at, result
+
+    def get(self, key: str) -> Optional[dict]:
+        """
+        Look up a cached story.
+
+        Args:
+            key: Cache key from story_cache_key
+
+        Returns:
+            The cached result dict, or None on a miss or expired entry
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and self._expired(entry[0]):
+                del self._memory[key]
+                entry = None
+
+            if entry is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+        entry = self._read_disk(key)
+        if entry is not None:
+            self._remember(key, *entry)
+            self.hits += 1
+            self.disk_hits += 1
+            return entry[1]
+
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: dict) -> None:
+        """
+        Store a story result in memory and, if configured, on disk.
+
+        A failed disk write is logged and the entry stays in memory only,
+        so a story that was already generated is still returned.
+
+        Args:
+            key: Cache key from story_cache_key
+            value: Story result dict (must be JSON-serializable)
+        """
+        created_at = time.time()
+        self._remember(key, created_at, value)
+
+        if self.directory:
+            try:
+                self._write_disk(key, created_at, value)
+            except OSError as e:
+                logger.warning("Could not write story cache entry %s to disk: %s", key, e)
+
+    def _write_disk(self, key: str, created_at: float, value: dict) -> None:
+        # Write to a temp file and rename so readers never see partial JSON
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"created_at": created_at, "result": value}, f, ensure_ascii=False)
+            os.replace(tmp_path, self._disk_path(key))
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+    def values(self) -> List[dict]:
+        """
+        Return every unexpired cached result, from memory and disk.
+
+        Unlike get(), this has no side effects: it leaves hit counters, LRU
+        order and expired files alone, and is safe to call from a thread.
+
+        Returns:
+            List of cached result dicts
+        """
+        with self._lock:
+            entries = {key: entry for key, entry in self._memory.items()
+                       if not self._expired(entry[0])}
+        if self.directory:
+            for path in self.directory.glob("*.json"):
+                if path.stem not in entries:
+                    entry = self._read_disk(path.stem, prune=False)
+                    if entry is not None:
+                        entries[path.stem] = entry
+        return [value for _, value in entries.values()]
+
+    def clear(self) -> None:
+        """Drop every entry from memory and disk."""
+        with self._lock:
+            self._memory.clear()
+        if self.directory:
+            for path in self.directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._memory),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+def _build_default_cache() -> Optional[StoryCache]:
+    if not settings.story_cache_enabled:
+        return None
+    directory = Path(settings.story_cache_dir) if settings.story_cache_dir else DEFAULT_CACHE_DIR
+    return StoryCache(
+        max_entries=settings.story_cache_max_entries,
+        ttl_seconds=settings.story_cache_ttl_seconds,
+        directory=directory,
+    )
+
+# Shared cache instance (None when caching is disabled)
+story_cache = _build_default_cache()
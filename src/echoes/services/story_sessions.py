@@ -0,0 +1,147 @@
+"""Service for server-side story sessions used by chat."""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+from ..app.settings import settings
+from .faq_index import FAQIndex, parse_faq
+from .retrieval import StoryRetriever
+
+def story_id_for(result: dict) -> str:
+    """
+    Build the id of a generated story from its content.
+
+    Regenerating a topic yields a new story and so a new id, while cached
+    copies of the same story keep theirs; a client chatting about one
+    story is never switched to another under the same id.
+
+    Args:
+        result: Story result dict
+
+    Returns:
+        Hex SHA-256 digest of the brief, story and FAQ
+    """
+    material = json.dumps([result["brief"], result["story"], result.get("faq", [])],
+                          ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+@dataclass
+class StorySession:
+    """
+    A generated story that chat requests can refer to by id.
+
+    Attributes:
+        story_id: Identifier returned to clients as StoryResponse.story_id
+        topic: Historical topic
+        brief: Research brief
+        story: Narrative script
+        faq: FAQ lines as generated by the pipeline
+        retriever: BM25 index over brief and story passages, built once;
+            its full_context is the complete chat context block
+        faq_index: Similarity index over the FAQ questions, built once
+    """
+    story_id: str
+    topic: str
+    brief: str
+    story: str
+    faq: Union[List[str], str] = field(default_factory=list)
+    retriever: Optional[StoryRetriever] = None
+    faq_index: Optional[FAQIndex] = None
+
+    def __post_init__(self):
+        if self.retriever is None:
+            self.retriever = StoryRetriever([("Research Brief", self.brief), ("Story", self.story)])
+        if self.faq_index is None:
+            self.faq_index = FAQIndex(parse_faq(self.faq))
+
+    @property
+    def context(self) -> str:
+        """The complete chat context (brief and story)."""
+        return self.retriever.full_context
+
+class StorySessionStore:
+    """
+    In-memory LRU of story sessions keyed by story id.
+
+    Sessions expire ``ttl_seconds`` after they were last created or used.
+    """
+
+    def __init__(self, max_sessions: int = 1024, ttl_seconds: float = 24 * 3600):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._sessions: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.lookups = 0
+        self.misses = 0
+
+    def put(self, story_id: str, result: dict) -> StorySession:
+        """
+        Register the session for a story, reusing it if already registered.
+
+        Args:
+            story_id: Identifier returned to clients as StoryResponse.story_id
+                (see story_id_for)
+            result: Story result dict
+
+        Returns:
+            The StorySession
+        """
+        with self._lock:
+            entry = self._sessions.get(story_id)
+            if entry is not None:
+                session = entry[1]
+            else:
+                session = StorySession(
+                    story_id=story_id,
+                    topic=result["topic"],
+                    brief=result["brief"],
+                    story=result["story"],
+                    faq=result.get("faq", []),
+                )
+            self._sessions[story_id] = (time.time(), session)
+            self._sessions.move_to_end(story_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+            return session
+
+    def get(self, story_id: str) -> Optional[StorySession]:
+        """
+        Look up a story session.
+
+        Args:
+            story_id: Identifier from StoryResponse.story_id
+
+        Returns:
+            The StorySession, or None if it is unknown or expired
+        """
+        with self._lock:
+            self.lookups += 1
+            entry = self._sessions.get(story_id)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                self._sessions.pop(story_id, None)
+                self.misses += 1
+                return None
+            self._sessions[story_id] = (time.time(), entry[1])
+            self._sessions.move_to_end(story_id)
+            return entry[1]
+
+    def stats(self) -> dict:
+        """Return session count and lookup counters."""
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "lookups": self.lookups,
+                "misses": self.misses,
+            }
+
+# Shared session store
+story_sessions = StorySessionStore(
+    max_sessions=settings.story_session_max,
+    ttl_seconds=settings.story_session_ttl_seconds,
+)
@@ -0,0 +1,38 @@
+"""Shared text helpers for matching and token budgeting."""
+
+import re
+from typing import List, Optional
+
+_WORD = re.compile(r"[a-z0-9]+")
+
+# Rough size of a token in English text, used wherever tokens are budgeted
+# before the API reports real usage
+CHARS_PER_TOKEN = 4
+
+# Question words; dropped from content words, but see question_word()
+QUESTION_WORDS = frozenset("how what when where who whom why which".split())
+
+# Words that match almost every text and only add noise to similarity scores
+STOPWORDS = frozenset("""
+a an the of to in on at for by with and or is was were are be been it its this that
+did do does there their they he she his her
+""".split()) | QUESTION_WORDS
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count of a text (about four characters per token)."""
+    return len(text) // CHARS_PER_TOKEN + 1
+
+def words(text: str) -> List[str]:
+    """Lowercase alphanumeric words of a text, in order."""
+    return _WORD.findall(text.lower())
+
+def content_words(text: str) -> List[str]:
+    """Words of a text without stopwords, in order."""
+    return [w for w in words(text) if w not in STOPWORDS]
+
+def question_word(text: str) -> Optional[str]:
+    """Return the first question word (who, when, why, ...) of a question, if any."""
+    for word in words(text):
+        if word in QUESTION_WORDS:
+            return word
+    return None
@@ -1,10 +1,37 @@
 """Service for text-to-speech using OpenAI TTS with character roles."""
 
+import asyncio
 import os
 import re
-from openai import OpenAI
-from ..app.settings import OPENAI_API_KEY
-from .storage import save_binary, public_url
+from collections import Counter
+from typing import List, Tuple
+from ..app.settings import OPENAI_API_KEY, settings
+from .audio_cache import audio_cache, audio_cache_key
+from .cassette import CassetteMiss, cassette
+from .metrics import metrics
+from .openai_client import get_async_openai_client
+from .storage import save_stream, public_url
+
+# OpenAI TTS model used for all synthesis
+TTS_MODEL = "tts-1"
+
+_PARAGRAPH_BREAK = re.compile(r'\n\s*\n')
+_SENTENCE_BREAK = re.compile(r'(?<=[.!?])\s+')
+_CHARACTER_MARKER = re.compile(r'\[([A-Z][A-Z\s]+)\]:\s*')
+_VOICE_RECOMMENDATION = re.compile(r'\[([A-Z_]+):([A-Z]+)\]')
+
+# Content that calls for menacing delivery of single-voice scripts
+_MENACING_INDICATORS = (
+    "warrior", "battle", "conquer", "hannibal", "caesar", "alexander",
+    "deadly", "menacing", "intense", "commanding", "ruler", "general"
+)
+
+# Words emphasized for menacing delivery, matched as whole words in one pass
+_MENACING_WORDS = re.compile(
+    r'\b(warrior|battle|conquer|defeat|power|strength|command'
+    r'|rule|dominate|crush|destroy|victory|glory|honor)\b',
+    re.IGNORECASE
+)
 
 # Valid OpenAI TTS voices
 VALID_VOICES = ["alloy", "echo", "fable", "onyx", "nova", "shimmer"]
@@ -76,7 +103,7 @@ def _resolve_voice_name(voice_key: str) -> str:
     else:
         return "alloy"  # Default fallback
 
-def synthesize_voice(script: str, topic: str = "story") -> str:
+async def synthesize_voice_async(script: str, topic: str = "story") -> str:
     """
     Synthesize voice from text script using OpenAI TTS with character role support.
     
@@ -84,6 +111,9 @@ def synthesize_voice(script: str, topic: str = "story") -> str:
     [NARRATOR]: Text here
     [CLEOPATRA]: Text here
     [ELDERLY]: Text here
+
+    Uses the shared AsyncOpenAI client, so the event loop keeps serving
+    other requests while the audio is generated.
     
     Args:
         script: Text script to convert to speech (may contain voice markers)
@@ -92,52 +122,215 @@ def synthesize_voice(script: str, topic: str = "story") -> str:
     Returns:
         Public URL to the audio file
     """
-    if not OPENAI_API_KEY:
+    if not OPENAI_API_KEY and not cassette.replaying:
         print("OpenAI API key not configured. Using mock TTS.")
-        return _synthesize_mock_voice(script, topic)
+        return await asyncio.to_thread(_synthesize_mock_voice, script, topic)
     
     try:
         # Check if script has character markers
         if _has_character_markers(script):
-            return _synthesize_multi_voice(script, topic)
+            return await _synthesize_multi_voice(script, topic)
         else:
-            return _synthesize_single_voice(script, topic)
+            return await _synthesize_single_voice(script, topic)
         
+    except CassetteMiss:
+        # A replay must reproduce the recording, not quietly substitute mock audio
+        raise
     except Exception as e:
         print(f"OpenAI TTS failed: {e}. Using mock TTS.")
-        return _synthesize_mock_voice(script, topic)
+        return await asyncio.to_thread(_synthesize_mock_voice, script, topic)
+
+def synthesize_voice(script: str, topic: str = "story") -> str:
+    """
+    Blocking wrapper around synthesize_voice_async for scripts and the CLI.
+
+    Must not be called from a running event loop; async code should await
+    synthesize_voice_async instead.
+    """
+    return asyncio.run(synthesize_voice_async(script, topic))
 
 def _has_character_markers(script: str) -> bool:
     """Check if script contains character voice markers."""
     # Look for patterns like [NARRATOR], [CLEOPATRA], [ELDERLY], etc.
-    marker_pattern = r'\[([A-Z][A-Z\s]+)\]:'
-    return bool(re.search(marker_pattern, script))
+    return _CHARACTER_MARKER.search(script) is not None
 
-def _synthesize_single_voice(script: str, topic: str) -> str:
-    """Synthesize with single voice (alloy), applying menacing styling if detected."""
-    client = OpenAI(api_key=OPENAI_API_KEY)
+async def _create_speech(text: str, voice: str) -> bytes:
+    """
+    Return MP3 bytes for text, from the audio cache or the TTS API.
 
-    # Apply menacing styling even for single voice if the content suggests it
-    processed_script = _apply_menacing_styling_if_needed(_clean_script(script), topic)
+    Calls the API through the shared client on a cache miss and caches
+    the result. The cassette, when replaying, answers instead of both;
+    when recording, it saves every synthesized segment.
+    """
+    if cassette.replaying:
+        audio_data = cassette.load_speech(text, voice, TTS_MODEL)
+        metrics.record_tts(text, voice, audio_data, source="cassette")
+        return audio_data
+
+    key = audio_cache_key(text, voice, TTS_MODEL)
+    if audio_cache is not None:
+        cached = audio_cache.get(key)
+        metrics.cache_lookups.inc(cache="audio", result="miss" if cached is None else "hit")
+        if cached is not None:
+            metrics.record_tts(text, voice, cached, source="cache")
+            return cached
+
+    client = get_async_openai_client()
+    try:
+        response = await client.audio.speech.create(
+            model=TTS_MODEL,
+            voice=voice,
+            input=text
+        )
+    except Exception:
+        metrics.tts_errors.inc()
+        raise
+    audio_data = response.content
+    metrics.record_tts(text, voice, audio_data, source="api")
+    if cassette.recording:
+        cassette.save_speech(text, voice, TTS_MODEL, audio_data)
 
-    response = client.audio.speech.create(
-        model="tts-1",
-        voice="alloy",
-        input=processed_script
-    )
-    
+    if audio_cache is not None:
+        audio_cache.set(key, audio_data)
+    return audio_data
+
+def _split_for_tts(text: str, max_chars: int) -> List[str]:
+    """
+    Split text into chunks of at most max_chars, preferring natural breaks.
+
+    Paragraphs are packed together while they fit; oversized paragraphs are
+    split at sentence boundaries, and oversized sentences at whitespace.
+    """
+    def pack(pieces: List[str], separator: str) -> List[str]:
+        chunks, current = [], ""
+        for piece in pieces:
+            candidate = f"{current}{separator}{piece}" if current else piece
+            if len(candidate) <= max_chars:
+                current = candidate
+                continue
+            if current:
+                chunks.append(current)
+            current = piece
+        if current:
+            chunks.append(current)
+        return chunks
+
+    def hard_split(sentence: str) -> List[str]:
+        words = sentence.split()
+        pieces = []
+        for word in words:
+            # A single word longer than the limit has to be cut
+            pieces.extend(word[i:i + max_chars] for i in range(0, len(word), max_chars))
+        return pack(pieces, " ")
+
+    pieces = []
+    for paragraph in _PARAGRAPH_BREAK.split(text.strip()):
+        paragraph = paragraph.strip()
+        if not paragraph:
+            continue
+        if len(paragraph) <= max_chars:
+            pieces.append(paragraph)
+            continue
+        sentences = []
+        for sentence in _SENTENCE_BREAK.split(paragraph):
+            sentences.extend([sentence] if len(sentence) <= max_chars else hard_split(sentence))
+        pieces.extend(pack(sentences, " "))
+
+    return pack(pieces, "\n\n")
+
+def _strip_id3(data: bytes) -> bytes:
+    """Drop a leading ID3v2 tag so MP3 chunks can be concatenated cleanly."""
+    if len(data) >= 10 and data[:3] == b"ID3":
+        # Tag size is a 28-bit "syncsafe" integer (7 bits per byte)
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        return data[10 + size:]
+    return data
+
+async def _synthesize_segments(segments: List[Tuple[str, str]]) -> List[bytes]:
+    """
+    Synthesize ordered (voice, text) segments into the parts of a single MP3.
+
+    Each segment is split into chunks under TTS_CHUNK_CHARS. Identical
+    (voice, chunk) pairs are synthesized only once, and all unique chunks
+    run concurrently (at most TTS_MAX_PARALLEL at a time).
+
+    Returns:
+        MP3 data per chunk in script order, ready to be written back to back
+    """
+    pieces = [(voice, chunk) for voice, text in segments
+              for chunk in _split_for_tts(text, settings.tts_chunk_chars)]
+    if not pieces:
+        raise ValueError("Script contains no text to synthesize")
+
+    semaphore = asyncio.Semaphore(settings.tts_max_parallel)
+
+    async def synthesize_piece(voice: str, chunk: str) -> bytes:
+        async with semaphore:
+            return await _create_speech(chunk, voice)
+
+    unique = list(dict.fromkeys(pieces))
+    results = await asyncio.gather(*(synthesize_piece(voice, chunk) for voice, chunk in unique))
+    audio_by_piece = dict(zip(unique, results))
+
+    parts = [audio_by_piece[piece] for piece in pieces]
+    return parts[:1] + [_strip_id3(part) for part in parts[1:]]
+
+def _parse_segments(script: str) -> List[Tuple[str, str]]:
+    """
+    Split a script with [CHARACTER]: markers into ordered (speaker, text) pairs.
+
+    Text before the first marker is attributed to the narrator.
+    """
+    segments = []
+    speaker = "NARRATOR"
+    position = 0
+    for match in _CHARACTER_MARKER.finditer(script):
+        text = script[position:match.start()].strip()
+        if text:
+            segments.append((speaker, text))
+        speaker = match.group(1).strip()
+        position = match.end()
+
+    text = script[position:].strip()
+    if text:
+        segments.append((speaker, text))
+    return segments
+
+def _voice_for_speaker(speaker: str, primary_voice: str) -> str:
+    """
+    Map a marker speaker name to a TTS voice.
+
+    Speakers known to VOICE_MAP (or recognized by _resolve_voice_name's
+    keyword rules) get their own voice; anyone else keeps the story's
+    primary voice.
+    """
+    key = "_".join(speaker.lower().split())
+    voice = _resolve_voice_name(key)
+    if voice == "alloy" and key not in VOICE_MAP and key not in VALID_VOICES:
+        return primary_voice
+    return voice
+
+async def _save_audio(topic: str, audio_parts: List[bytes]) -> str:
+    """Stream synthesized audio parts to storage and return the file path."""
     safe_topic = topic.lower().replace(" ", "_").replace("'", "").replace('"', '')
     filename = f"audio_{safe_topic}.mp3"
-    
-    audio_data = response.content
-    file_path = save_binary(filename, audio_data)
+    return await save_stream(filename, audio_parts)
+
+async def _synthesize_single_voice(script: str, topic: str) -> str:
+    """Synthesize with single voice (alloy), applying menacing styling if detected."""
+    # Apply menacing styling even for single voice if the content suggests it
+    processed_script = _apply_menacing_styling_if_needed(_clean_script(script), topic)
+
+    audio_parts = await _synthesize_segments([("alloy", processed_script)])
+    file_path = await _save_audio(topic, audio_parts)
     
     return public_url(file_path)
 
-def _synthesize_multi_voice(script: str, topic: str) -> str:
+async def _synthesize_multi_voice(script: str, topic: str) -> str:
     """
     Synthesize with multiple voices based on character markers and context analysis.
-    Uses intelligent voice selection based on historical context and character types.
+    Uses intelligent voice selection based on historical context and character types
+    for the primary (narration) voice, and per-character voices for each marked segment.
     """
     print("🎭 Detected character roles! Using dynamic voice analysis...")
 
@@ -157,36 +350,28 @@ def _synthesize_multi_voice(script: str, topic: str) -> str:
     primary_voice = _resolve_voice_name(primary_voice)
     print(f"🎵 Final voice selection: '{primary_voice}'")
 
-    client = OpenAI(api_key=OPENAI_API_KEY)
-
-    # Apply voice-specific text processing for deeper/more menacing voices
-    processed_script = _apply_voice_styling(script, primary_voice)
+    # Give each character their own voice, styled for that voice
+    segments = []
+    for speaker, text in _parse_segments(script):
+        voice = _voice_for_speaker(speaker, primary_voice)
+        segments.append((voice, _apply_voice_styling(text, voice)))
+    print(f"🎙️ {len(segments)} segments using voices: {sorted({voice for voice, _ in segments})}")
 
     try:
-        response = client.audio.speech.create(
-            model="tts-1",
-            voice=primary_voice,
-            input=processed_script
-        )
-
-        safe_topic = topic.lower().replace(" ", "_").replace("'", "").replace('"', '')
-        filename = f"audio_{safe_topic}.mp3"
-
-        audio_data = response.content
-        file_path = save_binary(filename, audio_data)
+        audio_parts = await _synthesize_segments(segments)
+        file_path = await _save_audio(topic, audio_parts)
 
         print(f"✅ Audio file created successfully: {file_path}")
         return public_url(file_path)
 
     except Exception as e:
-        print(f"❌ OpenAI TTS API failed for voice '{primary_voice}': {e}")
+        print(f"❌ OpenAI TTS API failed for multi-voice script: {e}")
         raise e
 
 def _extract_voice_recommendations(script: str) -> list:
     """Extract voice recommendations from script markers like [CLEOPATRA:FABLE]."""
     # Look for patterns like [CLEOPATRA:FABLE] or [WARRIOR:ECHO]
-    voice_pattern = r'\[([A-Z_]+):([A-Z]+)\]'
-    matches = re.findall(voice_pattern, script)
+    matches = _VOICE_RECOMMENDATION.findall(script)
 
     voices = []
     for char_type, voice in matches:
@@ -196,6 +381,68 @@ def _extract_voice_recommendations(script: str) -> list:
 
     return voices
 
+# Gender indicator words; each counts once per space-delimited occurrence
+_MALE_INDICATORS = (
+    "he", "him", "his", "himself", "man", "men", "male", "boy", "boys",
+    "king", "lord", "emperor", "duke", "prince", "sir", "mr", "father",
+    "brother", "son", "uncle", "grandfather", "husband"
+)
+
+_FEMALE_INDICATORS = (
+    "she", "her", "hers", "herself", "woman", "women", "female", "girl", "girls",
+    "queen", "lady", "empress", "duchess", "princess", "madam", "mrs", "ms",
+    "mother", "sister", "daughter", "aunt", "grandmother", "wife"
+)
+
+# Word -> 0 (male) or 1 (female), for a single dictionary lookup per word
+_GENDER_INDICATORS = {
+    **{word: 0 for word in _MALE_INDICATORS},
+    **{word: 1 for word in _FEMALE_INDICATORS},
+}
+
+# Specific historical figures checked in the topic ("cleopatra" is listed twice
+# on purpose: it carries double weight)
+_FEMALE_FIGURES = (
+    "cleopatra", "queen", "empress", "princess", "lady", "madam", "mrs", "ms",
+    "elizabeth", "victoria", "catherine", "mary", "anne", "isabella", "joan",
+    "marie", "theresa", "eleanor", "margaret", "pharaoh", "cleopatra"
+)
+
+_MALE_FIGURES = (
+    "king", "emperor", "prince", "lord", "sir", "mr", "father", "brother", "son",
+    "caesar", "alexander", "hannibal", "napoleon", "churchill", "lincoln",
+    "washington", "gandhi", "mandela", "mlk", "martin luther king"
+)
+
+def _count_gender_indicators(text: str) -> Tuple[int, int]:
+    """
+    Count male and female indicator words in a single pass.
+
+    Gives the same totals as summing ``text.count(f" {word} ")`` over every
+    indicator: a word only counts when it has a space on both sides, and
+    because those matches cannot overlap, a run of k identical words
+    separated by single spaces counts ceil(k / 2) times.
+
+    Returns:
+        (male_count, female_count)
+    """
+    tokens = text.split(" ")
+    last = len(tokens) - 1
+    counts = [0, 0]
+    previous, previous_index, run = None, -2, 0
+
+    for index, token in [(i, t) for i, t in enumerate(tokens) if t in _GENDER_INDICATORS]:
+        if index == 0 or index == last:
+            # No space before the first token or after the last one
+            previous = None
+            continue
+        run = run + 1 if (token == previous and index == previous_index + 1) else 1
+        previous, previous_index = token, index
+        if run % 2 == 1:
+            counts[_GENDER_INDICATORS[token]] += 1
+
+    return counts[0], counts[1]
+
 def _determine_story_gender(script: str, topic: str) -> str:
     """
     Analyze the story content and topic to determine if it's primarily about a male or female figure.
@@ -203,44 +450,15 @@ def _determine_story_gender(script: str, topic: str) -> str:
     Returns:
         "male", "female", or "neutral"
     """
-    script_lower = script.lower()
     topic_lower = topic.lower()
-    combined_text = f"{script_lower} {topic_lower}"
-
-    # Count gender-specific pronouns and references
-    male_indicators = [
-        " he ", " him ", " his ", " himself ", " man ", " men ", " male ", " boy ", " boys ",
-        " king ", " lord ", " emperor ", " duke ", " prince ", " sir ", " mr ", " father ",
-        " brother ", " son ", " uncle ", " grandfather ", " husband "
-    ]
-
-    female_indicators = [
-        " she ", " her ", " hers ", " herself ", " woman ", " women ", " female ", " girl ", " girls ",
-        " queen ", " lady ", " empress ", " duchess ", " princess ", " madam ", " mrs ", " ms ",
-        " mother ", " sister ", " daughter ", " aunt ", " grandmother ", " wife "
-    ]
-
-    # Count occurrences
-    male_count = sum(combined_text.count(indicator) for indicator in male_indicators)
-    female_count = sum(combined_text.count(indicator) for indicator in female_indicators)
-
-    # Check for specific female historical figures
-    female_figures = [
-        "cleopatra", "queen", "empress", "princess", "lady", "madam", "mrs", "ms",
-        "elizabeth", "victoria", "catherine", "mary", "anne", "isabella", "joan",
-        "marie", "theresa", "eleanor", "margaret", "pharaoh", "cleopatra"
-    ]
-
-    # Check for specific male historical figures
-    male_figures = [
-        "king", "emperor", "prince", "lord", "sir", "mr", "father", "brother", "son",
-        "caesar", "alexander", "hannibal", "napoleon", "churchill", "lincoln",
-        "washington", "gandhi", "mandela", "mlk", "martin luther king"
-    ]
+    combined_text = f"{script.lower()} {topic_lower}"
+
+    # Count gender-specific pronouns and references in one pass over the words
+    male_count, female_count = _count_gender_indicators(combined_text)
 
     # Check topic for gender-specific names
-    female_figure_count = sum(1 for figure in female_figures if figure in topic_lower)
-    male_figure_count = sum(1 for figure in male_figures if figure in topic_lower)
+    female_figure_count = sum(1 for figure in _FEMALE_FIGURES if figure in topic_lower)
+    male_figure_count = sum(1 for figure in _MALE_FIGURES if figure in topic_lower)
 
     # Add weight for named figures in topic
     male_count += male_figure_count * 3  # Weight named figures more heavily
@@ -333,21 +551,18 @@ def _analyze_context_for_voice(script: str, topic: str) -> str:
 def _detect_primary_character(script: str) -> str:
     """Detect the primary character from voice markers and context."""
     # First, check for explicit voice markers like [CLEOPATRA:FABLE]
-    voice_marker_pattern = r'\[([A-Z_]+):([A-Z]+)\]'
-    voice_matches = re.findall(voice_marker_pattern, script)
+    voice_matches = _VOICE_RECOMMENDATION.findall(script)
     if voice_matches:
         # Return the first character type found
         return voice_matches[0][0]
 
     # Then check for character name markers like [CLEOPATRA]
-    marker_pattern = r'\[([A-Z][A-Z\s]+)\]:'
-    markers = re.findall(marker_pattern, script)
+    markers = _CHARACTER_MARKER.findall(script)
 
     if not markers:
         return "narrator"
 
     # Count frequency and return most common (excluding generic markers)
-    from collections import Counter
     marker_counts = Counter(markers)
 
     # Remove generic markers
@@ -380,20 +595,9 @@ def _add_menacing_styling(script: str) -> str:
     Add subtle text modifications to encourage deeper, more menacing voice delivery.
     Simplified to avoid API failures while maintaining voice character.
     """
-    # Simple emphasis markers for key words (TTS engines may interpret *word* as emphasis)
-    menacing_words = [
-        "warrior", "battle", "conquer", "defeat", "power", "strength", "command",
-        "rule", "dominate", "crush", "destroy", "victory", "glory", "honor"
-    ]
-
-    styled_script = script
-
-    # Add emphasis to menacing words (avoid over-processing)
-    for word in menacing_words:
-        # Only emphasize if the word appears as a standalone word
-        styled_script = re.sub(rf'\b({word})\b', r'*\1*', styled_script, flags=re.IGNORECASE)
-
-    return styled_script
+    # Simple emphasis markers for key words (TTS engines may interpret *word* as emphasis),
+    # only where the word appears as a standalone word
+    return _MENACING_WORDS.sub(r'*\1*', script)
 
 def _apply_menacing_styling_if_needed(script: str, topic: str) -> str:
     """
@@ -404,13 +608,8 @@ def _apply_menacing_styling_if_needed(script: str, topic: str) -> str:
     topic_lower = topic.lower()
 
     # Check if this content should have menacing styling
-    menacing_indicators = [
-        "warrior", "battle", "conquer", "hannibal", "caesar", "alexander",
-        "deadly", "menacing", "intense", "commanding", "ruler", "general"
-    ]
-
     should_style = any(indicator in script_lower or indicator in topic_lower
-                      for indicator in menacing_indicators)
+                      for indicator in _MENACING_INDICATORS)
 
     if should_style:
         return _add_menacing_styling(script)
@@ -420,7 +619,7 @@ def _apply_menacing_styling_if_needed(script: str, topic: str) -> str:
 def _clean_script(script: str) -> str:
     """Remove voice markers from script for TTS."""
     # Remove markers like [CLEOPATRA]: or [NARRATOR]:
-    cleaned = re.sub(r'\[([A-Z][A-Z\s]+)\]:\s*', '', script)
+    cleaned = _CHARACTER_MARKER.sub('', script)
     return cleaned.strip()
 
 def _synthesize_mock_voice(script: str, topic: str = "story") -> str:
@@ -0,0 +1,114 @@
+"""Shared fixtures and fakes for the Echoes tests."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from echoes.services import storage
+from echoes.services.storage import LocalStorageBackend
+
+# Mock result class
+class MockResult:
+    """Mock result from Runner.run."""
+    def __init__(self, output: str):
+        self.final_output = output
+
+async def mock_runner_run(agent, prompt):
+    """Mock Runner.run that returns appropriate MockResult based on agent."""
+    # Determine which agent this is based on the prompt or agent attributes
+    if "research" in prompt.lower() or "brief" in prompt.lower():
+        response = """Research Brief: The Fall of the Berlin Wall
+
+Key Points:
+- The Berlin Wall stood from 1961 to 1989
+- Divided East and West Berlin during the Cold War
+- Symbol of the Iron Curtain between Soviet and Western blocs
+- Peaceful protests and political changes led to its fall
+
+Timeline:
+- August 13, 1961: Construction begins
+- November 9, 1989: Border crossing announcement
+- November 10-12, 1989: Wall breached and dismantled
+
+Sources: Historical records and Cold War documentation"""
+    elif "narrative" in prompt.lower() and "style" in prompt.lower():
+        response = """You are a historical storyteller specializing in dramatic political events. Create narratives that:
+
+- Use third-person limited perspective with dramatic tension and emotional depth
+- Explore themes of division, unity, freedom, and human resilience
+- Develop characters through their reactions to historical forces
+- Structure stories with clear scene beats and emotional arcs
+- Maintain historical accuracy while focusing on human elements
+
+Key guidelines:
+- Build suspense through political uncertainty and personal stakes
+- Include sensory details of crowds, sounds, and atmosphere
+- Show transformation from division to unity
+- End with hope and reflection on human potential"""
+    elif "scene beats" in prompt.lower() or "narrative script" in prompt.lower():
+        response = """It was November 9, 1989. The city of Berlin held its breath.
+
+SCENE 1: A crowd gathers at Checkpoint Charlie as rumors spread of border changes.
+
+For 28 years, the concrete barrier had divided families, friends, and a nation. But tonight was different.
+
+SCENE 2: Guards at the wall look at each other uncertainly, overwhelmed by thousands approaching.
+
+When the announcement came, it was unclear and hurried. But the people understood: the wall was opening.
+
+SCENE 3: Hammers and picks appear. People climb the wall, celebrating together.
+
+By dawn, the symbol of division was becoming a symbol of unity. The Berlin Wall was falling, and with it, an era was ending."""
+    elif "analyze this story" in prompt.lower() or "system prompt" in prompt.lower():
+        response = """You are a historical storyteller specializing in dramatic political transformations. Create narratives that:
+
+- Use third-person dramatic perspective with building tension and emotional release
+- Explore themes of division overcome, freedom achieved, and human resilience
+- Develop characters through their personal reactions to world-changing events
+- Structure stories with scene progression: setup, confrontation, climax, resolution
+- Maintain atmospheric tension throughout with sensory details and emotional stakes
+
+Key guidelines:
+- Focus on the human element within larger historical forces
+- Build emotional investment through personal stories and relationships
+- Include vivid scene descriptions for visual impact
+- Balance educational content with engaging narrative flow
+- End with reflection on the broader implications of the event"""
+    else:  # QA agent
+        response = """Q: When did the Berlin Wall fall?
+A: November 9, 1989
+
+Q: How long did the Berlin Wall stand?
+A: 28 years, from 1961 to 1989
+
+Q: What caused the fall of the Berlin Wall?
+A: Peaceful protests, political reforms in Eastern Europe, and mounting pressure for freedom
+
+Q: What did the Berlin Wall symbolize?
+A: The division between communist East and democratic West during the Cold War
+
+Q: How did people react when the wall came down?
+A: With celebration, joy, and emotional reunions of families separated for decades"""
+    
+    return MockResult(response)
+
+class SlowSpeechClient:
+    """Stand-in for AsyncOpenAI whose speech endpoint takes a while."""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.audio = SimpleNamespace(speech=SimpleNamespace(create=self._create))
+
+    async def _create(self, model, voice, input):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return SimpleNamespace(content=b"ID3-fake-mp3")
+
+@pytest.fixture(autouse=True)
+def isolated_media(tmp_path):
+    """Write generated audio and video under tmp_path instead of static/."""
+    with patch.object(storage, "storage_backend", LocalStorageBackend(tmp_path / "media")):
+        yield
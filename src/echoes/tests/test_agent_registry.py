@@ -0,0 +1,36 @@
+"""Tests for the prompt and agent registries."""
+
+import os
+
+from echoes.agents.prompts import PromptRegistry
+from echoes.agents.registry import AgentRegistry
+
+def _write_prompt(directory, name, text, mtime):
+    path = directory / name
+    path.write_text(text, encoding="utf-8")
+    os.utime(path, (mtime, mtime))
+
+def test_agents_are_reused_per_model(tmp_path):
+    """The same role and model always returns the same agent instance."""
+    _write_prompt(tmp_path, "qa.md", "Answer questions.", 1000)
+    built = []
+    registry = AgentRegistry(
+        prompts=PromptRegistry(tmp_path),
+        builders={"qa": (lambda model: built.append(model) or object(), "qa.md")},
+    )
+    
+    first = registry.get("qa", "gpt-4o")
+    assert registry.get("qa", "gpt-4o") is first
+    assert registry.get("qa", "gpt-4o-mini") is not first
+    assert built == ["gpt-4o", "gpt-4o-mini"]
+
+def test_hot_reload_picks_up_changed_prompts(tmp_path):
+    """With watching enabled, an edited prompt changes its hash and the version."""
+    _write_prompt(tmp_path, "qa.md", "Answer questions.", 1000)
+    prompts = PromptRegistry(tmp_path, watch=True, check_interval=0)
+    version = prompts.version
+    
+    _write_prompt(tmp_path, "qa.md", "Answer questions briefly.", 2000)
+    
+    assert prompts.get("qa.md") == "Answer questions briefly."
+    assert prompts.version != version
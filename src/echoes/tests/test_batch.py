@@ -0,0 +1,65 @@
+"""Tests for batch story generation."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from echoes.services.story_cache import StoryCache
+from echoes.workflows.batch import read_topics, run_batch
+
+async def fake_runner_run(agent, prompt):
+    """Echo the first prompt line so every stage gets a distinct output."""
+    return SimpleNamespace(final_output=f"Q: {prompt.splitlines()[0]}\nA: answer")
+
+@pytest.fixture(autouse=True)
+def isolated_story_cache():
+    """Keep batch runs out of the shared on-disk story cache."""
+    with patch('echoes.workflows.story_pipeline.story_cache', StoryCache(directory=None)):
+        yield
+
+def test_read_topics_skips_blanks_comments_and_duplicates():
+    """Topic files tolerate comments, blank lines and repeated topics."""
+    lines = ["# nightly curriculum\n", "The Fall of Rome\n", "\n", "the fall of  rome\n", "Apollo 11\n"]
+    assert read_topics(lines) == ["The Fall of Rome", "Apollo 11"]
+
+def test_batch_appends_jsonl_and_resumes(tmp_path):
+    """Completed topics are skipped on rerun; failures are retried."""
+    output = tmp_path / "stories.jsonl"
+    # A record left half-written by an interrupted run
+    output.write_text('{"topic": "Apollo 11", "status": "ok"}\n{"topic": "Magna', encoding="utf-8")
+
+    with patch('agents.Runner.run', side_effect=fake_runner_run):
+        summary = asyncio.run(run_batch(["Apollo 11", "Magna Carta", "The Fall of Rome"],
+                                        "gpt-4o", output, concurrency=2))
+
+    assert (summary.total, summary.skipped, summary.succeeded, summary.failed) == (3, 1, 2, 0)
+    assert len(summary.stage_seconds["story"]) == 2
+    assert "stories/min" in summary.format()
+
+    records = []
+    for line in output.read_text(encoding="utf-8").splitlines():
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            pass
+    assert {r["topic"] for r in records if r["status"] == "ok"} == {"Apollo 11", "Magna Carta", "The Fall of Rome"}
+
+    with patch('agents.Runner.run', side_effect=AssertionError("nothing left to generate")):
+        rerun = asyncio.run(run_batch(["Apollo 11", "magna carta"], "gpt-4o", output))
+    assert rerun.skipped == 2 and rerun.succeeded == 0
+
+@pytest.mark.parametrize("tail", ['{"topic": "Café'.encode("utf-8"), '{"topic": "Café'.encode("utf-8")[:-1]])
+def test_batch_resumes_after_write_cut_in_multibyte_text(tmp_path, tail):
+    """A half-written non-ASCII record, even one cut mid-character, does not break resume."""
+    output = tmp_path / "stories.jsonl"
+    output.write_bytes('{"topic": "Crème brûlée", "status": "ok"}\n'.encode("utf-8") + tail)
+
+    with patch('agents.Runner.run', side_effect=fake_runner_run):
+        summary = asyncio.run(run_batch(["Crème brûlée", "Café culture"], "gpt-4o", output))
+
+    assert (summary.skipped, summary.succeeded) == (1, 1)
+    last = output.read_bytes().splitlines()[-1]
+    assert json.loads(last)["topic"] == "Café culture"
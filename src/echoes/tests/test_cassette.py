@@ -0,0 +1,73 @@
+"""Tests for recording and replaying agent and TTS calls."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from echoes.services import llm_scheduler as scheduler_module
+from echoes.services import tts_service
+from echoes.services.cassette import Cassette, CassetteMiss
+from echoes.services.llm_scheduler import LLMScheduler
+from echoes.tests.conftest import SlowSpeechClient, mock_runner_run
+
+def _agent(name: str, instructions: str = "Be brief.") -> SimpleNamespace:
+    return SimpleNamespace(name=name, model="gpt-4o", instructions=instructions)
+
+def test_agent_runs_replay_without_calling_the_api(tmp_path):
+    """Recorded runs come back from disk, keyed by agent, prompt and instructions."""
+    scheduler = LLMScheduler(requests_per_minute=0)
+    researcher = _agent("Researcher")
+    prompt = "Write a research brief about the Berlin Wall"
+
+    with patch.object(scheduler_module, "cassette", Cassette(tmp_path, "record")), \
+         patch("agents.Runner.run", side_effect=mock_runner_run):
+        recorded = asyncio.run(scheduler.run(researcher, prompt))
+
+    replay = Cassette(tmp_path, "replay")
+    with patch.object(scheduler_module, "cassette", replay), \
+         patch("agents.Runner.run", side_effect=AssertionError("API called")):
+        replayed = asyncio.run(scheduler.run(researcher, prompt))
+
+        async def collect():
+            return [event async for event in scheduler.stream(researcher, prompt)]
+
+        events = asyncio.run(collect())
+        with pytest.raises(CassetteMiss):
+            asyncio.run(scheduler.run(_agent("Researcher", "Be thorough."), prompt))
+
+    assert replayed.final_output == recorded.final_output
+    assert replayed.context_wrapper.usage.total_tokens == 0
+    assert events[0] == ("delta", recorded.final_output)
+    assert events[1][0] == "complete"
+    assert replay.stats()["replayed"] == 2
+    assert replay.stats()["misses"] == 1
+
+def test_speech_replays_recorded_audio(tmp_path):
+    """TTS segments are saved in record mode and served back in replay mode."""
+    speech = SlowSpeechClient(delay=0)
+    with patch.object(tts_service, "cassette", Cassette(tmp_path, "record")), \
+         patch.object(tts_service, "audio_cache", None), \
+         patch.object(tts_service, "get_async_openai_client", return_value=speech):
+        recorded = asyncio.run(tts_service._create_speech("The wall fell.", "onyx"))
+
+    with patch.object(tts_service, "cassette", Cassette(tmp_path, "replay")), \
+         patch.object(tts_service, "get_async_openai_client", return_value=speech):
+        replayed = asyncio.run(tts_service._create_speech("The wall fell.", "onyx"))
+        with pytest.raises(CassetteMiss):
+            asyncio.run(tts_service._create_speech("The wall fell.", "nova"))
+
+    assert replayed == recorded
+    assert speech.calls == 1
+
+def test_unrecorded_speech_fails_replayed_synthesis(tmp_path):
+    """A replay missing a speech recording fails instead of using mock audio."""
+    with patch.object(tts_service, "cassette", Cassette(tmp_path, "replay")):
+        with pytest.raises(CassetteMiss):
+            asyncio.run(tts_service.synthesize_voice_async("The wall fell.", "Berlin"))
+
+def test_unknown_mode_is_rejected(tmp_path):
+    """Cassette modes other than off, record and replay are configuration errors."""
+    with pytest.raises(ValueError):
+        Cassette(tmp_path, "rewind")
@@ -0,0 +1,62 @@
+"""Tests for the local fake OpenAI API server."""
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+from agents import Agent, OpenAIResponsesModel, Runner
+
+from echoes.app.fake_openai import FakeOpenAIConfig, create_app
+
+def _client(config: FakeOpenAIConfig) -> openai.AsyncOpenAI:
+    http_client = httpx.AsyncClient(transport=httpx.ASGITransport(app=create_app(config)))
+    return openai.AsyncOpenAI(api_key="test", base_url="http://fake/v1",
+                              http_client=http_client, max_retries=0)
+
+FAST = dict(latency=0.0, tokens_per_second=0, output_tokens=60, seed=1)
+
+def test_agent_runs_against_fake_server():
+    """The Agents SDK runs (plain and streamed) and reports usage."""
+    async def scenario():
+        client = _client(FakeOpenAIConfig(**FAST))
+        agent = Agent(name="Storyteller", instructions="Tell a story.",
+                      model=OpenAIResponsesModel(model="gpt-4o", openai_client=client))
+        result = await Runner.run(agent, "The fall of the Berlin Wall")
+        assert "Q:" in result.final_output
+        assert result.context_wrapper.usage.output_tokens == 60
+
+        streamed = Runner.run_streamed(agent, "The fall of the Berlin Wall")
+        deltas = [event.data.delta async for event in streamed.stream_events()
+                  if event.type == "raw_response_event"
+                  and event.data.type == "response.output_text.delta"]
+        assert "".join(deltas) == streamed.final_output == result.final_output
+
+    asyncio.run(scenario())
+
+def test_speech_size_follows_text_length():
+    """Audio responses look like MP3 and scale with the input text."""
+    async def scenario():
+        client = _client(FakeOpenAIConfig(audio_bytes_per_char=10, tts_seconds_per_char=0))
+        response = await client.audio.speech.create(model="tts-1", voice="alloy", input="x" * 50)
+        assert response.content.startswith(b"ID3")
+        assert len(response.content) == 10 + 500
+
+    asyncio.run(scenario())
+
+def test_rate_limit_and_errors():
+    """Requests over the per-minute limit get a 429 with retry-after; errors are 500s."""
+    async def scenario():
+        client = _client(FakeOpenAIConfig(requests_per_minute=1, **FAST))
+        messages = [{"role": "user", "content": "hi"}]
+        completion = await client.chat.completions.create(model="gpt-4o", messages=messages)
+        assert completion.usage.completion_tokens == 60
+        with pytest.raises(openai.RateLimitError) as excinfo:
+            await client.chat.completions.create(model="gpt-4o", messages=messages)
+        assert float(excinfo.value.response.headers["retry-after"]) > 0
+
+        failing = _client(FakeOpenAIConfig(error_rate=1.0, **FAST))
+        with pytest.raises(openai.InternalServerError):
+            await failing.chat.completions.create(model="gpt-4o", messages=messages)
+
+    asyncio.run(scenario())
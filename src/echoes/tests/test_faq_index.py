@@ -0,0 +1,48 @@
+"""Tests for the FAQ fast path."""
+
+import json
+
+from echoes.services.faq_index import FAQFastPath, FAQIndex, parse_faq
+
+FAQ_LINES = [
+    "Q: When did the Berlin Wall fall?",
+    "A: November 9, 1989",
+    "Q: How long did the Berlin Wall stand?",
+    "A: 28 years, from 1961 to 1989",
+    "Q: What did the Berlin Wall symbolize?",
+    "A: The division between communist East and democratic West",
+    "during the Cold War",
+]
+
+def test_parse_faq_accepts_lines_text_and_json():
+    """FAQ lists, plain text and JSON strings parse to the same pairs."""
+    pairs = parse_faq(FAQ_LINES)
+
+    assert len(pairs) == 3
+    assert pairs[0] == ("When did the Berlin Wall fall?", "November 9, 1989")
+    assert pairs[2][1].endswith("West during the Cold War")
+    assert parse_faq("\n".join(FAQ_LINES)) == pairs
+    assert parse_faq(json.dumps(FAQ_LINES)) == pairs
+
+def test_fast_path_answers_close_matches_only():
+    """Near-duplicates of an FAQ question are answered; others fall through."""
+    index = FAQIndex(parse_faq(FAQ_LINES))
+    fast_path = FAQFastPath(threshold=0.75)
+
+    assert fast_path.answer(index, "when did the wall fall") == "November 9, 1989"
+    assert fast_path.answer(index, "Who ordered the wall to be built?") is None
+    assert fast_path.answer(None, "When did the Berlin Wall fall?") is None
+
+    stats = fast_path.stats()
+    assert stats["lookups"] == 2 and stats["hits"] == 1
+    assert stats["hit_rate"] == 0.5
+
+def test_different_question_word_falls_through_to_llm():
+    """Same subject, different question: "why" must not get the "when" answer."""
+    index = FAQIndex(parse_faq(FAQ_LINES))
+    fast_path = FAQFastPath(threshold=0.75)
+
+    for question in ("Why did the Berlin Wall fall?", "How did the Berlin Wall fall?",
+                     "Where did the Berlin Wall fall?"):
+        assert fast_path.answer(index, question) is None
+    assert fast_path.answer(index, "When did the Berlin Wall fall?") == "November 9, 1989"
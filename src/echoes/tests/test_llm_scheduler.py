@@ -0,0 +1,77 @@
+"""Tests for the LLM call scheduler."""
+
+import asyncio
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import httpx
+import openai
+import pytest
+
+from echoes.services.llm_scheduler import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_INTERACTIVE,
+    LLMScheduler,
+    TokenBucket,
+)
+
+def _rate_limit_error() -> openai.RateLimitError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    response = httpx.Response(429, request=request, headers={"retry-after": "0"})
+    return openai.RateLimitError("Rate limit reached", response=response, body=None)
+
+def test_token_bucket_reports_wait_for_refill():
+    """An empty bucket waits in proportion to the missing tokens."""
+    bucket = TokenBucket(per_minute=600)
+    bucket.take(600)
+    assert bucket.wait_time(60) == pytest.approx(6.0, abs=0.05)
+    assert TokenBucket(per_minute=0).wait_time(10**9) == 0
+
+def test_interactive_calls_jump_the_queue():
+    """When the request bucket is empty, chat is admitted before queued stories."""
+    scheduler = LLMScheduler(requests_per_minute=600)
+    order = []
+
+    async def fake_run(agent, prompt):
+        order.append(agent.name)
+        return SimpleNamespace(final_output=agent.name)
+
+    async def scenario():
+        scheduler._lane("gpt-4o").requests.tokens = 0
+        story_a = asyncio.ensure_future(scheduler.run(SimpleNamespace(name="a", model="gpt-4o"), "x"))
+        story_b = asyncio.ensure_future(scheduler.run(SimpleNamespace(name="b", model="gpt-4o"), "x"))
+        await asyncio.sleep(0.01)
+        chat = scheduler.run(SimpleNamespace(name="chat", model="gpt-4o"), "x",
+                             priority=PRIORITY_INTERACTIVE)
+        await asyncio.gather(story_a, story_b, chat)
+
+    with patch('agents.Runner.run', side_effect=fake_run):
+        asyncio.run(scenario())
+
+    assert order == ["chat", "a", "b"]
+    waits = scheduler.stats()["queue_wait_seconds"]
+    assert waits["interactive"]["count"] == 1 and waits["background"]["count"] == 2
+    assert waits["background"]["max"] > 0
+
+def test_rate_limit_errors_are_retried():
+    """429s are retried with backoff; other errors fail immediately."""
+    scheduler = LLMScheduler(max_retries=2, backoff_base=0.01)
+    agent = SimpleNamespace(name="qa", model="gpt-4o")
+    outcomes = [_rate_limit_error(), _rate_limit_error(), SimpleNamespace(final_output="ok")]
+
+    async def flaky_run(agent, prompt):
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    with patch('agents.Runner.run', side_effect=flaky_run):
+        result = asyncio.run(scheduler.run(agent, "question", priority=PRIORITY_BACKGROUND))
+    assert result.final_output == "ok"
+    assert scheduler.stats()["retries"] == 2
+
+    with patch('agents.Runner.run', side_effect=ValueError("bad prompt")):
+        with pytest.raises(ValueError):
+            asyncio.run(scheduler.run(agent, "question"))
+    assert scheduler.stats()["retries"] == 2
+    assert scheduler.stats()["failures"] == 1
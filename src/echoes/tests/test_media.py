@@ -0,0 +1,52 @@
+"""Tests for generated media serving."""
+
+from unittest.mock import patch
+
+import pytest
+from fastapi.testclient import TestClient
+
+from echoes.app.main import app
+from echoes.services import storage
+from echoes.services.storage import LocalStorageBackend
+
+client = TestClient(app)
+
+@pytest.fixture
+def media_url(tmp_path):
+    """Store a small MP3 in a temporary media directory and return its URL."""
+    backend = LocalStorageBackend(tmp_path)
+    with patch.object(storage, "storage_backend", backend):
+        yield storage.public_url(storage.save_binary("audio.mp3", b"0123456789"))
+
+def test_media_has_strong_etag_and_immutable_caching(media_url):
+    """Content-addressed files are cacheable forever and revalidate to 304."""
+    response = client.get(media_url)
+    
+    assert response.status_code == 200
+    assert response.content == b"0123456789"
+    assert response.headers["content-type"] == "audio/mpeg"
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+    etag = response.headers["etag"]
+    assert etag == f'"{media_url.rsplit("/", 1)[1][:-len(".mp3")]}"'
+    
+    revalidated = client.get(media_url, headers={"If-None-Match": etag})
+    assert revalidated.status_code == 304
+    assert revalidated.headers["etag"] == etag
+
+def test_media_supports_range_requests(media_url):
+    """Range requests return only the requested bytes for seeking."""
+    response = client.get(media_url, headers={"Range": "bytes=2-5"})
+    
+    assert response.status_code == 206
+    assert response.content == b"2345"
+    assert response.headers["content-range"] == "bytes 2-5/10"
+
+def test_media_rejects_missing_files_and_traversal(media_url):
+    """Unknown paths and paths escaping the media directory are 404s."""
+    assert client.get("/static/ab/missing.mp3").status_code == 404
+    assert client.get("/static/..%2F..%2Fsettings.py").status_code == 404
+
+def test_media_never_serves_staging_files(media_url, tmp_path):
+    """Partly written .tmp files in the media directory are 404s."""
+    (tmp_path / "upload.tmp").write_bytes(b"partial")
+    assert client.get("/static/upload.tmp").status_code == 404
@@ -0,0 +1,41 @@
+"""Tests for the Prometheus metrics service."""
+
+from types import SimpleNamespace
+
+import pytest
+from agents import Usage
+
+from echoes.services.metrics import Counter, Histogram, Metrics
+
+def test_histogram_renders_cumulative_buckets_and_quantiles():
+    histogram = Histogram("stage_seconds", "Stage time.", ("stage",), buckets=(1.0, 5.0))
+    for value in (0.5, 2.0, 3.0, 10.0):
+        histogram.observe(value, stage="story")
+
+    lines = histogram.render()
+    assert 'stage_seconds_bucket{stage="story",le="1"} 1' in lines
+    assert 'stage_seconds_bucket{stage="story",le="5"} 3' in lines
+    assert 'stage_seconds_bucket{stage="story",le="+Inf"} 4' in lines
+    assert 'stage_seconds_sum{stage="story"} 15.5' in lines
+    assert 'stage_seconds_count{stage="story"} 4' in lines
+    summary = histogram.quantiles()["story"]
+    assert (summary["p50"], summary["p99"], summary["count"]) == (3.0, 10.0, 4)
+
+def test_counter_escapes_labels_and_checks_names():
+    counter = Counter("errors_total", "Errors.", ("stage",))
+    counter.inc(stage='say "hi"\n')
+    assert counter.render()[-1] == 'errors_total{stage="say \\"hi\\"\\n"} 1'
+    with pytest.raises(ValueError):
+        counter.inc(step="story")
+    with pytest.raises(ValueError):
+        counter.inc(-1, stage="story")
+
+def test_llm_usage_counts_tokens_and_cost():
+    metrics = Metrics(token_prices={"gpt-4o": {"input": 2.5, "output": 10.0}})
+    agent = SimpleNamespace(name="Storyteller", model="gpt-4o")
+    usage = Usage(requests=1, input_tokens=1000, output_tokens=500, total_tokens=1500)
+    metrics.record_llm_usage(agent, SimpleNamespace(context_wrapper=SimpleNamespace(usage=usage)))
+
+    assert metrics.llm_tokens.value(agent="Storyteller", model="gpt-4o", type="output") == 500
+    assert metrics.llm_cost.value(agent="Storyteller", model="gpt-4o") == pytest.approx(0.0075)
+    assert "# TYPE echoes_llm_tokens_total counter" in metrics.render()
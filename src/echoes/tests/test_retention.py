@@ -0,0 +1,59 @@
+"""Tests for generated media retention."""
+
+import os
+import time
+
+from echoes.services.retention import MediaRetention, referenced_media
+from echoes.services.storage import LocalStorageBackend
+
+def _store(backend, content: bytes, age: float) -> str:
+    """Store content and make it look last used age seconds ago."""
+    key = backend.put(content, ".mp3")
+    stamp = time.time() - age
+    os.utime(backend.root / key, (stamp, stamp))
+    return key
+
+def test_sweep_evicts_least_recently_used_unprotected_files(tmp_path):
+    """Oldest files go first; protected, young and recently read files stay."""
+    backend = LocalStorageBackend(tmp_path)
+    oldest = _store(backend, b"a" * 10, age=5000)
+    protected = _store(backend, b"b" * 10, age=4000)
+    read = _store(backend, b"c" * 10, age=3000)
+    older = _store(backend, b"d" * 10, age=2000)
+    young = _store(backend, b"e" * 10, age=10)
+
+    retention = MediaRetention(tmp_path, max_files=2, min_age_seconds=600,
+                               protected=lambda: {protected})
+    retention.record_access(read)
+
+    preview = retention.sweep(dry_run=True)
+    assert [item["key"] for item in preview["evicted"]] == [oldest, older]
+    assert backend.exists(oldest)
+
+    report = retention.sweep()
+    assert report["files"] == 5 and report["bytes_freed"] == 20
+    assert report["over_budget_after"]  # protected and young files can't go
+    assert not backend.exists(oldest) and not backend.exists(older)
+    assert all(backend.exists(key) for key in (protected, read, young))
+    assert retention.stats()["files"] == 3
+
+def test_sweep_respects_byte_budget_and_removes_stale_staging(tmp_path):
+    """Nothing is evicted within budget, but abandoned temp files are."""
+    backend = LocalStorageBackend(tmp_path)
+    _store(backend, b"x" * 100, age=5000)
+    staging = tmp_path / "abandoned.tmp"
+    staging.write_bytes(b"partial")
+    os.utime(staging, (1, 1))
+
+    report = MediaRetention(tmp_path, max_bytes=100, min_age_seconds=600).sweep()
+
+    assert report["evicted"] == [] and report["stale_staging_files"] == 1
+    assert not staging.exists()
+
+def test_referenced_media_reads_story_urls():
+    """Only local media URLs in story results are protected."""
+    results = [
+        {"audio_url": "/static/ab/ab12.mp3", "video_url": "/static/cd/cd34.mp4"},
+        {"audio_url": "https://cdn.example.com/x.mp3", "video_url": None},
+    ]
+    assert referenced_media(results) == {"ab/ab12.mp3", "cd/cd34.mp4"}
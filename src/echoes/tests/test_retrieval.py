@@ -0,0 +1,44 @@
+"""Tests for chat context retrieval."""
+
+from echoes.services.retrieval import BM25Index, StoryRetriever, chunk_text
+from echoes.services.text import estimate_tokens
+
+BRIEF = """Research Brief: The Fall of the Berlin Wall
+
+Key Points:
+- The Berlin Wall stood from 1961 to 1989
+- Peaceful protests and political changes led to its fall"""
+
+STORY = "\n\n".join([
+    "SCENE 1: A crowd gathers at Checkpoint Charlie as rumors spread of border changes.",
+    "SCENE 2: Guards at the wall look at each other uncertainly, overwhelmed by thousands.",
+    "SCENE 3: Hammers and picks appear. People climb the wall, celebrating together.",
+] + [f"Filler paragraph {i} about daily life in the divided city and its long winters." for i in range(40)])
+
+def test_chunk_text_respects_passage_size():
+    """Paragraphs are merged up to the size limit, never beyond one paragraph."""
+    chunks = chunk_text(STORY, max_words=40)
+
+    assert len(chunks) > 1
+    assert all(len(chunk.split()) <= 40 for chunk in chunks)
+    assert "".join(chunks).replace("\n", "") == STORY.replace("\n", "")
+
+def test_bm25_ranks_passages_by_relevance():
+    """Passages sharing rare query terms rank first."""
+    index = BM25Index(["The guards at Checkpoint Charlie", "Hammers and picks", "The wall fell"])
+
+    ranked = index.search("What tools did people use, hammers?")
+    assert ranked[0][1] == 1
+    assert index.search("unrelated words") == []
+
+def test_context_is_narrowed_to_budget_only_when_needed():
+    """Short stories are sent whole; long ones as summary plus top passages."""
+    retriever = StoryRetriever([("Research Brief", BRIEF), ("Story", STORY)])
+
+    assert retriever.context_for("Who climbed the wall?", token_budget=0) == retriever.full_context
+
+    narrowed = retriever.context_for("Who used hammers and picks?", token_budget=400, top_k=2)
+    assert estimate_tokens(narrowed) <= 400
+    assert narrowed.startswith("Summary:\nResearch Brief: The Fall of the Berlin Wall")
+    assert "[Story] " in narrowed and "Hammers and picks" in narrowed
+    assert "Filler paragraph 39" not in narrowed
@@ -0,0 +1,80 @@
+"""Tests for single-flight coalescing."""
+
+import asyncio
+
+import pytest
+
+from echoes.workflows.single_flight import SingleFlight
+
+def test_concurrent_callers_share_one_run_and_its_progress():
+    """Identical concurrent calls run once; late joiners get replayed stages."""
+    flights = SingleFlight()
+    runs = []
+    release = asyncio.Event()
+
+    async def work(on_stage):
+        runs.append(1)
+        on_stage("brief", "b", 0.1)
+        await release.wait()
+        on_stage("story", "s", 0.2)
+        return {"story": "s"}
+
+    async def scenario():
+        seen = [[], []]
+        first = asyncio.ensure_future(flights.run("k", work, lambda *e: seen[0].append(e[0])))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.run("k", work, lambda *e: seen[1].append(e[0])))
+        await asyncio.sleep(0)
+        release.set()
+        return await asyncio.gather(first, second), seen
+
+    results, seen = asyncio.run(scenario())
+
+    assert len(runs) == 1
+    assert results[0] == results[1] == {"story": "s"}
+    assert seen == [["brief", "story"], ["brief", "story"]]
+    assert flights.stats() == {"in_flight": 0, "started": 1, "coalesced": 1}
+
+def test_errors_reach_every_waiter_and_are_not_remembered():
+    """A failed run raises in all waiters; the next call starts afresh."""
+    flights = SingleFlight()
+    attempts = []
+
+    async def failing(on_stage):
+        attempts.append(1)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("rate limited")
+
+    async def scenario():
+        outcomes = await asyncio.gather(
+            flights.run("k", failing), flights.run("k", failing), return_exceptions=True
+        )
+        assert all(isinstance(o, RuntimeError) for o in outcomes)
+        with pytest.raises(RuntimeError):
+            await flights.run("k", failing)
+
+    asyncio.run(scenario())
+    assert len(attempts) == 2
+
+def test_run_is_cancelled_when_last_waiter_leaves():
+    """The shared run stops once nobody is waiting for it."""
+    flights = SingleFlight()
+    cancelled = []
+
+    async def slow(on_stage):
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def scenario():
+        waiter = asyncio.ensure_future(flights.run("k", slow))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        await asyncio.gather(waiter, return_exceptions=True)
+        await asyncio.sleep(0)
+
+    asyncio.run(scenario())
+    assert cancelled == [1]
+    assert flights.stats()["in_flight"] == 0
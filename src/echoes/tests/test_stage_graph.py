@@ -0,0 +1,66 @@
+"""Tests for the pipeline stage graph executor."""
+
+import asyncio
+import pytest
+
+from echoes.workflows.stage_graph import Stage, run_stages
+
+def test_independent_stages_run_concurrently():
+    """Stages sharing only a seed input should overlap in time."""
+    running = 0
+    peak = 0
+
+    async def slow(topic):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.05)
+        running -= 1
+        return topic.upper()
+
+    async def join(a, b):
+        return f"{a}+{b}"
+
+    stages = [
+        Stage("a", slow, ("topic",)),
+        Stage("b", slow, ("topic",)),
+        Stage("c", join, ("a", "b")),
+    ]
+    completed = []
+    results = asyncio.run(
+        run_stages(stages, seed={"topic": "x"},
+                   on_stage_complete=lambda name, value, elapsed: completed.append(name))
+    )
+
+    assert peak == 2
+    assert results["c"] == "X+X"
+    assert completed[-1] == "c"
+
+def test_failing_stage_cancels_the_rest():
+    """An error in one stage propagates and cancels unfinished stages."""
+    cancelled = []
+
+    async def boom(topic):
+        raise RuntimeError("boom")
+
+    async def slow(topic):
+        try:
+            await asyncio.sleep(1)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    stages = [Stage("bad", boom, ("topic",)), Stage("slow", slow, ("topic",))]
+    with pytest.raises(RuntimeError, match="boom"):
+        asyncio.run(run_stages(stages, seed={"topic": "x"}))
+    assert cancelled == [True]
+
+def test_invalid_graphs_are_rejected():
+    """Unknown inputs and cycles are reported before anything runs."""
+    async def noop(**kwargs):
+        return None
+
+    with pytest.raises(ValueError, match="unknown input"):
+        asyncio.run(run_stages([Stage("a", noop, ("missing",))]))
+    with pytest.raises(ValueError, match="cycle"):
+        asyncio.run(run_stages([Stage("a", noop, ("b",)), Stage("b", noop, ("a",))]))
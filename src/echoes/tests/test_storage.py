@@ -0,0 +1,46 @@
+"""Tests for the media storage service."""
+
+import asyncio
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+from echoes.services import storage
+from echoes.services.storage import LocalStorageBackend
+
+def test_identical_content_is_stored_once(tmp_path):
+    """Saving the same bytes twice returns the same file without rewriting it."""
+    backend = LocalStorageBackend(tmp_path)
+    with patch.object(storage, "storage_backend", backend):
+        first = storage.save_binary("audio_cleopatra.mp3", b"mp3 data")
+        os.utime(first, (1, 1))
+        second = storage.save_binary("audio_other.mp3", b"mp3 data")
+        other = storage.save_text("video.mp4", "different")
+
+        url = storage.public_url(first)
+
+    assert first == second != other
+    assert os.stat(first).st_mtime == 1  # not rewritten
+    assert Path(first).name.endswith(".mp3") and len(Path(first).stem) == 64
+    assert url == f"/static/{Path(first).parent.name}/{Path(first).name}"
+    assert backend.stats()["dedup_hits"] == 1
+    assert backend.stats()["writes"] == 2
+    assert not list(tmp_path.rglob("*.tmp"))
+
+def test_save_stream_accepts_sync_and_async_chunks(tmp_path):
+    """Streamed content is stored under the same key as the equivalent bytes."""
+    backend = LocalStorageBackend(tmp_path)
+
+    async def body():
+        for chunk in (b"ID3", b"frame1", b"frame2"):
+            yield chunk
+
+    with patch.object(storage, "storage_backend", backend):
+        streamed = asyncio.run(storage.save_stream("audio.mp3", body()))
+        listed = asyncio.run(storage.save_stream("audio.mp3", [b"ID3frame1", b"frame2"]))
+        whole = storage.save_binary("audio.mp3", b"ID3frame1frame2")
+
+    assert streamed == listed == whole
+    assert Path(streamed).read_bytes() == b"ID3frame1frame2"
+    assert backend.stats()["writes"] == 1
+    assert not list(tmp_path.rglob("*.tmp"))
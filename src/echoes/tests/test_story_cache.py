@@ -0,0 +1,75 @@
+"""Tests for the story result cache."""
+
+import json
+from unittest.mock import patch
+
+from echoes.services.story_cache import StoryCache, story_cache_key
+
+def test_lru_eviction_and_disk_persistence(tmp_path):
+    """Evicted entries are still served from disk, including after a restart."""
+    cache = StoryCache(max_entries=1, directory=tmp_path)
+    cache.set("a", {"story": "A"})
+    cache.set("b", {"story": "B"})
+    
+    assert cache.stats()["evictions"] == 1
+    assert cache.get("a") == {"story": "A"}
+    assert cache.stats()["disk_hits"] == 1
+    
+    restarted = StoryCache(max_entries=1, directory=tmp_path)
+    assert restarted.get("b") == {"story": "B"}
+
+def test_entries_expire_after_ttl(tmp_path):
+    """Entries older than the TTL are misses in memory and on disk."""
+    cache = StoryCache(ttl_seconds=60, directory=tmp_path)
+    with patch("echoes.services.story_cache.time.time", return_value=1000.0):
+        cache.set("a", {"story": "A"})
+    with patch("echoes.services.story_cache.time.time", return_value=1061.0):
+        assert cache.get("a") is None
+    assert not (tmp_path / "a.json").exists()
+    assert cache.stats()["misses"] == 1
+
+def test_values_has_no_side_effects(tmp_path):
+    """Listing entries (as the retention dry run does) never deletes expired files."""
+    cache = StoryCache(ttl_seconds=60, directory=tmp_path)
+    with patch("echoes.services.story_cache.time.time", return_value=1000.0):
+        cache.set("old", {"story": "Old"})
+    with patch("echoes.services.story_cache.time.time", return_value=1030.0):
+        cache.set("new", {"story": "New"})
+    restarted = StoryCache(ttl_seconds=60, directory=tmp_path)
+    with patch("echoes.services.story_cache.time.time", return_value=1061.0):
+        assert restarted.values() == [{"story": "New"}]
+    assert (tmp_path / "old.json").exists()
+    assert restarted.stats()["hits"] == 0
+
+def test_wrongly_shaped_disk_entries_are_pruned_misses(tmp_path):
+    """Valid JSON without the expected fields is dropped like corrupt JSON."""
+    cache = StoryCache(directory=tmp_path)
+    entries = {
+        "list": [1, 2],
+        "no_result": {"created_at": 1.0},
+        "no_time": {"result": {}},
+        "bad_time": {"created_at": "soon", "result": {}},
+        "bad_result": {"created_at": 1.0, "result": []},
+    }
+    for key, entry in entries.items():
+        (tmp_path / f"{key}.json").write_text(json.dumps(entry), encoding="utf-8")
+
+    for key in entries:
+        assert cache.get(key) is None
+        assert not (tmp_path / f"{key}.json").exists()
+
+def test_failed_disk_write_keeps_memory_entry(tmp_path):
+    """A disk error while storing is logged; the story is still cached in memory."""
+    cache = StoryCache(directory=tmp_path / "stories")
+    with patch("echoes.services.story_cache.os.replace", side_effect=OSError("disk full")):
+        cache.set("a", {"story": "A"})
+
+    assert cache.get("a") == {"story": "A"}
+    assert list((tmp_path / "stories").iterdir()) == []
+
+def test_key_depends_on_normalized_topic_model_and_prompts():
+    """Keys ignore topic case/whitespace but not model or prompt version."""
+    key = story_cache_key("Cleopatra", "gpt-4o", "v1")
+    assert story_cache_key("  cleopatra ", "gpt-4o", "v1") == key
+    assert story_cache_key("Cleopatra", "gpt-4o-mini", "v1") != key
+    assert story_cache_key("Cleopatra", "gpt-4o", "v2") != key
@@ -1,20 +1,24 @@
 """Tests for story pipeline."""
 
+import asyncio
+import json
+import time
 import pytest
 from fastapi.testclient import TestClient
+from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
 # Import the FastAPI app
 from echoes.app.main import app
+from echoes.app.routers.story import _job_response
+from echoes.services.story_cache import StoryCache
+from echoes.services.story_sessions import story_sessions
+from echoes.tests.conftest import MockResult, mock_runner_run
+from echoes.workflows.jobs import StoryJobQueue
+from echoes.workflows.story_pipeline import get_story_experience
 
 client = TestClient(app)
 
-# Mock result class
-class MockResult:
-    """Mock result from Runner.run."""
-    def __init__(self, output: str):
-        self.final_output = output
-
 # Mock agent builders
 def mock_researcher_agent(model: str):
     """Mock researcher agent with deterministic output."""
@@ -109,84 +113,13 @@ Key guidelines:
 - End with reflection on the broader implications of the event"""
     )
 
-async def mock_runner_run(agent, prompt):
-    """Mock Runner.run that returns appropriate MockResult based on agent."""
-    # Determine which agent this is based on the prompt or agent attributes
-    if "research" in prompt.lower() or "brief" in prompt.lower():
-        response = """Research Brief: The Fall of the Berlin Wall
-
-Key Points:
-- The Berlin Wall stood from 1961 to 1989
-- Divided East and West Berlin during the Cold War
-- Symbol of the Iron Curtain between Soviet and Western blocs
-- Peaceful protests and political changes led to its fall
-
-Timeline:
-- August 13, 1961: Construction begins
-- November 9, 1989: Border crossing announcement
-- November 10-12, 1989: Wall breached and dismantled
-
-Sources: Historical records and Cold War documentation"""
-    elif "narrative" in prompt.lower() and "style" in prompt.lower():
-        response = """You are a historical storyteller specializing in dramatic political events. Create narratives that:
-
-- Use third-person limited perspective with dramatic tension and emotional depth
-- Explore themes of division, unity, freedom, and human resilience
-- Develop characters through their reactions to historical forces
-- Structure stories with clear scene beats and emotional arcs
-- Maintain historical accuracy while focusing on human elements
-
-Key guidelines:
-- Build suspense through political uncertainty and personal stakes
-- Include sensory details of crowds, sounds, and atmosphere
-- Show transformation from division to unity
-- End with hope and reflection on human potential"""
-    elif "scene beats" in prompt.lower() or "narrative script" in prompt.lower():
-        response = """It was November 9, 1989. The city of Berlin held its breath.
-
-SCENE 1: A crowd gathers at Checkpoint Charlie as rumors spread of border changes.
-
-For 28 years, the concrete barrier had divided families, friends, and a nation. But tonight was different.
-
-SCENE 2: Guards at the wall look at each other uncertainly, overwhelmed by thousands approaching.
-
-When the announcement came, it was unclear and hurried. But the people understood: the wall was opening.
-
-SCENE 3: Hammers and picks appear. People climb the wall, celebrating together.
-
-By dawn, the symbol of division was becoming a symbol of unity. The Berlin Wall was falling, and with it, an era was ending."""
-    elif "analyze this story" in prompt.lower() or "system prompt" in prompt.lower():
-        response = """You are a historical storyteller specializing in dramatic political transformations. Create narratives that:
-
-- Use third-person dramatic perspective with building tension and emotional release
-- Explore themes of division overcome, freedom achieved, and human resilience
-- Develop characters through their personal reactions to world-changing events
-- Structure stories with scene progression: setup, confrontation, climax, resolution
-- Maintain atmospheric tension throughout with sensory details and emotional stakes
-
-Key guidelines:
-- Focus on the human element within larger historical forces
-- Build emotional investment through personal stories and relationships
-- Include vivid scene descriptions for visual impact
-- Balance educational content with engaging narrative flow
-- End with reflection on the broader implications of the event"""
-    else:  # QA agent
-        response = """Q: When did the Berlin Wall fall?
-A: November 9, 1989
-
-Q: How long did the Berlin Wall stand?
-A: 28 years, from 1961 to 1989
-
-Q: What caused the fall of the Berlin Wall?
-A: Peaceful protests, political reforms in Eastern Europe, and mounting pressure for freedom
-
-Q: What did the Berlin Wall symbolize?
-A: The division between communist East and democratic West during the Cold War
-
-Q: How did people react when the wall came down?
-A: With celebration, joy, and emotional reunions of families separated for decades"""
-    
-    return MockResult(response)
+@pytest.fixture(autouse=True)
+def isolated_story_cache():
+    """Give each test an empty, memory-only story cache."""
+    cache = StoryCache(directory=None)
+    with patch('echoes.workflows.story_pipeline.story_cache', cache), \
+         patch('echoes.app.routers.stats.story_cache', cache):
+        yield cache
 
 @pytest.fixture
 def mock_agents():
@@ -257,4 +190,263 @@ def test_story_endpoint_missing_topic():
 def test_chat_endpoint_missing_fields():
     """Test /api/chat with missing required fields."""
     response = client.post("/api/chat", json={"question": "test"})
-    assert response.status_code == 422  # Validation error
\ No newline at end of file
+    assert response.status_code == 422  # Validation error
+
+
+def test_story_stream_endpoint(mock_agents):
+    """Test /api/story/stream emits each artifact and a final complete event."""
+    response = client.post(
+        "/api/story/stream",
+        json={"topic": "The Fall of the Berlin Wall"}
+    )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    
+    events = {}
+    for message in response.text.strip().split("\n\n"):
+        event_line, data_line = message.split("\n")
+        events[event_line[len("event: "):]] = json.loads(data_line[len("data: "):])
+    
+    assert set(events) == {"brief", "story", "system_prompt", "faq", "audio_url", "video_url", "complete"}
+    assert "Berlin Wall" in events["brief"]
+    assert isinstance(events["faq"], list)
+    assert events["complete"]["topic"] == "The Fall of the Berlin Wall"
+    assert events["complete"]["story"] == events["story"]
+
+def test_story_endpoint_uses_cache(mock_agents, isolated_story_cache):
+    """Repeat topics are served from the story cache without rerunning agents."""
+    first = client.post("/api/story", json={"topic": "The Fall of the Berlin Wall"})
+    assert first.status_code == 200
+    
+    with patch('agents.Runner.run', side_effect=AssertionError("pipeline should not run")):
+        second = client.post("/api/story", json={"topic": "  the fall of the BERLIN wall "})
+    
+    assert second.status_code == 200
+    assert second.json()["story"] == first.json()["story"]
+    assert second.json()["topic"] == "  the fall of the BERLIN wall "
+    
+    stats = client.get("/api/stats").json()["story_cache"]
+    assert stats["hits"] == 1
+    assert stats["misses"] == 1
+
+def test_story_job_reports_progress_and_result(mock_agents):
+    """Jobs are accepted immediately and finish in the background."""
+    with patch('echoes.app.main.settings.media_sweep_interval_seconds', 0), \
+         TestClient(app) as job_client:
+        submitted = job_client.post("/api/story/jobs", json={"topic": "The Fall of the Berlin Wall"})
+        assert submitted.status_code == 202
+        job_id = submitted.json()["job_id"]
+        assert submitted.json()["status"] in ("queued", "running")
+        
+        for _ in range(100):
+            job = job_client.get(f"/api/story/jobs/{job_id}").json()
+            if job["status"] == "completed":
+                break
+            time.sleep(0.02)
+    
+    assert job["status"] == "completed"
+    assert job["pending_stages"] == []
+    assert set(job["completed_stages"]) >= {"brief", "story", "faq", "audio_url", "video_url"}
+    assert "November 9, 1989" in job["result"]["story"]
+    assert client.get("/api/story/jobs/unknown").status_code == 404
+
+def test_story_job_positions_and_cached_completion():
+    """Queued jobs report their place in line; a job answered from cache has nothing pending."""
+    async def scenario():
+        release = asyncio.Event()
+
+        async def slow_story(topic, model, on_stage_complete=None):
+            await release.wait()
+            return {"topic": topic, "brief": "b", "story": "s", "system_prompt": "p",
+                    "faq": [], "audio_url": "/a.mp3", "video_url": "/v.mp4"}
+
+        queue = StoryJobQueue(workers=1)
+        with patch('echoes.workflows.jobs.get_story_experience', side_effect=slow_story):
+            jobs = [queue.submit(f"Topic {i}", "gpt-4o") for i in range(3)]
+            await asyncio.sleep(0)
+            positions = [queue.position(job) for job in jobs]
+            release.set()
+            await asyncio.sleep(0.05)
+            await queue.stop()
+        return jobs, positions
+
+    jobs, positions = asyncio.run(scenario())
+    assert positions == [None, 0, 1]
+    assert all(job.status == "completed" for job in jobs)
+    # Cache hits never call on_stage_complete
+    response = _job_response(jobs[0])
+    assert response.completed_stages == {} and response.pending_stages == []
+
+def test_story_jobs_left_behind_by_stop_or_a_new_loop_fail():
+    """Jobs whose workers went away report failed instead of staying queued."""
+    async def stuck_story(topic, model, on_stage_complete=None):
+        await asyncio.Event().wait()
+
+    async def submit_and_stop(queue):
+        jobs = [queue.submit(f"Topic {i}", "gpt-4o") for i in range(2)]
+        await asyncio.sleep(0)
+        await queue.stop()
+        return jobs
+
+    async def submit(queue):
+        return queue.submit("Topic", "gpt-4o")
+
+    async def restart(queue):
+        queue.start()
+        await queue.stop()
+
+    stopped_queue, restarted_queue = StoryJobQueue(workers=1), StoryJobQueue(workers=1)
+    with patch('echoes.workflows.jobs.get_story_experience', side_effect=stuck_story):
+        stopped = asyncio.run(submit_and_stop(stopped_queue))
+        stranded = asyncio.run(submit(restarted_queue))
+        asyncio.run(restart(restarted_queue))
+
+    for job in stopped + [stranded]:
+        assert job.status == "failed" and job.error and job.finished_at
+    assert stopped_queue.stats()["failed"] == 2 and restarted_queue.stats()["failed"] == 1
+    assert restarted_queue.position(stranded) is None
+
+def test_story_job_queue_full_returns_429():
+    """A full job queue rejects submissions with Retry-After."""
+    with patch('echoes.app.routers.story.story_jobs', StoryJobQueue(workers=1, max_depth=0)):
+        response = client.post("/api/story/jobs", json={"topic": "The Fall of the Berlin Wall"})
+    
+    assert response.status_code == 429
+    assert int(response.headers["retry-after"]) > 0
+
+def test_concurrent_identical_stories_run_pipeline_once(isolated_story_cache):
+    """Simultaneous requests for one topic share a single pipeline run."""
+    with patch('agents.Runner.run', side_effect=mock_runner_run) as runner:
+        async def burst():
+            return await asyncio.gather(
+                get_story_experience("The Fall of the Berlin Wall", "gpt-4o"),
+                get_story_experience("the fall of the berlin wall", "gpt-4o"),
+            )
+        first, second = asyncio.run(burst())
+    
+    assert runner.call_count == 5  # one run of the five agents
+    assert first["story"] == second["story"]
+    assert second["topic"] == "the fall of the berlin wall"
+
+def test_chat_by_story_id_uses_server_side_session(mock_agents):
+    """Chat turns can refer to a generated story by id instead of resending it."""
+    story = client.post("/api/story", json={"topic": "The Fall of the Berlin Wall"}).json()
+    assert story["story_id"]
+    
+    prompts = []
+    
+    async def capture(agent, prompt):
+        prompts.append(prompt)
+        return MockResult("November 9, 1989")
+    
+    with patch('agents.Runner.run', side_effect=capture):
+        for question in ("When did the wall fall?", "Who opened the border?"):
+            response = client.post("/api/chat", json={"story_id": story["story_id"], "question": question})
+            assert response.status_code == 200
+    
+    assert story["story"] in prompts[0]
+    assert prompts[0].endswith("Q: When did the wall fall?\nA:")
+    # Identical prefix on every turn
+    prefix = prompts[0][:prompts[0].index("Q: ")]
+    assert prompts[1].startswith(prefix)
+    
+    missing = client.post("/api/chat", json={"story_id": "unknown", "question": "Why?"})
+    assert missing.status_code == 404
+
+def test_regenerated_story_gets_a_new_story_id(isolated_story_cache):
+    """A story generated again for the same topic never replaces the one behind an old id."""
+    async def rewritten(agent, prompt):
+        result = await mock_runner_run(agent, prompt)
+        return MockResult(str(result.final_output).replace("1989", "1989 (revised)"))
+
+    with patch('agents.Runner.run', side_effect=mock_runner_run):
+        first = client.post("/api/story", json={"topic": "Regenerated topic"}).json()
+    isolated_story_cache.clear()
+    with patch('agents.Runner.run', side_effect=rewritten):
+        second = client.post("/api/story", json={"topic": "Regenerated topic"}).json()
+    with patch('agents.Runner.run', side_effect=mock_runner_run):
+        cached = client.post("/api/story", json={"topic": "regenerated topic"}).json()
+
+    assert first["story"] != second["story"]
+    assert first["story_id"] != second["story_id"]
+    assert cached["story_id"] == second["story_id"]
+    assert story_sessions.get(first["story_id"]).story == first["story"]
+
+class MockStreamedResult:
+    """Mock RunResultStreaming that emits output text deltas."""
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.is_complete = False
+        self.final_output = "".join(chunks)
+        self.context_wrapper = SimpleNamespace(usage=SimpleNamespace(
+            requests=1, input_tokens=120, output_tokens=len(chunks), total_tokens=120 + len(chunks)))
+    
+    async def stream_events(self):
+        for chunk in self.chunks:
+            yield SimpleNamespace(type="raw_response_event",
+                                  data=SimpleNamespace(type="response.output_text.delta", delta=chunk))
+        self.is_complete = True
+    
+    def cancel(self):
+        self.is_complete = True
+
+def test_chat_stream_endpoint():
+    """/api/chat/stream relays answer chunks, then the full answer and usage."""
+    with patch('agents.Runner.run_streamed', return_value=MockStreamedResult(["November ", "9, ", "1989"])):
+        response = client.post(
+            "/api/chat/stream",
+            json={"story_context": "The Berlin Wall fell in 1989.", "question": "When did the wall fall?"}
+        )
+    
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for message in response.text.strip().split("\n\n"):
+        event_line, data_line = message.split("\n")
+        events.append((event_line[len("event: "):], json.loads(data_line[len("data: "):])))
+    
+    assert [data["text"] for event, data in events if event == "delta"] == ["November ", "9, ", "1989"]
+    assert events[-1][0] == "complete"
+    assert events[-1][1]["answer"] == "November 9, 1989"
+    assert events[-1][1]["usage"]["total_tokens"] == 123
+
+def test_chat_answers_faq_questions_without_llm():
+    """Questions matching the story's FAQ skip the QA agent."""
+    story_sessions.put("berlin-faq", {
+        "topic": "The Fall of the Berlin Wall",
+        "brief": "Research Brief: The Fall of the Berlin Wall",
+        "story": "It was November 9, 1989.",
+        "faq": ["Q: When did the Berlin Wall fall?", "A: November 9, 1989",
+                "Q: How long did the Berlin Wall stand?", "A: 28 years"],
+    })
+    
+    with patch('agents.Runner.run', side_effect=AssertionError("LLM should not be called")), \
+         patch('echoes.app.routers.chat._chat_context',
+               side_effect=AssertionError("FAQ answers need no retrieval")):
+        response = client.post(
+            "/api/chat",
+            json={"story_id": "berlin-faq", "question": "when did the wall fall"}
+        )
+        streamed = client.post(
+            "/api/chat/stream",
+            json={"story_id": "berlin-faq", "question": "when did the wall fall"}
+        )
+    
+    assert response.status_code == 200
+    assert response.json() == {"answer": "November 9, 1989", "source": "faq"}
+    assert streamed.status_code == 200
+    complete = json.loads(streamed.text.strip().split("\n\n")[-1].split("data: ", 1)[1])
+    assert complete["answer"] == "November 9, 1989" and complete["source"] == "faq"
+
+def test_metrics_endpoint_reports_stage_latency(mock_agents):
+    """Stage durations and cache lookups appear on /metrics in Prometheus format."""
+    assert client.post("/api/story", json={"topic": "Metrics topic"}).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    for stage in ("brief", "story", "faq", "audio_url"):
+        assert f'echoes_stage_duration_seconds_count{{stage="{stage}"}}' in response.text
+    assert 'echoes_cache_lookups_total{cache="story",result="miss"}' in response.text
+    assert "story" in client.get("/api/stats").json()["latency"]["stage_seconds"]
@@ -0,0 +1,182 @@
+"""Tests for the TTS service."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+
+from echoes.app.main import app
+from echoes.services import openai_client, tts_service
+from echoes.services.audio_cache import AudioCache
+from echoes.tests.conftest import SlowSpeechClient, mock_runner_run
+
+def test_chat_is_not_stalled_while_tts_runs():
+    """A /api/chat request completes while a story's TTS call is still in flight."""
+    speech = SlowSpeechClient(delay=0.5)
+
+    async def scenario():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as http:
+            story = asyncio.ensure_future(
+                http.post("/api/story", json={"topic": "Unique TTS Topic"})
+            )
+            while speech.calls == 0:
+                await asyncio.sleep(0.01)
+
+            start = time.perf_counter()
+            chat = await http.post("/api/chat", json={
+                "story_context": "The Berlin Wall fell in 1989.",
+                "question": "When did it fall?",
+            })
+            chat_elapsed = time.perf_counter() - start
+
+            assert not story.done()
+            return chat, chat_elapsed, await story
+
+    with patch("agents.Runner.run", side_effect=mock_runner_run), \
+         patch("echoes.workflows.story_pipeline.story_cache", None), \
+         patch.object(tts_service, "audio_cache", None), \
+         patch.object(tts_service, "OPENAI_API_KEY", "test-key"), \
+         patch.object(tts_service, "get_async_openai_client", return_value=speech):
+        chat, chat_elapsed, story = asyncio.run(scenario())
+
+    assert chat.status_code == 200
+    assert chat_elapsed < 0.25
+    assert story.status_code == 200
+    assert story.json()["audio_url"].endswith(".mp3")
+
+def test_client_from_a_previous_loop_is_closed():
+    """A new event loop gets its own client and the previous one is closed."""
+    async def get_client():
+        return openai_client.get_async_openai_client()
+
+    async def replace_client():
+        client = openai_client.get_async_openai_client()
+        await asyncio.gather(*openai_client._closing)
+        await openai_client.close_async_openai_client()
+        return client
+
+    with patch.object(openai_client, "OPENAI_API_KEY", "test-key"), \
+         patch.object(openai_client, "_client", None), \
+         patch.object(openai_client, "_client_loop", None):
+        first = asyncio.run(get_client())
+        second = asyncio.run(replace_client())
+
+    assert second is not first
+    assert first.is_closed() and second.is_closed()
+
+def test_split_for_tts_respects_limit_and_boundaries():
+    """Chunks stay under the limit and break between paragraphs or sentences."""
+    paragraph = "The wall fell. Crowds cheered. Families reunited."
+    text = "\n\n".join([paragraph] * 4)
+
+    chunks = tts_service._split_for_tts(text, max_chars=110)
+
+    assert all(len(chunk) <= 110 for chunk in chunks)
+    assert chunks[0] == f"{paragraph}\n\n{paragraph}"
+    assert " ".join(" ".join(chunks).split()) == " ".join(text.split())
+
+    long_sentence = "word " * 100
+    assert all(len(chunk) <= 30 for chunk in tts_service._split_for_tts(long_sentence, 30))
+
+def test_long_scripts_are_synthesized_in_parallel_chunks():
+    """Each chunk gets its own API call and the MP3 data is joined in order."""
+    calls = []
+
+    async def fake_create_speech(text, voice):
+        calls.append(text)
+        await asyncio.sleep(0.01 if text.startswith("First") else 0)
+        return b"ID3\x00\x00\x00\x00\x00\x00\x02xx" + text.split()[0].encode()
+
+    text = "First paragraph here.\n\nSecond paragraph here.\n\nThird paragraph here."
+    with patch.object(tts_service.settings, "tts_chunk_chars", 25), \
+         patch.object(tts_service, "_create_speech", side_effect=fake_create_speech):
+        audio = b"".join(asyncio.run(tts_service._synthesize_segments([("alloy", text)])))
+
+    assert len(calls) == 3
+    # Only the first chunk keeps its ID3 tag
+    assert audio == b"ID3\x00\x00\x00\x00\x00\x00\x02xxFirstSecondThird"
+
+def test_multi_voice_script_uses_per_character_voices():
+    """Marked segments get their own voices, in order, with duplicates synthesized once."""
+    calls = []
+
+    async def fake_create_speech(text, voice):
+        calls.append((voice, text))
+        return f"<{voice}:{text}>".encode()
+
+    script = (
+        "The palace was silent.\n"
+        "[CLEOPATRA]: Rome will not take Egypt.\n"
+        "[NARRATOR]: The queen waited.\n"
+        "[CLEOPATRA]: Rome will not take Egypt.\n"
+    )
+    saved = {}
+
+    async def fake_save_stream(filename, chunks):
+        saved["data"] = b"".join(chunks)
+        return filename
+
+    with patch.object(tts_service, "_create_speech", side_effect=fake_create_speech), \
+         patch.object(tts_service, "save_stream", side_effect=fake_save_stream):
+        asyncio.run(tts_service._synthesize_multi_voice(script, "Cleopatra"))
+
+    assert tts_service._parse_segments(script)[0] == ("NARRATOR", "The palace was silent.")
+    assert len(calls) == 3
+    assert saved["data"] == (
+        b"<alloy:The palace was silent.>"
+        b"<fable:Rome will not take Egypt.>"
+        b"<alloy:The queen waited.>"
+        b"<fable:Rome will not take Egypt.>"
+    )
+
+def test_repeated_segments_are_served_from_audio_cache():
+    """A second synthesis of the same text and voice makes no API call."""
+    speech = SlowSpeechClient(delay=0)
+    cache = AudioCache(max_bytes=1024)
+
+    with patch.object(tts_service, "audio_cache", cache), \
+         patch.object(tts_service, "get_async_openai_client", return_value=speech):
+        first = asyncio.run(tts_service._create_speech("The wall fell.", "onyx"))
+        second = asyncio.run(tts_service._create_speech("The wall fell.", "onyx"))
+        asyncio.run(tts_service._create_speech("The wall fell.", "nova"))
+
+    assert first == second
+    assert speech.calls == 2
+    stats = cache.stats()
+    assert stats["hits"] == 1
+    assert stats["bytes_saved"] == len(first)
+
+def test_audio_cache_evicts_least_recently_used():
+    """The cache stays within its byte budget by dropping the oldest entries."""
+    cache = AudioCache(max_bytes=10)
+    cache.set("a", b"aaaa")
+    cache.set("b", b"bbbb")
+    cache.get("a")
+    cache.set("c", b"cccc")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == b"aaaa"
+    assert cache.stats()["bytes"] == 8
+
+def test_voice_selection_matches_known_cases():
+    """Voice selection for the test_voices.py cases is unchanged."""
+    cases = [
+        ("Cleopatra", "I am Cleopatra, the last pharaoh of Egypt...", "fable"),
+        ("Hannibal", "I am Hannibal, the Carthaginian general...", "echo"),
+        ("Alexander the Great", "I am Alexander, the Macedonian conqueror...", "onyx"),
+        ("Paris", "I am 80 years old and have lived in Paris all my life...", "shimmer"),
+        ("Medieval Knight", "I am a knight in shining armor from the Middle Ages...", "onyx"),
+        ("Modern Scientist", "I am Albert Einstein, the physicist...", "alloy"),
+    ]
+    for topic, script, voice in cases:
+        assert tts_service._analyze_context_for_voice(script, topic) == voice
+
+def test_gender_indicator_counts_match_str_count():
+    """The single-pass counter follows str.count's space and overlap rules."""
+    text = "he he he said to her and him his\nhe her"
+    expected_male = sum(text.count(f" {word} ") for word in tts_service._MALE_INDICATORS)
+    expected_female = sum(text.count(f" {word} ") for word in tts_service._FEMALE_INDICATORS)
+
+    assert tts_service._count_gender_indicators(text) == (expected_male, expected_female)
@@ -0,0 +1,199 @@
+"""Batch generation of story experiences for many topics."""
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set
+
+from ..services.percentiles import summarize
+from ..services.story_cache import normalize_topic
+from .story_pipeline import get_story_experience
+
+def read_topics(lines: Iterable[str]) -> List[str]:
+    """
+    Parse a topic list: one topic per line, blank lines and ``#`` comments ignored.
+
+    Duplicate topics (after normalization) are kept only once.
+
+    Args:
+        lines: Lines from a file or stdin
+
+    Returns:
+        Topics in input order
+    """
+    topics: List[str] = []
+    seen: Set[str] = set()
+    for line in lines:
+        topic = line.strip()
+        if not topic or topic.startswith("#"):
+            continue
+        key = normalize_topic(topic)
+        if key not in seen:
+            seen.add(key)
+            topics.append(topic)
+    return topics
+
+def completed_topics(output: Path) -> Set[str]:
+    """
+    Return the normalized topics already completed in a JSONL output file.
+
+    A partially written last line (from an interrupted run) is ignored,
+    even when it was cut inside a multi-byte character.
+
+    Args:
+        output: Path of the batch output file
+
+    Returns:
+        Set of normalized topics with a successful record
+    """
+    done: Set[str] = set()
+    if not output.exists():
+        return done
+    with open(output, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("status") == "ok":
+                done.add(normalize_topic(record["topic"]))
+    return done
+
+@dataclass
+class BatchSummary:
+    """
+    Outcome of a batch run.
+
+    Attributes:
+        total: Topics given
+        skipped: Topics already completed by an earlier run
+        succeeded: Topics generated in this run
+        failed: Topics that raised an error (retried by the next run)
+        wall_seconds: Elapsed time of this run
+        story_seconds: End-to-end time of each generated story
+        stage_seconds: Elapsed times per pipeline stage
+    """
+    total: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    wall_seconds: float = 0.0
+    story_seconds: List[float] = field(default_factory=list)
+    stage_seconds: Dict[str, List[float]] = field(default_factory=dict)
+
+    @property
+    def stories_per_minute(self) -> float:
+        return self.succeeded * 60 / self.wall_seconds if self.wall_seconds else 0.0
+
+    def to_dict(self) -> dict:
+        """Return the summary with latencies reduced to mean/p50/p95/p99/max."""
+        return {
+            "total": self.total,
+            "skipped": self.skipped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "wall_seconds": self.wall_seconds,
+            "stories_per_minute": self.stories_per_minute,
+            "story_seconds": summarize(self.story_seconds),
+            "stage_seconds": {name: summarize(values)
+                              for name, values in self.stage_seconds.items()},
+        }
+
+    def format(self) -> str:
+        """Render the summary as a plain-text report."""
+        lines = [
+            f"Topics: {self.total} total, {self.skipped} skipped, "
+            f"{self.succeeded} succeeded, {self.failed} failed",
+            f"Wall time: {self.wall_seconds:.1f}s "
+            f"({self.stories_per_minute:.2f} stories/min)",
+        ]
+        rows = []
+        if self.story_seconds:
+            rows.append(("story (end to end)", summarize(self.story_seconds)))
+        rows.extend((name, summarize(values))
+                    for name, values in sorted(self.stage_seconds.items()))
+        if rows:
+            lines.append("")
+            lines.append(f"{'stage':<20} {'count':>6} {'mean':>8} {'p50':>8} {'p95':>8} {'max':>8}")
+            for name, stats in rows:
+                lines.append(f"{name:<20} {stats['count']:>6} {stats['mean']:>7.2f}s "
+                             f"{stats['p50']:>7.2f}s {stats['p95']:>7.2f}s {stats['max']:>7.2f}s")
+        return "\n".join(lines)
+
+async def run_batch(
+    topics: List[str],
+    model: str,
+    output: Path,
+    concurrency: int = 4,
+    on_topic_done: Optional[Callable[[dict], None]] = None,
+) -> BatchSummary:
+    """
+    Generate stories for many topics, appending each result to a JSONL file.
+
+    Up to ``concurrency`` topics run at once. Each finished topic is
+    written immediately as one JSON line (``{"topic", "status",
+    "elapsed_seconds", "result" | "error"}``), so an interrupted run loses
+    nothing already generated, and a rerun skips topics recorded as ok.
+
+    Args:
+        topics: Topics to generate
+        model: OpenAI model name (e.g., "gpt-4o")
+        output: JSONL file to append to (created if missing)
+        concurrency: Maximum topics in flight
+        on_topic_done: Optional callback(record) after each topic, for progress
+
+    Returns:
+        BatchSummary with counts, throughput and latencies
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    summary = BatchSummary(total=len(topics))
+    done = completed_topics(output)
+    pending = [t for t in topics if normalize_topic(t) not in done]
+    summary.skipped = len(topics) - len(pending)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    write_lock = asyncio.Lock()
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    def on_stage_complete(name: str, value, elapsed: float) -> None:
+        summary.stage_seconds.setdefault(name, []).append(elapsed)
+
+    def append(f, line: str) -> None:
+        f.write(line)
+        f.flush()
+
+    async def one(topic: str, f) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                result = await get_story_experience(topic, model, on_stage_complete=on_stage_complete)
+                record = {"topic": topic, "status": "ok", "result": result}
+                summary.succeeded += 1
+                summary.story_seconds.append(time.perf_counter() - start)
+            except Exception as e:
+                record = {"topic": topic, "status": "error", "error": str(e)}
+                summary.failed += 1
+            record["elapsed_seconds"] = time.perf_counter() - start
+            line = json.dumps(record, ensure_ascii=False) + "\n"
+            async with write_lock:
+                await asyncio.to_thread(append, f, line)
+            if on_topic_done is not None:
+                on_topic_done(record)
+
+    # An interrupted run may have left half a line; start on a fresh one.
+    # Checked in binary, since the cut may be inside a multi-byte character.
+    if output.exists() and output.stat().st_size > 0:
+        with open(output, "rb+") as f:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b"\n":
+                f.write(b"\n")
+
+    start = time.perf_counter()
+    with open(output, "a", encoding="utf-8") as f:
+        await asyncio.gather(*(one(topic, f) for topic in pending))
+    summary.wall_seconds = time.perf_counter() - start
+    return summary
@@ -0,0 +1,225 @@
+"""Background job queue for story generation."""
+
+import asyncio
+import logging
+import math
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from ..app.settings import settings
+from .story_pipeline import build_story_stages, get_story_experience
+
+logger = logging.getLogger(__name__)
+
+class JobQueueFull(Exception):
+    """Raised when a job is submitted while the queue is at its depth limit."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Story job queue is full; retry after {retry_after}s")
+        self.retry_after = retry_after
+
+@dataclass
+class StoryJob:
+    """
+    State of one queued story generation.
+
+    Attributes:
+        id: Job identifier returned to the client
+        topic: Historical topic to explore
+        model: OpenAI model name
+        status: "queued", "running", "completed" or "failed"
+        stage_names: Every stage the pipeline will run
+        stage_seconds: Elapsed seconds of each stage completed so far
+        result: Story result dict once completed
+        error: Failure detail once failed
+    """
+    id: str
+    topic: str
+    model: str
+    status: str = "queued"
+    stage_names: List[str] = field(default_factory=list)
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def on_stage_complete(self, name: str, value: Any, elapsed: float) -> None:
+        self.stage_seconds[name] = elapsed
+
+class StoryJobQueue:
+    """
+    Bounded queue of story jobs drained by a fixed pool of worker tasks.
+
+    Throughput is set by the worker count rather than by how long clients
+    keep connections open. Submissions beyond ``max_depth`` waiting jobs
+    are rejected with JobQueueFull. Finished jobs are kept for lookup, up
+    to ``max_finished`` of them (oldest dropped first).
+    """
+
+    def __init__(self, workers: int = 4, max_depth: int = 100, max_finished: int = 1000):
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_finished = max_finished
+
+        self._jobs: Dict[str, StoryJob] = {}
+        self._finished: "OrderedDict[str, None]" = OrderedDict()
+        self._queue: Optional[asyncio.Queue] = None
+        self._waiting: deque = deque()  # ids of queued jobs, oldest first
+        self._tasks: List["asyncio.Task[None]"] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.submitted = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self._avg_job_seconds: Optional[float] = None
+
+    def start(self) -> None:
+        """Start the worker tasks on the running event loop (idempotent)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._tasks:
+            return
+        # Workers of a previous event loop are gone, and so is their queue
+        self._abandon("Job queue restarted before this job finished")
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        """Cancel the workers; jobs still queued or running are marked failed."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._loop = None
+        self._abandon("Job queue stopped before this job finished")
+
+    def _abandon(self, reason: str) -> None:
+        """Fail every queued or running job so its status doesn't stay pending."""
+        for job in list(self._jobs.values()):
+            if not job.done:
+                job.status = "failed"
+                job.error = reason
+                job.finished_at = time.time()
+                self.failed += 1
+                self._retire(job)
+        self._waiting.clear()
+
+    def _retry_after(self) -> int:
+        """Estimate seconds until a queue slot frees up."""
+        if self._avg_job_seconds is None:
+            return settings.story_job_retry_after_seconds
+        waiting = self._queue.qsize() if self._queue else 0
+        return max(1, math.ceil(self._avg_job_seconds * (waiting + 1) / self.workers))
+
+    def submit(self, topic: str, model: str) -> StoryJob:
+        """
+        Queue a story generation.
+
+        Args:
+            topic: Historical topic to explore
+            model: OpenAI model name (e.g., "gpt-4o")
+
+        Returns:
+            The queued StoryJob
+
+        Raises:
+            JobQueueFull: If max_depth jobs are already waiting
+        """
+        self.start()
+        if self._queue.qsize() >= self.max_depth:
+            self.rejected += 1
+            raise JobQueueFull(self._retry_after())
+
+        job = StoryJob(
+            id=uuid.uuid4().hex,
+            topic=topic,
+            model=model,
+            stage_names=[stage.name for stage in build_story_stages(model)],
+        )
+        self._jobs[job.id] = job
+        self._queue.put_nowait(job)
+        self._waiting.append(job.id)
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[StoryJob]:
+        """Return the job with this id, or None if unknown or expired."""
+        return self._jobs.get(job_id)
+
+    def position(self, job: StoryJob) -> Optional[int]:
+        """Return how many jobs are ahead of a queued job (None once started)."""
+        if job.status != "queued":
+            return None
+        try:
+            return self._waiting.index(job.id)
+        except ValueError:
+            return None
+
+    async def _worker(self) -> None:
+        while True:
+            job = await self._queue.get()
+            self._waiting.remove(job.id)
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: StoryJob) -> None:
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = await get_story_experience(
+                job.topic, job.model, on_stage_complete=job.on_stage_complete
+            )
+            job.status = "completed"
+            self.completed += 1
+        except Exception as e:
+            logger.exception("Story job %s failed", job.id)
+            job.error = str(e)
+            job.status = "failed"
+            self.failed += 1
+        job.finished_at = time.time()
+
+        elapsed = job.finished_at - job.started_at
+        if self._avg_job_seconds is None:
+            self._avg_job_seconds = elapsed
+        else:
+            self._avg_job_seconds = 0.8 * self._avg_job_seconds + 0.2 * elapsed
+        self._retire(job)
+
+    def _retire(self, job: StoryJob) -> None:
+        self._finished[job.id] = None
+        while len(self._finished) > self.max_finished:
+            old_id, _ = self._finished.popitem(last=False)
+            self._jobs.pop(old_id, None)
+
+    def stats(self) -> dict:
+        """Return queue depth, worker count and job outcome counters."""
+        running = sum(1 for job in self._jobs.values() if job.status == "running")
+        return {
+            "workers": self.workers,
+            "max_depth": self.max_depth,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "running": running,
+            "submitted": self.submitted,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "avg_job_seconds": self._avg_job_seconds,
+        }
+
+# Shared job queue, started with the application
+story_jobs = StoryJobQueue(
+    workers=settings.story_job_workers,
+    max_depth=settings.story_job_queue_depth,
+    max_finished=settings.story_job_max_finished,
+)
@@ -0,0 +1,98 @@
+"""Coalescing of identical concurrent pipeline runs."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .stage_graph import StageCallback
+
+class _Flight:
+    """One shared in-flight computation and the callers waiting on it."""
+
+    def __init__(self):
+        self.task: Optional["asyncio.Future[Any]"] = None
+        self.waiters = 0
+        self.completed: List[Tuple[str, Any, float]] = []
+        self.callbacks: List[StageCallback] = []
+
+    def on_stage_complete(self, name: str, value: Any, elapsed: float) -> None:
+        self.completed.append((name, value, elapsed))
+        for callback in list(self.callbacks):
+            callback(name, value, elapsed)
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time.
+
+    Callers arriving while a computation for their key is in flight wait
+    for it and receive the same result (or the same exception) instead of
+    starting their own. Stage progress is fanned out to every caller's
+    on_stage_complete, with stages finished before a caller joined
+    replayed to it first. Nothing is remembered once the computation
+    finishes, so failures are retried by the next caller.
+
+    The shared computation keeps running while at least one caller is
+    waiting; it is cancelled when the last one goes away.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, _Flight] = {}
+        self.started = 0
+        self.coalesced = 0
+
+    async def run(
+        self,
+        key: str,
+        func: Callable[[StageCallback], Awaitable[Any]],
+        on_stage_complete: Optional[StageCallback] = None,
+    ) -> Any:
+        """
+        Run func for key, or join the run already in progress.
+
+        Args:
+            key: Identity of the computation (equal keys share one run)
+            func: Called as func(on_stage_complete) to start a new run
+            on_stage_complete: Optional callback(stage_name, result, elapsed_seconds)
+
+        Returns:
+            The result of the shared run
+        """
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight()
+            flight.task = asyncio.ensure_future(func(flight.on_stage_complete))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+            self.started += 1
+        else:
+            self.coalesced += 1
+
+        if on_stage_complete is not None:
+            for event in flight.completed:
+                on_stage_complete(*event)
+            flight.callbacks.append(on_stage_complete)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if on_stage_complete is not None:
+                flight.callbacks.remove(on_stage_complete)
+            if flight.waiters == 0 and not flight.task.done():
+                flight.task.cancel()
+
+    def _land(self, key: str, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+        if not flight.task.cancelled():
+            # Waiters already received any exception; mark it retrieved even
+            # if they have all gone away, so it isn't logged as unhandled
+            flight.task.exception()
+
+    def stats(self) -> dict:
+        """Return the number of runs started, callers coalesced and runs in flight."""
+        return {
+            "in_flight": len(self._flights),
+            "started": self.started,
+            "coalesced": self.coalesced,
+        }
@@ -1,38 +1,42 @@
 """Workflow for the story generation pipeline."""
 
 import asyncio
-from agents import Runner
-from ..agents.researcher_agent import build_researcher_agent
-from ..agents.storyteller_agent import build_storyteller_agent
-from ..agents.qa_agent import build_qa_agent
-from ..agents.narrative_styler_agent import build_narrative_styler_agent
-from ..agents.story_analyzer_agent import build_story_analyzer_agent
-from ..services.tts_service import synthesize_voice
+import time
+from typing import Any, AsyncIterator, Optional, Tuple
+from ..agents.registry import agent_registry
+from ..agents.prompts import prompt_registry
+from ..services.llm_scheduler import llm_scheduler
+from ..services.metrics import metrics
+from ..services.tts_service import synthesize_voice_async
 from ..services.video_service import generate_video_from_script
+from ..services.story_cache import story_cache, story_cache_key
+from ..services.story_sessions import story_id_for, story_sessions
+from .single_flight import SingleFlight
+from .stage_graph import Stage, StageCallback, run_stages
 
-async def generate_story_experience(topic: str, model: str) -> dict:
+def build_story_stages(model: str) -> list:
     """
-    Generate a complete story experience from a historical topic.
-    
-    This orchestrates the multi-agent pipeline:
-    1. Research brief (facts, timeline, citations)
-    2. Narrative Style Guide (dynamic system prompt creation)
-    3. Story narrative (60-120s script with scene beats)
-    4. Story Analysis (generate system prompt from completed story)
-    5. FAQ list (5 Q&As)
-    6. Audio URL (TTS synthesis)
-    7. Video URL (video generation)
-    
+    Build the stage graph for the story pipeline.
+
+    The researcher and narrative styler only need the topic, and every step
+    after the storyteller only needs the story, so those groups run
+    concurrently:
+
+        brief ─┐                ┌─ system_prompt
+               ├─ story ────────┼─ faq
+        style ─┘                ├─ audio_url
+                                └─ video_url
+
     Args:
-        topic: Historical topic to explore
         model: OpenAI model name (e.g., "gpt-4o")
-    
+
     Returns:
-        Dictionary with keys: topic, brief, story, system_prompt, faq, audio_url, video_url
+        List of Stage objects; "topic" must be provided as a seed value
     """
     # Step 1: Research Agent - Gather factual information
-    researcher = build_researcher_agent(model)
-    research_prompt = f"""Topic: {topic}
+    async def research(topic: str) -> str:
+        researcher = agent_registry.get("researcher", model)
+        research_prompt = f"""Topic: {topic}
 
 Return a factual brief with:
 - 3-5 key bullet points about this topic
@@ -40,68 +44,259 @@ Return a factual brief with:
 - Brief citations or sources (can be general historical knowledge)
 
 Format as a structured brief."""
-    
-    research = str((await Runner.run(researcher, research_prompt)).final_output)
-    
+
+        return str((await llm_scheduler.run(researcher, research_prompt)).final_output)
+
     # Step 2: Narrative Styler Agent - Create dynamic system prompt
-    styler = build_narrative_styler_agent(model)
-    style_prompt = f"""Topic: {topic}
+    async def style(topic: str) -> str:
+        styler = agent_registry.get("narrative_styler", model)
+        style_prompt = f"""Topic: {topic}
 
 Analyze this historical topic and create a dynamic system prompt for storytelling.
 Consider the optimal narrative perspective and style for this specific topic."""
 
-    dynamic_system_prompt = str((await Runner.run(styler, style_prompt)).final_output)
-    
+        return str((await llm_scheduler.run(styler, style_prompt)).final_output)
+
     # Step 3: Storyteller Agent - Create engaging narrative using dynamic prompt
-    storyteller = build_storyteller_agent(model)
-    story_prompt = f"""{dynamic_system_prompt}
+    async def tell(brief: str, style_guide: str) -> str:
+        storyteller = agent_registry.get("storyteller", model)
+        story_prompt = f"""{style_guide}
 
 Brief:
-{research}
+{brief}
 ---
 Create a 60-120 second narrative script with scene beats.
 Make it engaging, educational, and appropriate for all ages.
 Include visual scene descriptions for animation."""
-    
-    story = str((await Runner.run(storyteller, story_prompt)).final_output)
-    
-    # Step 4.5: Story Analyzer Agent - Generate system prompt from completed story
-    analyzer = build_story_analyzer_agent(model)
-    analysis_prompt = f"""Completed Story:
+
+        return str((await llm_scheduler.run(storyteller, story_prompt)).final_output)
+
+    # Step 4: Story Analyzer Agent - Generate system prompt from completed story
+    async def analyze(story: str) -> str:
+        analyzer = agent_registry.get("story_analyzer", model)
+        analysis_prompt = f"""Completed Story:
 {story}
 ---
 Analyze this story and generate a comprehensive system prompt that captures its narrative style, themes, and structure. This prompt should enable creating similar stories or continuing this narrative."""
-    
-    system_prompt = str((await Runner.run(analyzer, analysis_prompt)).final_output)
-    
+
+        return str((await llm_scheduler.run(analyzer, analysis_prompt)).final_output)
+
     # Step 5: QA Agent - Generate FAQ
-    qa = build_qa_agent(model)
-    faq_prompt = f"""Story:
+    async def faq(story: str) -> list:
+        qa = agent_registry.get("qa", model)
+        faq_prompt = f"""Story:
 {story}
 ---
 Return 5 likely follow-up questions with concise answers as a plain list.
 Format: One Q&A per line, like:
 Q: [question]
 A: [answer]"""
+
+        faq_raw = (await llm_scheduler.run(qa, faq_prompt)).final_output
+
+        # Normalize FAQ into a list of strings
+        faq_lines = str(faq_raw).splitlines()
+        return [line.strip("- • ").strip() for line in faq_lines if line.strip()]
+
+    # Step 6: Generate Audio (TTS)
+    async def audio(story: str, topic: str) -> str:
+        return await synthesize_voice_async(story, topic)
+
+    # Step 7: Generate Video - blocking service, keep it off the event loop
+    async def video(story: str) -> str:
+        return await asyncio.to_thread(generate_video_from_script, story)
+
+    return [
+        Stage("brief", research, ("topic",)),
+        Stage("style_guide", style, ("topic",)),
+        Stage("story", tell, ("brief", "style_guide")),
+        Stage("system_prompt", analyze, ("story",)),
+        Stage("faq", faq, ("story",)),
+        Stage("audio_url", audio, ("story", "topic")),
+        Stage("video_url", video, ("story",)),
+    ]
+
+def _instrumented(stage: Stage) -> Stage:
+    """Wrap a stage so its duration and failures are recorded in the metrics."""
+    async def func(**kwargs: Any) -> Any:
+        start = time.perf_counter()
+        try:
+            value = await stage.func(**kwargs)
+        except Exception:
+            metrics.stage_errors.inc(stage=stage.name)
+            raise
+        metrics.stage_seconds.observe(time.perf_counter() - start, stage=stage.name)
+        return value
+
+    return Stage(stage.name, func, stage.inputs)
+
+async def generate_story_experience(
+    topic: str,
+    model: str,
+    on_stage_complete: Optional[StageCallback] = None,
+) -> dict:
+    """
+    Generate a complete story experience from a historical topic.
     
-    faq_raw = (await Runner.run(qa, faq_prompt)).final_output
-    
-    # Normalize FAQ into a list of strings
-    faq_lines = str(faq_raw).splitlines()
-    faq_list = [line.strip("- • ").strip() for line in faq_lines if line.strip()]
+    This orchestrates the multi-agent pipeline:
+    1. Research brief (facts, timeline, citations)
+    2. Narrative Style Guide (dynamic system prompt creation)
+    3. Story narrative (60-120s script with scene beats)
+    4. Story Analysis (generate system prompt from completed story)
+    5. FAQ list (5 Q&As)
+    6. Audio URL (TTS synthesis)
+    7. Video URL (video generation)
+
+    Steps 1-2 run concurrently, as do steps 4-7 once the story is ready
+    (see build_story_stages).
     
-    # Step 6: Generate Audio (TTS)
-    audio_url = synthesize_voice(story, topic)
+    Args:
+        topic: Historical topic to explore
+        model: OpenAI model name (e.g., "gpt-4o")
+        on_stage_complete: Optional callback(stage_name, result, elapsed_seconds)
     
-    # Step 7: Generate Video
-    video_url = generate_video_from_script(story)
+    Returns:
+        Dictionary with keys: topic, brief, story, system_prompt, faq, audio_url, video_url
+    """
+    start = time.perf_counter()
+    results = await run_stages(
+        [_instrumented(stage) for stage in build_story_stages(model)],
+        seed={"topic": topic},
+        on_stage_complete=on_stage_complete,
+    )
+    metrics.story_seconds.observe(time.perf_counter() - start)
     
     return {
         "topic": topic,
-        "brief": research,
-        "story": story,
-        "system_prompt": system_prompt,
-        "faq": faq_list,
-        "audio_url": audio_url,
-        "video_url": video_url,
-    }
\ No newline at end of file
+        "brief": results["brief"],
+        "story": results["story"],
+        "system_prompt": results["system_prompt"],
+        "faq": results["faq"],
+        "audio_url": results["audio_url"],
+        "video_url": results["video_url"],
+    }
+
+def _cache_key(topic: str, model: str) -> str:
+    return story_cache_key(topic, model, prompt_registry.version)
+
+# Concurrent cache misses for the same topic and model share one pipeline run
+story_flights = SingleFlight()
+
+async def _generate_and_cache(topic: str, model: str,
+                              on_stage_complete: Optional[StageCallback]) -> dict:
+    key = _cache_key(topic, model)
+
+    async def generate(on_stage: StageCallback) -> dict:
+        result = await generate_story_experience(topic, model, on_stage_complete=on_stage)
+        if story_cache is not None:
+            story_cache.set(key, result)
+        return result
+
+    result = await story_flights.run(key, generate, on_stage_complete)
+    # The shared run may have been started for another spelling of the topic
+    return _with_session(dict(result, topic=topic))
+
+def _with_session(result: dict) -> dict:
+    """Register a chat session for a story result and add its story_id."""
+    story_id = story_id_for(result)
+    story_sessions.put(story_id, result)
+    return dict(result, story_id=story_id)
+
+def get_cached_story(topic: str, model: str) -> Optional[dict]:
+    """
+    Return a cached story experience for this topic and model, if any.
+
+    Args:
+        topic: Historical topic to explore
+        model: OpenAI model name (e.g., "gpt-4o")
+
+    Returns:
+        Result dict (with ``topic`` as requested and a ``story_id`` for
+        chat) or None on a cache miss
+    """
+    if story_cache is None:
+        return None
+    key = _cache_key(topic, model)
+    cached = story_cache.get(key)
+    metrics.cache_lookups.inc(cache="story", result="miss" if cached is None else "hit")
+    if cached is None:
+        return None
+    # Topics are normalized for lookup; echo back the caller's spelling
+    return _with_session(dict(cached, topic=topic))
+
+async def get_story_experience(
+    topic: str,
+    model: str,
+    on_stage_complete: Optional[StageCallback] = None,
+) -> dict:
+    """
+    Return a story experience, serving it from the story cache when possible.
+
+    On a miss the full pipeline runs via generate_story_experience and its
+    result is cached. Identical requests that miss while a run is already
+    in progress join it instead of starting another (see SingleFlight).
+    ``on_stage_complete`` is only called on a miss.
+
+    Args:
+        topic: Historical topic to explore
+        model: OpenAI model name (e.g., "gpt-4o")
+        on_stage_complete: Optional callback(stage_name, result, elapsed_seconds)
+
+    Returns:
+        Dictionary with keys: topic, brief, story, system_prompt, faq, audio_url,
+        video_url and story_id (for /api/chat)
+    """
+    cached = get_cached_story(topic, model)
+    if cached is not None:
+        return cached
+    return await _generate_and_cache(topic, model, on_stage_complete)
+
+# Pipeline stages whose results are streamed to clients as they complete
+STREAMED_STAGES = ("brief", "story", "system_prompt", "faq", "audio_url", "video_url")
+
+async def stream_story_experience(topic: str, model: str) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Generate a story experience, yielding each artifact as soon as it is ready.
+
+    Yields ``(event, data)`` pairs. Event names match the StoryResponse
+    fields listed in STREAMED_STAGES, in completion order, followed by a
+    final ``("complete", result_dict)`` event. Errors from the pipeline are
+    raised to the caller after any artifacts already produced. Cached
+    stories are replayed immediately.
+
+    Args:
+        topic: Historical topic to explore
+        model: OpenAI model name (e.g., "gpt-4o")
+
+    Yields:
+        Tuples of (event name, payload)
+    """
+    cached = get_cached_story(topic, model)
+    if cached is not None:
+        for name in STREAMED_STAGES:
+            yield name, cached[name]
+        yield "complete", cached
+        return
+
+    queue: asyncio.Queue = asyncio.Queue()
+
+    def on_stage_complete(name: str, value: Any, elapsed: float) -> None:
+        if name in STREAMED_STAGES:
+            queue.put_nowait((name, value))
+
+    task = asyncio.ensure_future(
+        _generate_and_cache(topic, model, on_stage_complete)
+    )
+    task.add_done_callback(lambda _: queue.put_nowait(None))
+
+    try:
+        while True:
+            item = await queue.get()
+            if item is None:
+                break
+            yield item
+        yield "complete", task.result()
+    finally:
+        # The client may disconnect mid-stream; don't leave the pipeline running
+        if not task.done():
+            task.cancel()